@@ -16,7 +16,19 @@ def create_app(config_class=Config):
 
     # 初始化扩展
     db.init_app(app)
-    CORS(app)
+    CORS(app, expose_headers=['ETag', 'Last-Modified'])  # 允许前端读取条件请求所需的响应头
+
+    # 密码哈希器、登录限流器、令牌缓存、吊销列表、预约冲突索引、列表总数缓存与状态事件代理
+    # （sync 注册删除日志事件）
+    from app import (auth, count_cache, events, fulltext, passwords, rate_limit, revocation,  # noqa: F401
+                     reservation_index, sync)
+    passwords.init_app(app)
+    rate_limit.init_app(app)
+    auth.init_app(app)
+    revocation.init_app(app)
+    reservation_index.init_app(app)
+    count_cache.init_app(app)
+    events.init_app(app)
 
     # 注册蓝图 - 添加详细的调试信息
     print("\n" + "=" * 50)
@@ -74,6 +86,32 @@ def create_app(config_class=Config):
     except Exception as e:
         print(f"❌ 预约蓝图注册异常: {e}")
 
+    # 5. 增量同步蓝图
+    try:
+        from app.routes.sync import bp as sync_bp
+        app.register_blueprint(sync_bp)
+        print("✅ 同步蓝图注册成功")
+        print(f"   名称: {sync_bp.name}, URL前缀: {sync_bp.url_prefix}")
+    except ImportError as e:
+        print(f"❌ 同步蓝图注册失败: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"❌ 同步蓝图注册异常: {e}")
+
+    # 6. 状态事件蓝图
+    try:
+        from app.routes.events import bp as events_bp
+        app.register_blueprint(events_bp)
+        print("✅ 事件蓝图注册成功")
+        print(f"   名称: {events_bp.name}, URL前缀: {events_bp.url_prefix}")
+    except ImportError as e:
+        print(f"❌ 事件蓝图注册失败: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"❌ 事件蓝图注册异常: {e}")
+
     print("=== 蓝图注册完成 ===")
     print("=" * 50 + "\n")
 
@@ -1,16 +1,24 @@
 # app/auth.py
 """
 认证工具模块
-包含JWT令牌生成和验证功能
+包含JWT令牌生成和验证功能、已认证用户的进程内缓存，
+以及统一的认证中间件和 token_required / admin_required 装饰器
 """
 import jwt
 import datetime
-from flask import current_app
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 
 SECRET_KEY = 'dev-secret-key-change-in-production'
 
 
-def generate_token(user_id, username, role, expires_in=24 * 3600):
+def generate_token(user_id, username, role, expires_in=None):
     """
     生成JWT令牌
 
@@ -18,18 +26,22 @@ def generate_token(user_id, username, role, expires_in=24 * 3600):
         user_id: 用户ID
         username: 用户名
         role: 用户角色
-        expires_in: 过期时间（秒），默认24小时
+        expires_in: 过期时间（秒），默认取配置 ACCESS_TOKEN_EXPIRES（应用上下文外为24小时）
 
     Returns:
         str: JWT令牌字符串
     """
+    if expires_in is None:
+        expires_in = current_app.config.get('ACCESS_TOKEN_EXPIRES', 300) if has_app_context() else 24 * 3600
     try:
         payload = {
             'user_id': user_id,
             'username': username,
             'role': role,
             'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=expires_in),
-            'iat': datetime.datetime.utcnow()
+            # 精确到微秒的签发时间，用于与用户的令牌失效时间比较
+            'iat': time.time(),
+            'jti': uuid.uuid4().hex
         }
 
         token = jwt.encode(payload, SECRET_KEY, algorithm='HS256')
@@ -67,6 +79,206 @@ def verify_token(token):
         return None
 
 
+class AuthenticatedUser(namedtuple('AuthenticatedUser', ['id', 'username', 'role'])):
+    """已认证用户的轻量快照（供路由使用，无需加载User对象）"""
+    __slots__ = ()
+
+    def is_admin(self):
+        return self.role in ['admin', 'super']
+
+
+class TokenCache:
+    """
+    已验证令牌的LRU/TTL缓存
+
+    以令牌的SHA-256摘要为键，缓存解码后的载荷和用户快照；
+    用户角色变更或被删除时按用户ID失效。
+    """
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # 令牌摘要 -> (过期时间, 载荷, 用户快照)
+        self._by_user = {}  # 用户ID -> 令牌摘要集合
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token):
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, token, payload, user):
+        # 缓存时间不超过令牌本身的剩余有效期
+        remaining = payload.get('exp', 0) - time.time() if payload.get('exp') else self.ttl
+        ttl = min(self.ttl, remaining)
+        if ttl <= 0:
+            return
+        key = self.key(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, payload, user)
+            self._by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, _, user = self._entries.pop(key)
+        keys = self._by_user.get(user.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user.id]
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def init_app(app):
+    """为应用创建令牌缓存并注册认证中间件"""
+    _register_user_listeners()
+    app.extensions['token_cache'] = TokenCache(
+        maxsize=app.config.get('AUTH_CACHE_SIZE', 10000),
+        ttl=app.config.get('AUTH_CACHE_TTL', 300)
+    )
+    app.before_request(load_current_user)
+
+
+def _get_token_cache():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('token_cache')
+
+
+def authenticate_token(token, with_payload=False):
+    """
+    验证令牌并返回用户快照（带缓存）
+
+    授权完全基于令牌中的签名声明，不查询用户表；
+    被吊销的令牌（登出、角色变更、删除、封禁）由进程内吊销列表拦截。
+
+    Args:
+        token: JWT令牌字符串
+        with_payload: 为True时同时返回令牌载荷
+
+    Returns:
+        AuthenticatedUser or None: 令牌无效、过期或已吊销时返回None
+        （with_payload为True时返回 (用户快照, 载荷) 或 (None, None)）
+    """
+    from app.revocation import get_revocation_list
+
+    failed = (None, None) if with_payload else None
+    if not token:
+        return failed
+
+    cache = _get_token_cache()
+    cached = cache.get(token) if cache is not None else None
+    if cached is not None:
+        payload, user = cached
+    else:
+        payload = verify_token(token)
+        if not payload or 'user_id' not in payload:
+            return failed
+        user = AuthenticatedUser(payload['user_id'], payload.get('username'), payload.get('role'))
+
+    revocations = get_revocation_list()
+    if revocations is not None:
+        revocations.maybe_sync()
+        if revocations.is_revoked(payload):
+            return failed
+
+    if cached is None and cache is not None:
+        cache.set(token, payload, user)
+    return (user, payload) if with_payload else user
+
+
+# ==================== 吊销：用户角色变更或删除 ====================
+
+def _revoke_deleted_user(mapper, connection, target):
+    from app.revocation import revoke_user_tokens
+
+    revoke_user_tokens(target.id, reason='用户已删除', connection=connection, session=object_session(target))
+    cache = _get_token_cache()
+    if cache is not None:
+        cache.invalidate_user(target.id)
+
+
+def _revoke_on_role_change(mapper, connection, target):
+    """角色变更后，旧令牌中的角色声明已过时，吊销该用户的全部令牌"""
+    from sqlalchemy import inspect
+    from app.revocation import revoke_user_tokens
+
+    if inspect(target).attrs.role.history.has_changes():
+        revoke_user_tokens(target.id, reason='用户角色变更', connection=connection, session=object_session(target))
+        cache = _get_token_cache()
+        if cache is not None:
+            cache.invalidate_user(target.id)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _invalidate_on_bulk_write(orm_execute_state):
+    """批量更新/删除用户无法逐个跟踪，直接清空缓存（需要吊销令牌时请逐个更新用户对象）"""
+    from app.models import User
+
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is User:
+            cache = _get_token_cache()
+            if cache is not None:
+                cache.clear()
+
+
+def _register_user_listeners():
+    from app.models import User
+
+    if not event.contains(User, 'after_update', _revoke_on_role_change):
+        event.listen(User, 'after_update', _revoke_on_role_change)
+        event.listen(User, 'after_delete', _revoke_deleted_user)
+
+
+def parse_bearer_token(auth_header):
+    """
+    解析Authorization请求头
+
+    Args:
+        auth_header: 请求头的值，如 'Bearer <token>'
+
+    Returns:
+        str or None: 令牌字符串，格式错误时返回None
+    """
+    if not auth_header:
+        return None
+    scheme, _, token = auth_header.partition(' ')
+    token = token.strip()
+    if scheme.lower() != 'bearer' or not token or ' ' in token:
+        return None
+    return token
+
+
 def get_token_payload(request):
     """
     从请求中提取令牌并验证
@@ -77,82 +289,76 @@ def get_token_payload(request):
     Returns:
         dict or None: 令牌数据
     """
-    try:
-        # 从请求头获取令牌
-        auth_header = request.headers.get('Authorization')
+    return verify_token(parse_bearer_token(request.headers.get('Authorization')))
 
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return None
 
-        token = auth_header[7:]  # 去掉'Bearer '前缀
-        return verify_token(token)
-    except Exception as e:
-        print(f"获取令牌数据失败: {e}")
-        return None
+# ==================== 认证中间件 ====================
+
+def load_current_user():
+    """
+    请求前统一解析认证信息（每个请求只解析一次）
+
+    结果保存在 flask.g 上：
+        g.current_user: 已认证用户快照，未认证时为None
+        g.token_payload: 已验证的令牌载荷
+        g.auth_error: 提供了令牌但认证失败时的错误信息
+    """
+    from flask import g, request
+
+    g.current_user = None
+    g.token_payload = None
+    g.auth_error = None
+
+    if request.method == 'OPTIONS':
+        return
+
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        return
+
+    token = parse_bearer_token(auth_header)
+    if token is None:
+        g.auth_error = '令牌格式错误，应为: Bearer <token>'
+        return
+
+    g.current_user, g.token_payload = authenticate_token(token, with_payload=True)
+    if g.current_user is None:
+        g.auth_error = '令牌无效或已过期'
 
 
 def token_required(f):
     """
     装饰器：需要有效令牌才能访问
+    已认证用户快照作为第一个参数传递给被装饰的函数
     """
     from functools import wraps
-    from flask import request, jsonify
+    from flask import g, jsonify
 
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        try:
-            # 从请求头获取令牌
-            auth_header = request.headers.get('Authorization')
-
-            if not auth_header or not auth_header.startswith('Bearer '):
-                return jsonify({'error': '未提供认证令牌'}), 401
-
-            token = auth_header[7:]  # 去掉'Bearer '前缀
-
-            # 验证令牌
-            payload = verify_token(token)
-            if not payload:
-                return jsonify({'error': '无效或过期的令牌'}), 401
-
-            # 将用户信息传递给被装饰的函数
-            return f(payload, *args, **kwargs)
-        except Exception as e:
-            return jsonify({'error': f'认证失败: {str(e)}'}), 500
+        user = getattr(g, 'current_user', None)
+        if user is None:
+            return jsonify({'error': getattr(g, 'auth_error', None) or '缺少认证令牌'}), 401
+        return f(user, *args, **kwargs)
 
     return decorated_function
 
 
 def admin_required(f):
     """
-    装饰器：需要管理员权限
+    装饰器：需要管理员权限（包含令牌验证，无需再叠加 token_required）
     """
     from functools import wraps
-    from flask import request, jsonify
+    from flask import g, jsonify
 
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        try:
-            # 从请求头获取令牌
-            auth_header = request.headers.get('Authorization')
-
-            if not auth_header or not auth_header.startswith('Bearer '):
-                return jsonify({'error': '未提供认证令牌'}), 401
-
-            token = auth_header[7:]  # 去掉'Bearer '前缀
-
-            # 验证令牌
-            payload = verify_token(token)
-            if not payload:
-                return jsonify({'error': '无效或过期的令牌'}), 401
-
-            # 检查是否是管理员
-            if payload.get('role') != 'admin':
-                return jsonify({'error': '需要管理员权限'}), 403
-
-            # 将用户信息传递给被装饰的函数
-            return f(payload, *args, **kwargs)
-        except Exception as e:
-            return jsonify({'error': f'认证失败: {str(e)}'}), 500
+        user = getattr(g, 'current_user', None)
+        if user is None:
+            return jsonify({'error': getattr(g, 'auth_error', None) or '缺少认证令牌'}), 401
+        if not user.is_admin():
+            return jsonify({'error': '需要管理员权限'}), 403
+        return f(user, *args, **kwargs)
 
     return decorated_function
 
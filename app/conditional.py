@@ -0,0 +1,64 @@
+# app/conditional.py
+"""
+条件请求模块
+为详情和列表接口生成强 ETag 与 Last-Modified。客户端带 If-None-Match / If-Modified-Since
+轮询时，数据未变化就直接返回 304，不再序列化和传输响应体。
+
+    - 详情：由表名、主键和 updated_at 派生（模型的所有写入路径都会更新 updated_at）
+    - 列表：由相关表的版本号（总数缓存维护的已提交写入计数）、请求参数和可见范围派生。
+      版本号只在本进程内有效，因此带上进程纪元，并按 COUNT_CACHE_TTL 分段：
+      多进程部署时，其他进程的写入最迟一个周期后可见，与列表总数缓存一致
+"""
+import hashlib
+import time
+
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+
+from app.count_cache import get_count_cache
+
+
+def record_etag(record):
+    """单条记录的ETag"""
+    modified = record.updated_at or record.created_at
+    stamp = modified.strftime('%Y%m%d%H%M%S%f') if modified else '0'
+    return f'{record.__tablename__}-{record.id}-{stamp}'
+
+
+def listing_etag(tables, scope):
+    """
+    列表的ETag，须在查询数据之前计算（查询期间发生写入时，下次请求的ETag必然不同）
+
+    Args:
+        tables: 列表内容依赖的表
+        scope: 决定可见范围的值（如当前用户ID与角色）
+
+    Returns:
+        str or None: 应用未启用总数缓存时返回None
+    """
+    cache = get_count_cache()
+    if cache is None:
+        return None
+    ttl = current_app.config.get('COUNT_CACHE_TTL', 60)
+    parts = [cache.epoch, str(int(time.time() // ttl) if ttl else 0), repr(scope)]
+    parts += [f'{table}:{cache.version(table)}' for table in tables]
+    parts += [f'{name}={value}' for name, value in sorted(request.args.items(multi=True))]
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def not_modified_response(etag, last_modified=None):
+    """请求的缓存版本仍然有效时返回304响应，否则返回None"""
+    if etag is None or is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return with_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    """为响应添加 ETag / Last-Modified"""
+    if etag is not None:
+        response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # 带认证的响应只允许客户端缓存，且每次使用前需重新验证
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,249 @@
+# app/count_cache.py
+"""
+列表总数与分面统计缓存模块
+分页列表的 total 需要对筛选结果做一次完整的 COUNT(*)，翻页时筛选条件不变却重复计算。
+这里按“表 + 规范化的筛选条件”缓存总数和分面统计，表的任何已提交写入都会使该表的缓存失效
+（通过会话事件维护每张表的版本号）。
+
+结果集很大时，精确计数本身就很昂贵：先做一次以阈值为上限的计数，超过阈值时
+改为根据最近写入的一段记录中的命中比例估算总数，并标记为估算值；
+调用方可通过 exact=True 强制精确计数。
+"""
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+_PENDING_KEY = 'count_cache_tables'
+
+
+def normalize_filters(filters):
+    """
+    规范化筛选条件，使等价的请求得到相同的缓存键
+
+    去掉空值，字符串去除首尾空白，逗号分隔的多值参数排序去重。
+    """
+    normalized = []
+    for name, value in filters.items():
+        if value is None or value == '':
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if ',' in value:
+                value = ','.join(sorted({v.strip() for v in value.split(',') if v.strip()}))
+        normalized.append((name, value))
+    return tuple(sorted(normalized))
+
+
+class CountCache:
+    """按表版本号失效的统计结果缓存（线程安全）"""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # 版本号只在本进程内递增，对外使用时（如列表ETag）需带上纪元以区分进程和重启
+        self.epoch = uuid.uuid4().hex
+        self._versions = {}
+        self._entries = OrderedDict()  # (表名, 缓存键) -> (版本号, 失效时间, 结果)
+        self._lock = threading.Lock()
+
+    def version(self, table):
+        return self._versions.get(table, 0)
+
+    def get(self, table, key):
+        """返回缓存的结果，未命中或已失效时返回None"""
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry is None or entry[0] != self.version(table) or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end((table, key))
+            self.hits += 1
+            return entry[2]
+
+    def set(self, table, key, version, value):
+        """写入缓存；统计期间表已被修改（版本号变化）时丢弃结果"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if version != self.version(table):
+                return
+            self._entries[(table, key)] = (version, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((table, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table):
+        with self._lock:
+            self._versions[table] = self.version(table) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def init_app(app):
+    """为应用创建总数缓存"""
+    app.extensions['count_cache'] = CountCache(
+        maxsize=app.config.get('COUNT_CACHE_SIZE', 1024),
+        ttl=app.config.get('COUNT_CACHE_TTL', 60)
+    )
+
+
+def get_count_cache():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('count_cache')
+
+
+def estimate_count(query, model, sample_size):
+    """
+    估算结果数：统计ID最大的 sample_size 条记录中满足筛选条件的比例，
+    再按最大ID（近似表行数）换算。两次查询都只读取主键范围内的记录。
+    """
+    max_id = query.session.query(func.max(model.id)).scalar() or 0
+    if max_id <= sample_size:
+        return query.order_by(None).count()
+    matched = query.order_by(None).filter(model.id > max_id - sample_size).count()
+    return int(round(matched / sample_size * max_id))
+
+
+def count_listing(query, model, filters, exact=False):
+    """
+    获取筛选结果的总数（带缓存）
+
+    Args:
+        query: 已应用筛选条件的查询
+        model: 模型类
+        filters: 决定结果集的全部条件（含权限范围），用作缓存键
+        exact: 为True时始终返回精确计数
+
+    Returns:
+        tuple: (总数, 是否估算)
+    """
+    cache = get_count_cache()
+    table = model.__tablename__
+    key = normalize_filters(filters)
+    version = cache.version(table) if cache is not None else 0
+
+    if cache is not None:
+        cached = cache.get(table, key)
+        # 请求精确计数时不使用缓存的估算值
+        if cached is not None and not (exact and cached[1]):
+            return cached
+
+    config = current_app.config if has_app_context() else {}
+    threshold = config.get('COUNT_ESTIMATE_THRESHOLD', 10000)
+    query = query.order_by(None)
+
+    estimated = False
+    if exact or not threshold:
+        total = query.count()
+    else:
+        # 以阈值为上限计数，超过阈值时改为估算
+        capped = query.session.query(func.count()).select_from(query.limit(threshold + 1).subquery()).scalar()
+        if capped <= threshold:
+            total = capped
+        else:
+            total = max(estimate_count(query, model, config.get('COUNT_ESTIMATE_SAMPLE', 10000)), threshold + 1)
+            estimated = True
+
+    if cache is not None:
+        cache.set(table, key, version, (total, estimated))
+    return total, estimated
+
+
+def total_pages(total, per_page):
+    return int(math.ceil(total / per_page)) if per_page else 0
+
+
+def facet_counts(query, model, facets, filters):
+    """
+    分面统计：一次分组查询得到各维度取值的计数（带缓存）
+
+    按全部分面列联合分组，再在内存中按维度汇总；组合数远小于行数，
+    因此只需一次扫描即可得到所有维度的计数。
+
+    Args:
+        query: 已应用筛选条件的查询
+        model: 模型类
+        facets: 分面名称 -> 列
+        filters: 决定结果集的全部筛选条件，用作缓存键
+
+    Returns:
+        dict: 分面名称 -> [{'value': 取值, 'count': 数量}, ...]（按数量降序）
+    """
+    cache = get_count_cache()
+    table = model.__tablename__
+    key = ('facets', tuple(facets)) + normalize_filters(filters)
+    version = cache.version(table) if cache is not None else 0
+
+    if cache is not None:
+        cached = cache.get(table, key)
+        if cached is not None:
+            return cached
+
+    columns = list(facets.values())
+    rows = query.order_by(None).with_entities(*columns, func.count()).group_by(*columns).all()
+
+    totals = {name: {} for name in facets}
+    for row in rows:
+        count = row[-1]
+        for name, value in zip(facets, row):
+            totals[name][value] = totals[name].get(value, 0) + count
+
+    result = {
+        name: [{'value': value, 'count': count}
+               for value, count in sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))]
+        for name, counts in totals.items()
+    }
+
+    if cache is not None:
+        cache.set(table, key, version, result)
+    return result
+
+
+# ==================== 会话事件：提交写入后使对应表的缓存失效 ====================
+
+@event.listens_for(Session, 'after_flush')
+def _collect_tables(session, flush_context):
+    tables = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tablename = getattr(obj, '__tablename__', None)
+        if tablename:
+            tables.add(tablename)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_tables(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            orm_execute_state.session.info.setdefault(_PENDING_KEY, set()).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_tables(session):
+    tables = session.info.pop(_PENDING_KEY, None)
+    if not tables:
+        return
+    cache = get_count_cache()
+    if cache is None:
+        return
+    for table in tables:
+        cache.invalidate(table)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_tables(session):
+    session.info.pop(_PENDING_KEY, None)
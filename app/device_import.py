@@ -0,0 +1,249 @@
+# app/device_import.py
+"""
+设备批量导入模块
+流式解析 CSV / JSON Lines 上传文件，逐行校验后按块批量写入：
+每块只用一次集合查询检查 device_id / serial_number / qr_code 与已有设备是否冲突，
+再用一条 executemany INSERT 写入，避免逐条查询和提交。
+"""
+import csv
+import datetime
+import io
+import json
+from itertools import islice
+
+from sqlalchemy import insert, or_, select
+
+from app import db
+from app.models import Device
+
+REQUIRED_FIELDS = ['device_id', 'name', 'device_type']
+OPTIONAL_FIELDS = [
+    'category', 'brand', 'model', 'serial_number', 'qr_code', 'status',
+    'location', 'lab_room', 'specifications', 'description',
+    'warranty_period', 'maintenance_interval', 'responsible_person',
+    'contact_info', 'is_shared', 'max_reservation_hours'
+]
+DATE_FIELDS = ['purchase_date', 'last_maintenance']
+INTEGER_FIELDS = ['warranty_period', 'maintenance_interval', 'max_reservation_hours']
+
+# 唯一列 -> 冲突时的提示
+UNIQUE_FIELDS = {
+    'device_id': '设备编号',
+    'serial_number': '序列号',
+    'qr_code': '二维码标识',
+}
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+
+def parse_device_dates(data, fields=DATE_FIELDS, clear_empty=False):
+    """
+    解析设备数据中的日期字段（ISO格式，兼容末尾的Z）
+
+    创建、导入、更新和批量更新设备共用此函数，保证各写入路径接受的格式一致。
+
+    Args:
+        data: 请求或导入行数据
+        fields: 要解析的日期字段
+        clear_empty: 为True时，出现但为空（空串或null）的字段解析为None，表示清空
+
+    Returns:
+        dict: 日期字段 -> datetime（或清空时的None），只包含需要写入的字段
+
+    Raises:
+        ValueError: 日期格式错误
+    """
+    dates = {}
+    for field in fields:
+        value = data.get(field)
+        if not value:
+            if clear_empty and field in data:
+                dates[field] = None
+            continue
+        try:
+            dates[field] = datetime.datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f'{field}日期格式错误，应为ISO格式')
+    return dates
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'yes', 'y', '是'):
+        return True
+    if text in ('0', 'false', 'no', 'n', '否'):
+        return False
+    raise ValueError(f'is_shared 取值无效: {value}')
+
+
+def validate_device_row(data):
+    """
+    校验并转换一行导入数据（CSV中的空串视为未填写）
+
+    Returns:
+        dict: 可直接写入 devices 表的列值
+
+    Raises:
+        ValueError: 数据无效
+    """
+    if not isinstance(data, dict):
+        raise ValueError('每行必须是JSON对象')
+    data = {key: value for key, value in data.items() if key and value is not None and value != ''}
+
+    missing_fields = [field for field in REQUIRED_FIELDS if not data.get(field)]
+    if missing_fields:
+        raise ValueError(f'缺少必要字段: {", ".join(missing_fields)}')
+
+    values = {field: data[field] for field in REQUIRED_FIELDS + OPTIONAL_FIELDS if field in data}
+    for field in ('device_id', 'serial_number', 'qr_code'):
+        if field in values:
+            values[field] = str(values[field]).strip()
+
+    for field in INTEGER_FIELDS:
+        if field in values:
+            try:
+                values[field] = int(values[field])
+            except (TypeError, ValueError):
+                raise ValueError(f'{field} 必须是整数')
+
+    if 'is_shared' in values:
+        values['is_shared'] = _parse_bool(values['is_shared'])
+
+    if 'status' in values:
+        Device.validate_status(values['status'])
+
+    # 技术参数：JSON Lines 中为对象，CSV 中为JSON字符串
+    parameters = data.get('technical_parameters')
+    if isinstance(parameters, str):
+        try:
+            parameters = json.loads(parameters)
+        except ValueError:
+            raise ValueError('technical_parameters 必须是JSON')
+    if parameters:
+        values['technical_parameters'] = parameters
+
+    values.update(parse_device_dates(data))
+    return values
+
+
+def iter_records(stream, import_format):
+    """
+    流式解析上传内容
+
+    Args:
+        stream: 二进制文件流
+        import_format: 'csv' 或 'jsonl'
+
+    Yields:
+        tuple: (行号, 原始数据或None, 解析错误或None)
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if import_format == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line), None
+        except ValueError:
+            yield line_no, None, 'JSON格式错误'
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _column_default(field):
+    default = Device.__table__.c[field].default
+    return default.arg if default is not None and default.is_scalar else None
+
+
+def _existing_unique_values(rows):
+    """一次查询取出与本块唯一列取值冲突的已有设备"""
+    conditions = []
+    for field in UNIQUE_FIELDS:
+        candidates = {values[field] for _, values in rows if values.get(field)}
+        if candidates:
+            conditions.append(getattr(Device, field).in_(candidates))
+
+    existing = {field: set() for field in UNIQUE_FIELDS}
+    if not conditions:
+        return existing
+    columns = [getattr(Device, field) for field in UNIQUE_FIELDS]
+    for row in db.session.execute(select(*columns).where(or_(*conditions))):
+        for field, value in zip(UNIQUE_FIELDS, row):
+            if value is not None:
+                existing[field].add(value)
+    return existing
+
+
+def import_devices(records, chunk_size=500):
+    """
+    校验并按块批量写入设备（在当前事务中，由调用方提交或回滚）
+
+    Args:
+        records: iter_records 产生的 (行号, 原始数据, 解析错误) 序列
+        chunk_size: 每块行数，即每条 INSERT 写入的最大行数
+
+    Returns:
+        tuple: (处理行数, 写入行数, 错误列表 [{'row', 'device_id', 'error'}, ...])
+    """
+    total = created = 0
+    errors = []
+    seen = {field: {} for field in UNIQUE_FIELDS}  # 文件内已出现的取值 -> 行号
+
+    for chunk in _chunks(records, chunk_size):
+        total += len(chunk)
+        rows = []
+        for line_no, data, parse_error in chunk:
+            device_id = data.get('device_id') if isinstance(data, dict) else None
+            try:
+                if parse_error:
+                    raise ValueError(parse_error)
+                rows.append((line_no, validate_device_row(data)))
+            except ValueError as e:
+                errors.append({'row': line_no, 'device_id': device_id, 'error': str(e)})
+
+        existing = _existing_unique_values(rows)
+        accepted = []
+        for line_no, values in rows:
+            error = None
+            for field, label in UNIQUE_FIELDS.items():
+                value = values.get(field)
+                if not value:
+                    continue
+                if value in seen[field]:
+                    error = f'{label}与第{seen[field][value]}行重复'
+                elif value in existing[field]:
+                    error = f'{label}已存在'
+                if error:
+                    break
+            if error:
+                errors.append({'row': line_no, 'device_id': values['device_id'], 'error': error})
+                continue
+            for field in UNIQUE_FIELDS:
+                if values.get(field):
+                    seen[field][values[field]] = line_no
+            accepted.append(values)
+
+        if accepted:
+            # 补齐为相同的列集合（缺省值取列默认值），整块作为一条 executemany INSERT 写入
+            keys = set().union(*accepted)
+            db.session.execute(insert(Device).execution_options(render_nulls=True), [
+                {key: values[key] if key in values else _column_default(key) for key in keys}
+                for values in accepted
+            ])
+            created += len(accepted)
+
+    return total, created, errors
@@ -0,0 +1,221 @@
+# app/events.py
+"""
+状态事件推送模块
+设备、预约和周期预约规则的状态发生变化时，向订阅者推送精简事件（设备ID、预约ID、新状态、状态转换），
+客户端通过 SSE 接口（/api/events）实时接收，不再轮询列表。
+
+    - 采集：会话 flush 后根据 status 列的变更历史生成事件，覆盖所有通过ORM修改状态的路径
+      （审批、开始/完成使用、取消预约、审核周期预约、更新设备状态等）；批量 UPDATE 不经过ORM对象，
+      由调用方用 queue_event 登记
+    - 发布：事件随事务提交后才发布，回滚时丢弃，订阅者不会看到未生效的变化
+    - 代理：MemoryEventBroker 是进程内的发布/订阅实现，也是测试和单进程部署使用的代理。
+      多进程部署可替换 app.extensions['event_broker'] 为基于外部消息服务、接口相同的实现
+    - 背压：每个连接一个有界队列，发布方从不阻塞；慢连接队列写满后被断开并收到 overflow 事件，
+      客户端重连并通过增量同步接口补齐期间的变化（不提供事件重放）
+"""
+import itertools
+import queue
+import threading
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.models import Device, Reservation, ReservationRule
+
+_PENDING_KEY = 'pending_events'
+
+
+class EventBrokerFull(Exception):
+    """订阅连接数已达上限"""
+
+
+class Subscription:
+    """一个订阅连接：按实验室房间、设备和可见范围过滤事件，待发送的事件放在有界队列中"""
+
+    def __init__(self, broker, queue_size, lab_rooms=None, device_ids=None, user_id=None):
+        self.broker = broker
+        self.lab_rooms = set(lab_rooms) if lab_rooms else None
+        self.device_ids = set(device_ids) if device_ids else None
+        self.user_id = user_id  # 非管理员只接收自己的预约和周期预约事件；为None时接收全部
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize=queue_size)
+
+    def matches(self, item):
+        if self.lab_rooms is not None and item['lab_room'] not in self.lab_rooms:
+            return False
+        if self.device_ids is not None and item['device_id'] not in self.device_ids:
+            return False
+        if self.user_id is not None and item['user_id'] is not None and item['user_id'] != self.user_id:
+            return False
+        return True
+
+    def offer(self, event_id, item):
+        """放入队列，队列已满时返回False（不阻塞发布方）"""
+        try:
+            self._queue.put_nowait((event_id, item))
+            return True
+        except queue.Full:
+            return False
+
+    def get(self, timeout):
+        """等待下一个事件，超时返回None"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class MemoryEventBroker:
+    """进程内发布/订阅代理（线程安全）"""
+
+    def __init__(self, queue_size=100, max_subscribers=100):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.published = 0
+        self.dropped = 0  # 因队列写满被断开的订阅数
+        self._ids = itertools.count(1)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, lab_rooms=None, device_ids=None, user_id=None):
+        """
+        新建订阅
+
+        Raises:
+            EventBrokerFull: 订阅连接数已达上限
+        """
+        subscription = Subscription(self, self.queue_size, lab_rooms, device_ids, user_id)
+        with self._lock:
+            if self.max_subscribers and len(self._subscribers) >= self.max_subscribers:
+                raise EventBrokerFull('事件订阅连接数已达上限，请稍后重试')
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, item):
+        """向匹配的订阅者发布事件，返回事件ID"""
+        with self._lock:
+            event_id = next(self._ids)
+            self.published += 1
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            if subscription.matches(item) and not subscription.offer(event_id, item):
+                # 慢连接：不再继续投递，由连接发送 overflow 后断开
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
+                self.dropped += 1
+        return event_id
+
+    def __len__(self):
+        return len(self._subscribers)
+
+
+def init_app(app):
+    """为应用创建事件代理"""
+    app.extensions['event_broker'] = MemoryEventBroker(
+        queue_size=app.config.get('EVENT_QUEUE_SIZE', 100),
+        max_subscribers=app.config.get('EVENT_MAX_SUBSCRIBERS', 100)
+    )
+
+
+def get_event_broker():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('event_broker')
+
+
+def status_event(kind, device_id, lab_room, status, previous_status, reservation_id=None, user_id=None,
+                 rule_id=None):
+    """构造精简的状态事件（kind 为 device / reservation / reservation_rule）"""
+    item = {
+        'type': kind,
+        'device_id': device_id,
+        'reservation_id': reservation_id,
+        'user_id': user_id,
+        'lab_room': lab_room,
+        'status': status,
+        'transition': f'{previous_status}->{status}',
+        'at': datetime.utcnow().isoformat()
+    }
+    if rule_id is not None:
+        item['rule_id'] = rule_id
+    return item
+
+
+def queue_event(session, item):
+    """登记事件，随会话提交后发布（供不经过ORM对象的批量更新使用）"""
+    session.info.setdefault(_PENDING_KEY, []).append(item)
+
+
+def _status_change(obj):
+    """返回 (原状态, 新状态)，状态未变化时返回None"""
+    history = inspect(obj).attrs.status.history
+    if not history.added:
+        return None
+    previous = history.deleted[0] if history.deleted else None
+    current = history.added[0]
+    if previous == current:
+        return None
+    return previous, current
+
+
+def _device_lab_room(session, device_id):
+    device = session.identity_map.get(session.identity_key(Device, device_id))
+    if device is not None:
+        return device.lab_room
+    return session.connection().scalar(select(Device.lab_room).where(Device.id == device_id))
+
+
+# ==================== 会话事件：收集状态变化，提交后发布 ====================
+
+@event.listens_for(Session, 'after_flush')
+def _collect_status_events(session, flush_context):
+    broker = get_event_broker()
+    if broker is None or not len(broker):
+        return  # 没有订阅者时不做任何额外工作
+    # 同一次提交中先发布预约事件，再发布由它引起的设备状态事件
+    for obj in sorted(session.dirty, key=lambda o: isinstance(o, Device)):
+        if isinstance(obj, Reservation):
+            change = _status_change(obj)
+            if change:
+                queue_event(session, status_event(
+                    'reservation', obj.device_id, _device_lab_room(session, obj.device_id), change[1], change[0],
+                    reservation_id=obj.id, user_id=obj.user_id
+                ))
+        elif isinstance(obj, ReservationRule):
+            change = _status_change(obj)
+            if change:
+                queue_event(session, status_event(
+                    'reservation_rule', obj.device_id, _device_lab_room(session, obj.device_id), change[1], change[0],
+                    rule_id=obj.id, user_id=obj.user_id
+                ))
+        elif isinstance(obj, Device):
+            change = _status_change(obj)
+            if change:
+                queue_event(session, status_event('device', obj.id, obj.lab_room, change[1], change[0]))
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_events(session):
+    items = session.info.pop(_PENDING_KEY, None)
+    if not items:
+        return
+    broker = get_event_broker()
+    if broker is None:
+        return
+    for item in items:
+        broker.publish(item)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_events(session):
+    session.info.pop(_PENDING_KEY, None)
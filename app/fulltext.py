@@ -0,0 +1,144 @@
+# app/fulltext.py
+"""
+全文检索模块
+为设备、预约等表的可搜索文本列建立 SQLite FTS5 索引，替代 ILIKE '%词%' 的全表扫描。
+
+    - 使用外部内容表（content=源表），索引不重复保存文本
+    - 由源表上的触发器增量维护，ORM写入、批量SQL和导入脚本都能保持同步
+    - 使用 trigram 分词器，中文等无空格分隔的文本也能按子串匹配（检索词至少3个字符）
+
+非SQLite数据库、SQLite不支持FTS5或检索词过短时，调用方回退到 ILIKE 查询。
+"""
+from flask import current_app, has_app_context
+from sqlalchemy import event, literal_column, select, table, column, text
+
+from app import db
+
+# FTS表名 -> (源表名, 索引列, 各列的bm25相关度权重)
+FTS_INDEXES = {
+    'devices_fts': ('devices', ['name', 'device_id', 'description'], [10.0, 5.0, 1.0]),
+    'reservations_fts': ('reservations', ['purpose', 'experiment_name', 'research_field', 'course_name'],
+                         [1.0, 5.0, 2.0, 2.0]),
+}
+
+# trigram 分词器要求检索词至少包含3个字符
+MIN_QUERY_LENGTH = 3
+
+
+def _trigger_statements(fts_name, source, columns):
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    delete_old = (f"INSERT INTO {fts_name}({fts_name}, rowid, {cols}) "
+                  f"VALUES ('delete', old.id, {old_values});")
+    insert_new = f'INSERT INTO {fts_name}(rowid, {cols}) VALUES (new.id, {new_values});'
+    return {
+        f'{fts_name}_ai': f'CREATE TRIGGER {fts_name}_ai AFTER INSERT ON {source} BEGIN {insert_new} END',
+        f'{fts_name}_ad': f'CREATE TRIGGER {fts_name}_ad AFTER DELETE ON {source} BEGIN {delete_old} END',
+        f'{fts_name}_au': (f'CREATE TRIGGER {fts_name}_au AFTER UPDATE OF {cols} ON {source} '
+                           f'BEGIN {delete_old} {insert_new} END'),
+    }
+
+
+def ensure_fulltext_indexes(connection, log=None):
+    """
+    创建缺失的FTS表和同步触发器（可重复执行）
+
+    新建FTS表或补建触发器（如源表被删除重建）时，从源表重建索引。
+
+    Returns:
+        list: 执行过的变更说明
+    """
+    changes = []
+    if connection.dialect.name != 'sqlite':
+        return changes
+
+    existing = {row[0] for row in connection.execute(
+        text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+    )}
+
+    for fts_name, (source, columns, weights) in FTS_INDEXES.items():
+        if source not in existing:
+            continue
+
+        rebuild = False
+        if fts_name not in existing:
+            try:
+                connection.execute(text(
+                    f"CREATE VIRTUAL TABLE {fts_name} USING fts5({', '.join(columns)}, "
+                    f"content='{source}', content_rowid='id', tokenize='trigram')"
+                ))
+            except Exception as e:
+                # 旧版SQLite（<3.34）不支持 trigram 分词器或未编译FTS5
+                if log:
+                    log(f'   ⚠️  无法创建全文索引 {fts_name}: {e}')
+                continue
+            # 持久化排序函数，查询中的 rank 列即按列加权的 bm25
+            connection.execute(text(
+                f"INSERT INTO {fts_name}({fts_name}, rank) VALUES ('rank', 'bm25({', '.join(map(str, weights))})')"
+            ))
+            changes.append(f'创建全文索引: {fts_name}')
+            rebuild = True
+
+        for name, ddl in _trigger_statements(fts_name, source, columns).items():
+            if name not in existing:
+                connection.execute(text(ddl))
+                rebuild = True
+
+        if rebuild:
+            connection.execute(text(f"INSERT INTO {fts_name}({fts_name}) VALUES ('rebuild')"))
+            if fts_name in existing:
+                changes.append(f'重建全文索引: {fts_name}')
+
+    for message in changes:
+        if log:
+            log(f'   ✅ {message}')
+    return changes
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_fulltext_indexes(target, connection, **kw):
+    ensure_fulltext_indexes(connection)
+
+
+def fulltext_available(fts_name):
+    """当前数据库中是否存在可用的FTS表（结果按应用缓存）"""
+    if not has_app_context():
+        return False
+    available = current_app.extensions.setdefault('fulltext_indexes', set())
+    if fts_name in available:
+        return True
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': fts_name}
+    ).first() is not None
+    if exists:
+        available.add(fts_name)
+    return exists
+
+
+def build_match_query(term):
+    """将用户输入转为FTS5短语查询：整体按子串匹配，与原 ILIKE '%词%' 语义一致"""
+    return '"' + term.strip().replace('"', '""') + '"'
+
+
+def fulltext_matches(fts_name, term):
+    """
+    全文检索子查询
+
+    Returns:
+        Subquery or None: 含 rowid 与 rank（bm25，越小越相关）列的子查询；
+            FTS不可用或检索词过短时返回None，调用方应回退到 ILIKE
+    """
+    term = (term or '').strip()
+    if len(term) < MIN_QUERY_LENGTH or not fulltext_available(fts_name):
+        return None
+
+    fts = table(fts_name, column('rowid'))
+    return select(
+        fts.c.rowid.label('rowid'),
+        literal_column('rank').label('rank')
+    ).select_from(fts).where(
+        literal_column(fts_name).op('MATCH')(build_match_query(term))
+    ).subquery(f'{fts_name}_match')
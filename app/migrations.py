@@ -0,0 +1,111 @@
+# app/migrations.py
+"""
+数据库结构升级模块
+在不删除已有数据的前提下，将现有数据库（如 app.db）升级到当前模型定义：
+创建缺失的表、补充缺失的列和索引（含全文索引），并清理已被替代的旧索引。
+所有步骤均可重复执行。
+"""
+from datetime import datetime
+
+from sqlalchemy import func, inspect, text, update
+
+from app import db
+from app.fulltext import ensure_fulltext_indexes
+
+# 已被复合索引替代的旧索引
+OBSOLETE_INDEXES = [
+    'ix_reservations_device_id',  # 由 ix_reservations_device_status_time 覆盖
+    'ix_reservations_user_id',  # 由 ix_reservations_user_created 覆盖
+]
+
+# 游标分页按 (created_at, id) 排序，旧版本数据库中 created_at 可能为空：
+# 升级时回填为更新时间，没有更新时间的记录视为最早创建
+BACKFILL_CREATED_AT = ['devices', 'reservations']
+LEGACY_CREATED_AT = datetime(1970, 1, 1)
+
+
+def _add_missing_columns(connection, table, existing_columns, log):
+    """为已有表补充缺失的列（SQLite仅支持追加可空列或带常量默认值的列）"""
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+
+        column_type = column.type.compile(dialect=connection.dialect)
+        ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+        if column.server_default is not None:
+            ddl += f' DEFAULT {column.server_default.arg}'
+        elif not column.nullable:
+            log(f'   ⚠️  跳过非空且无默认值的列: {table.name}.{column.name}')
+            continue
+
+        connection.execute(text(ddl))
+        log(f'   ✅ 新增列: {table.name}.{column.name} ({column_type})')
+
+
+def upgrade_database(engine=None, log=print):
+    """
+    将数据库结构升级到当前模型定义
+
+    Args:
+        engine: 数据库引擎，默认使用当前应用的引擎
+        log: 输出函数
+
+    Returns:
+        list: 执行过的变更说明
+    """
+    engine = engine or db.engine
+    changes = []
+
+    def record(message):
+        changes.append(message)
+        log(message)
+
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                table.create(connection)
+                record(f'   ✅ 新建表: {table.name}')
+                continue
+
+            existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+            _add_missing_columns(connection, table, existing_columns, record)
+
+            existing_indexes = {i['name'] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(connection)
+                    record(f'   ✅ 新建索引: {index.name}')
+
+        for table_name in BACKFILL_CREATED_AT:
+            table = db.metadata.tables[table_name]
+            result = connection.execute(
+                update(table).where(table.c.created_at.is_(None))
+                .values(created_at=func.coalesce(table.c.updated_at, LEGACY_CREATED_AT),
+                        updated_at=table.c.updated_at)  # 回填不是数据修改，不触发 onupdate
+            )
+            if result.rowcount:
+                record(f'   ✅ 回填创建时间: {table_name} ({result.rowcount}行)')
+
+        inspector = inspect(connection)
+        existing_indexes = {
+            index['name']
+            for table_name in inspector.get_table_names()
+            for index in inspector.get_indexes(table_name)
+        }
+        for index_name in OBSOLETE_INDEXES:
+            if index_name in existing_indexes:
+                connection.execute(text(f'DROP INDEX {index_name}'))
+                record(f'   ✅ 删除旧索引: {index_name}')
+
+        # 全文索引（FTS5虚拟表及同步触发器）
+        for message in ensure_fulltext_indexes(connection):
+            record(f'   ✅ {message}')
+
+        # 更新查询优化器的统计信息，使新索引被正确选用
+        if connection.dialect.name == 'sqlite':
+            connection.execute(text('ANALYZE'))
+
+    return changes
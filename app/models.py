@@ -1,7 +1,6 @@
 from app import db
 from datetime import datetime, timedelta
 import json
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask import current_app
 
 
@@ -37,10 +36,17 @@ class User(db.Model):
         return f'<User {self.username}>'
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.passwords import get_password_hasher
+        self.password_hash = get_password_hasher().hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        from app.passwords import get_password_hasher
+        return get_password_hasher().verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """密码哈希参数与当前配置不一致时返回True"""
+        from app.passwords import get_password_hasher
+        return get_password_hasher().needs_rehash(self.password_hash)
 
     def is_admin(self):
         return self.role in ['admin', 'super']
@@ -48,16 +54,16 @@ class User(db.Model):
     def generate_auth_token(self, expires_in=3600):
         """生成JWT令牌"""
         from app.auth import generate_token
-        return generate_token(self.id, expires_in)
+        return generate_token(self.id, self.username, self.role, expires_in)
 
     @staticmethod
     def verify_auth_token(token):
         """验证JWT令牌并返回用户对象"""
         from app.auth import verify_token
-        user_id = verify_token(token)
-        if user_id is None:
+        payload = verify_token(token)
+        if payload is None:
             return None
-        return User.query.get(user_id)
+        return db.session.get(User, payload.get('user_id'))
 
     def to_dict(self):
         """将用户信息转为字典"""
@@ -70,9 +76,191 @@ class User(db.Model):
         }
 
 
-class Device(db.Model):
+class TokenRevocation(db.Model):
+    """令牌吊销记录表 - 吊销单个令牌(jti)，或吊销某用户在指定时间之前签发的全部令牌"""
+    __tablename__ = 'token_revocations'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), nullable=True, index=True, comment='被吊销的令牌ID')
+    # 不设外键：用户被删除后吊销记录仍需保留到其令牌全部过期
+    user_id = db.Column(db.Integer, nullable=True, index=True, comment='用户ID')
+    invalid_before = db.Column(db.DateTime, nullable=True, comment='该时间之前签发的令牌全部失效')
+    reason = db.Column(db.String(100), comment='吊销原因')
+    expires_at = db.Column(db.DateTime, nullable=False, index=True, comment='记录失效时间（相关令牌均已过期）')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, comment='创建时间')
+
+    def __repr__(self):
+        return f'<TokenRevocation {self.id}: {self.jti or self.user_id}>'
+
+
+class RefreshToken(db.Model):
+    """刷新令牌表 - 仅保存令牌的SHA-256摘要，每次刷新时轮换"""
+    __tablename__ = 'refresh_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True, comment='用户ID')
+    token_hash = db.Column(db.String(64), unique=True, nullable=False, comment='令牌摘要')
+    expires_at = db.Column(db.DateTime, nullable=False, comment='过期时间')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, comment='签发时间')
+    revoked_at = db.Column(db.DateTime, nullable=True, comment='吊销/轮换时间')
+    replaced_by_id = db.Column(db.Integer, nullable=True, comment='轮换后的新令牌ID')
+
+    def is_active(self, now=None):
+        now = now or datetime.utcnow()
+        return self.revoked_at is None and self.expires_at > now
+
+    def __repr__(self):
+        return f'<RefreshToken {self.id} user={self.user_id}>'
+
+
+def duration_hours(start_time, end_time):
+    """时长（小时，保留两位小数）"""
+    return round((end_time - start_time).total_seconds() / 3600, 2)
+
+
+def _value(name, default=None):
+    """取列值，为None时返回默认值"""
+    if default is None:
+        getter = lambda obj: getattr(obj, name)  # noqa: E731
+    else:
+        getter = lambda obj: getattr(obj, name) if getattr(obj, name) is not None else default  # noqa: E731
+    getter.inline = ('value', name, default)
+    return getter
+
+
+def _isoformat(name):
+    """日期时间列转ISO字符串"""
+    getter = lambda obj: getattr(obj, name).isoformat() if getattr(obj, name) else None  # noqa: E731
+    getter.inline = ('isoformat', name, None)
+    return getter
+
+
+def compile_row_serializer(model, fields):
+    """
+    为按列查询的结果生成序列化函数
+
+    生成的函数先把行解包为局部变量，再用一个字典字面量构造输出；由 _value/_isoformat
+    定义的字段直接内联为表达式，其余字段调用原取值函数（Row 支持按列名取属性）。
+    输出与 to_dict(fields=fields) 完全一致。
+
+    Returns:
+        tuple: (需要查询的列, 序列化函数)
+    """
+    columns = model.columns_for(fields)
+    names = [column.key for column in columns]
+    namespace = {}
+    items = []
+    for index, field in enumerate(fields):
+        getter = model.SERIALIZED_FIELDS[field][1]
+        kind, name, default = getattr(getter, 'inline', (None, None, None))
+        variable = f'c_{name}'
+        if kind == 'isoformat':
+            expression = f'({variable}.isoformat() if {variable} else None)'
+        elif kind == 'value' and default is None:
+            expression = variable
+        elif kind == 'value':
+            namespace[f'd_{index}'] = default
+            expression = f'({variable} if {variable} is not None else d_{index})'
+        else:
+            namespace[f'g_{index}'] = getter
+            expression = f'g_{index}(row)'
+        items.append(f'{field!r}: {expression}')
+
+    source = (
+        'def serialize(row):\n'
+        f'    {", ".join(f"c_{name}" for name in names)}, = row\n'
+        f'    return {{{", ".join(items)}}}\n'
+    )
+    exec(compile(source, f'<{model.__name__} row serializer>', 'exec'), namespace)
+    return columns, namespace['serialize']
+
+
+class SerializableMixin:
+    """
+    表驱动的序列化：SERIALIZED_FIELDS 描述每个输出字段依赖的列和取值函数，
+    to_dict 与稀疏字段集（fields=）共用同一份定义。取值函数只访问列属性，
+    因此同样适用于 ORM 对象和按列查询得到的 Row。
+    """
+    SERIALIZED_FIELDS = {}  # 输出字段 -> (依赖的列名, 取值函数)
+    BASE_FIELDS = ()
+    DETAIL_FIELDS = ()
+
+    @classmethod
+    def default_fields(cls, detail=False):
+        return cls.BASE_FIELDS + cls.DETAIL_FIELDS if detail else cls.BASE_FIELDS
+
+    @classmethod
+    def parse_fields(cls, value):
+        """
+        解析 fields 参数（逗号分隔的输出字段名）
+
+        Returns:
+            tuple or None: 未指定时返回None
+
+        Raises:
+            ValueError: 包含未知字段
+        """
+        if not value:
+            return None
+        names = tuple(dict.fromkeys(n.strip() for n in value.split(',') if n.strip()))
+        unknown = [n for n in names if n not in cls.SERIALIZED_FIELDS]
+        if unknown:
+            raise ValueError(f'未知字段: {", ".join(unknown)}，可选: {", ".join(cls.SERIALIZED_FIELDS)}')
+        return names or None
+
+    @classmethod
+    def columns_for(cls, fields):
+        """输出字段依赖的列（始终包含分页所需的 id 与 created_at）"""
+        columns = {'id', 'created_at'}
+        for name in fields:
+            columns.update(cls.SERIALIZED_FIELDS[name][0])
+        return [getattr(cls, name) for name in sorted(columns)]
+
+    @classmethod
+    def row_serializer(cls, fields):
+        """
+        只读列表的快速路径：按列查询（不构造ORM对象），再用预编译的函数序列化
+
+        Returns:
+            tuple: (需要查询的列, 函数 row -> dict)，按字段集缓存
+        """
+        fields = tuple(fields)
+        cache = cls.__dict__.get('_row_serializers')
+        if cache is None:
+            cache = {}
+            setattr(cls, '_row_serializers', cache)
+        if fields not in cache:
+            cache[fields] = compile_row_serializer(cls, fields)
+        return cache[fields]
+
+    def to_dict(self, detail=False, fields=None):
+        """转为字典；指定 fields 时只输出这些字段"""
+        serialized = self.SERIALIZED_FIELDS
+        return {name: serialized[name][1](self) for name in (fields or self.default_fields(detail))}
+
+
+class SyncTombstone(db.Model):
+    """删除日志表 - 记录被删除的设备等记录，增量同步接口据此通知客户端删除本地副本"""
+    __tablename__ = 'sync_tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False, comment='被删除记录所在的表')
+    record_id = db.Column(db.Integer, nullable=False, comment='被删除记录的ID')
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, comment='删除时间')
+
+    def __repr__(self):
+        return f'<SyncTombstone {self.table_name}:{self.record_id}>'
+
+
+class Device(SerializableMixin, db.Model):
     """实验室设备表 - 增强版"""
     __tablename__ = 'devices'
+    __table_args__ = (
+        # 游标分页索引
+        db.Index('ix_devices_created', 'created_at', 'id'),
+        # 增量同步索引：按 (updated_at, id) 读取水位之后的变更
+        db.Index('ix_devices_updated', 'updated_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -99,7 +287,7 @@ class Device(db.Model):
     # 设备规格参数
     specifications = db.Column(db.Text, comment='规格参数')
     description = db.Column(db.Text, comment='设备描述')
-    technical_parameters = db.Column(db.JSON, nullable=True, comment='技术参数JSON格式')
+    technical_parameters = db.Column(db.JSON(none_as_null=True), nullable=True, comment='技术参数JSON格式')
 
     # 使用统计
     total_usage_hours = db.Column(db.Float, default=0.0, comment='累计使用时长(小时)')
@@ -120,7 +308,7 @@ class Device(db.Model):
     max_reservation_hours = db.Column(db.Integer, default=4, comment='单次最大预约时长(小时)')
 
     # 时间戳
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, comment='入库时间')
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, comment='入库时间')
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment='更新时间')
 
     # 关系
@@ -133,57 +321,57 @@ class Device(db.Model):
     def __repr__(self):
         return f'<Device {self.device_id}: {self.name}>'
 
-    def to_dict(self, detail=False):
-        """将设备信息转为字典"""
-        # 处理可能为None的字段
-        total_hours = self.total_usage_hours if self.total_usage_hours is not None else 0.0
-        usage_count = self.usage_count if self.usage_count is not None else 0
-        is_shared = self.is_shared if self.is_shared is not None else True
-
-        base_info = {
-            'id': self.id,
-            'device_id': self.device_id,
-            'name': self.name,
-            'type': self.device_type,
-            'category': self.category if self.category else 'general',
-            'status': self.status,
-            'location': self.location,
-            'lab_room': self.lab_room,
-            'total_usage_hours': total_hours,
-            'usage_count': usage_count,
-            'is_shared': is_shared,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
-
-        if detail:
-            detail_info = {
-                'brand': self.brand,
-                'model': self.model,
-                'serial_number': self.serial_number,
-                'specifications': self.specifications,
-                'description': self.description,
-                'technical_parameters': self.technical_parameters,
-                'purchase_date': self.purchase_date.isoformat() if self.purchase_date else None,
-                'warranty_period': self.warranty_period,
-                'maintenance_interval': self.maintenance_interval if self.maintenance_interval is not None else 6,
-                'last_maintenance': self.last_maintenance.isoformat() if self.last_maintenance else None,
-                'next_maintenance': self.next_maintenance.isoformat() if self.next_maintenance else None,
-                'responsible_person': self.responsible_person,
-                'contact_info': self.contact_info,
-                'max_reservation_hours': self.max_reservation_hours if self.max_reservation_hours is not None else 4,
-                'last_used_at': self.last_used_at.isoformat() if self.last_used_at else None,
-                'qr_code': self.qr_code,
-                'updated_at': self.updated_at.isoformat() if self.updated_at else None
-            }
-            base_info.update(detail_info)
-
-        return base_info
+    # 序列化字段：列表默认输出 BASE_FIELDS，详情额外输出 DETAIL_FIELDS
+    SERIALIZED_FIELDS = {
+        'id': (['id'], _value('id')),
+        'device_id': (['device_id'], _value('device_id')),
+        'name': (['name'], _value('name')),
+        'type': (['device_type'], _value('device_type')),
+        'category': (['category'], lambda d: d.category if d.category else 'general'),
+        'status': (['status'], _value('status')),
+        'location': (['location'], _value('location')),
+        'lab_room': (['lab_room'], _value('lab_room')),
+        'total_usage_hours': (['total_usage_hours'], _value('total_usage_hours', 0.0)),
+        'usage_count': (['usage_count'], _value('usage_count', 0)),
+        'is_shared': (['is_shared'], _value('is_shared', True)),
+        'created_at': (['created_at'], _isoformat('created_at')),
+        'brand': (['brand'], _value('brand')),
+        'model': (['model'], _value('model')),
+        'serial_number': (['serial_number'], _value('serial_number')),
+        'specifications': (['specifications'], _value('specifications')),
+        'description': (['description'], _value('description')),
+        'technical_parameters': (['technical_parameters'], _value('technical_parameters')),
+        'purchase_date': (['purchase_date'], _isoformat('purchase_date')),
+        'warranty_period': (['warranty_period'], _value('warranty_period')),
+        'maintenance_interval': (['maintenance_interval'], _value('maintenance_interval', 6)),
+        'last_maintenance': (['last_maintenance'], _isoformat('last_maintenance')),
+        'next_maintenance': (['next_maintenance'], _isoformat('next_maintenance')),
+        'responsible_person': (['responsible_person'], _value('responsible_person')),
+        'contact_info': (['contact_info'], _value('contact_info')),
+        'max_reservation_hours': (['max_reservation_hours'], _value('max_reservation_hours', 4)),
+        'last_used_at': (['last_used_at'], _isoformat('last_used_at')),
+        'qr_code': (['qr_code'], _value('qr_code')),
+        'updated_at': (['updated_at'], _isoformat('updated_at')),
+    }
+    BASE_FIELDS = ('id', 'device_id', 'name', 'type', 'category', 'status', 'location', 'lab_room',
+                   'total_usage_hours', 'usage_count', 'is_shared', 'created_at')
+    DETAIL_FIELDS = ('brand', 'model', 'serial_number', 'specifications', 'description', 'technical_parameters',
+                     'purchase_date', 'warranty_period', 'maintenance_interval', 'last_maintenance',
+                     'next_maintenance', 'responsible_person', 'contact_info', 'max_reservation_hours',
+                     'last_used_at', 'qr_code', 'updated_at')
+
+    STATUSES = ('available', 'reserved', 'in_use', 'maintenance', 'retired')
+    # 设备处于这些状态时不可预约，其上待审核的预约和周期预约规则不能再被批准
+    UNRESERVABLE_STATUSES = ('maintenance', 'retired')
+
+    @classmethod
+    def validate_status(cls, status):
+        if status not in cls.STATUSES:
+            raise ValueError(f'状态无效，必须是: {", ".join(cls.STATUSES)}')
 
     def update_status(self, new_status):
         """更新设备状态（包含状态验证）"""
-        valid_statuses = ['available', 'reserved', 'in_use', 'maintenance', 'retired']
-        if new_status not in valid_statuses:
-            raise ValueError(f'状态无效，必须是: {", ".join(valid_statuses)}')
+        self.validate_status(new_status)
 
         self.status = new_status
         self.updated_at = datetime.utcnow()
@@ -248,15 +436,24 @@ class Device(db.Model):
         }
 
 
-class Reservation(db.Model):
+class Reservation(SerializableMixin, db.Model):
     """设备预约表 - 增强版"""
     __tablename__ = 'reservations'
+    __table_args__ = (
+        # 冲突检测复合索引：设备等值 + 状态IN + 时间范围，重叠条件可直接在索引内判定
+        db.Index('ix_reservations_device_status_time', 'device_id', 'status', 'start_time', 'end_time'),
+        # 游标分页索引：按 (created_at, id) 排序，普通用户的列表额外按 user_id 过滤
+        db.Index('ix_reservations_created', 'created_at', 'id'),
+        db.Index('ix_reservations_user_created', 'user_id', 'created_at', 'id'),
+        # 增量同步索引：按 (updated_at, id) 读取水位之后的变更
+        db.Index('ix_reservations_updated', 'updated_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
     # 关联信息
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True, comment='预约用户ID')
-    device_id = db.Column(db.Integer, db.ForeignKey('devices.id'), nullable=False, index=True, comment='预约设备ID')
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, comment='预约用户ID')
+    device_id = db.Column(db.Integer, db.ForeignKey('devices.id'), nullable=False, comment='预约设备ID')
 
     # 预约时间
     start_time = db.Column(db.DateTime, nullable=False, index=True, comment='预约开始时间')
@@ -284,53 +481,50 @@ class Reservation(db.Model):
     rating = db.Column(db.Integer, comment='设备评分(1-5)')
 
     # 时间戳
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, comment='创建时间')
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, comment='创建时间')
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment='更新时间')
     cancelled_at = db.Column(db.DateTime, comment='取消时间')
 
     def __repr__(self):
         return f'<Reservation {self.id}: {self.user_id}->{self.device_id}>'
 
-    def to_dict(self, detail=False):
-        """将预约信息转为字典"""
-        base_info = {
-            'id': self.id,
-            'user_id': self.user_id,
-            'device_id': self.device_id,
-            'start_time': self.start_time.isoformat() if self.start_time else None,
-            'end_time': self.end_time.isoformat() if self.end_time else None,
-            'purpose': self.purpose,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'duration_hours': self.get_duration_hours() if self.start_time and self.end_time else 0
-        }
-
-        if detail:
-            detail_info = {
-                'actual_start_time': self.actual_start_time.isoformat() if self.actual_start_time else None,
-                'actual_end_time': self.actual_end_time.isoformat() if self.actual_end_time else None,
-                'experiment_name': self.experiment_name,
-                'research_field': self.research_field,
-                'course_name': self.course_name,
-                'review_notes': self.review_notes,
-                'reviewed_by': self.reviewed_by,
-                'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None,
-                'actual_usage_hours': self.actual_usage_hours if self.actual_usage_hours is not None else 0.0,
-                'usage_notes': self.usage_notes,
-                'device_feedback': self.device_feedback,
-                'rating': self.rating,
-                'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-                'cancelled_at': self.cancelled_at.isoformat() if self.cancelled_at else None
-            }
-            base_info.update(detail_info)
-
-        return base_info
+    # 序列化字段：列表默认输出 BASE_FIELDS，详情额外输出 DETAIL_FIELDS
+    SERIALIZED_FIELDS = {
+        'id': (['id'], _value('id')),
+        'user_id': (['user_id'], _value('user_id')),
+        'device_id': (['device_id'], _value('device_id')),
+        'start_time': (['start_time'], _isoformat('start_time')),
+        'end_time': (['end_time'], _isoformat('end_time')),
+        'purpose': (['purpose'], _value('purpose')),
+        'status': (['status'], _value('status')),
+        'created_at': (['created_at'], _isoformat('created_at')),
+        'duration_hours': (['start_time', 'end_time'],
+                           lambda r: duration_hours(r.start_time, r.end_time) if r.start_time and r.end_time else 0),
+        'actual_start_time': (['actual_start_time'], _isoformat('actual_start_time')),
+        'actual_end_time': (['actual_end_time'], _isoformat('actual_end_time')),
+        'experiment_name': (['experiment_name'], _value('experiment_name')),
+        'research_field': (['research_field'], _value('research_field')),
+        'course_name': (['course_name'], _value('course_name')),
+        'review_notes': (['review_notes'], _value('review_notes')),
+        'reviewed_by': (['reviewed_by'], _value('reviewed_by')),
+        'reviewed_at': (['reviewed_at'], _isoformat('reviewed_at')),
+        'actual_usage_hours': (['actual_usage_hours'], _value('actual_usage_hours', 0.0)),
+        'usage_notes': (['usage_notes'], _value('usage_notes')),
+        'device_feedback': (['device_feedback'], _value('device_feedback')),
+        'rating': (['rating'], _value('rating')),
+        'updated_at': (['updated_at'], _isoformat('updated_at')),
+        'cancelled_at': (['cancelled_at'], _isoformat('cancelled_at')),
+    }
+    BASE_FIELDS = ('id', 'user_id', 'device_id', 'start_time', 'end_time', 'purpose', 'status', 'created_at',
+                   'duration_hours')
+    DETAIL_FIELDS = ('actual_start_time', 'actual_end_time', 'experiment_name', 'research_field', 'course_name',
+                     'review_notes', 'reviewed_by', 'reviewed_at', 'actual_usage_hours', 'usage_notes',
+                     'device_feedback', 'rating', 'updated_at', 'cancelled_at')
 
     def get_duration_hours(self):
         """计算预约时长（小时）"""
         if self.start_time and self.end_time:
-            duration = (self.end_time - self.start_time).total_seconds() / 3600
-            return round(duration, 2)
+            return duration_hours(self.start_time, self.end_time)
         return 0
 
     def get_actual_duration_hours(self):
@@ -489,4 +683,73 @@ class Reservation(db.Model):
             'completed': '已完成',
             'cancelled': '已取消'
         }
-        return status_map.get(self.status, self.status)
\ No newline at end of file
+        return status_map.get(self.status, self.status)
+
+
+class ReservationRule(db.Model):
+    """周期预约规则表 - 按RRULE存储重复预约，查询时按窗口展开"""
+    __tablename__ = 'reservation_rules'
+    __table_args__ = (
+        db.Index('ix_reservation_rules_device_status_time', 'device_id', 'status', 'dtstart', 'ends_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # 关联信息
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, comment='预约用户ID')
+    device_id = db.Column(db.Integer, db.ForeignKey('devices.id'), nullable=False, comment='预约设备ID')
+
+    # 重复规则
+    rrule = db.Column(db.String(200), nullable=False, comment='重复规则，如 FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20250630')
+    dtstart = db.Column(db.DateTime, nullable=False, comment='首次开始时间')
+    duration_minutes = db.Column(db.Integer, nullable=False, comment='单次时长(分钟)')
+    ends_at = db.Column(db.DateTime, nullable=False, comment='最后一次结束时间')
+    exdates = db.Column(db.JSON, nullable=True, comment='排除日期列表')
+
+    # 预约信息
+    purpose = db.Column(db.String(500), nullable=False, comment='使用目的')
+    experiment_name = db.Column(db.String(200), comment='实验名称')
+    research_field = db.Column(db.String(100), comment='研究领域')
+    course_name = db.Column(db.String(100), comment='课程名称')
+
+    # 状态管理（与预约相同：pending/approved/rejected/cancelled）
+    status = db.Column(db.String(20), default='pending', nullable=False, comment='规则状态')
+    review_notes = db.Column(db.Text, comment='审核意见')
+    reviewed_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, comment='审核人ID')
+    reviewed_at = db.Column(db.DateTime, comment='审核时间')
+
+    # 时间戳
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, comment='创建时间')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment='更新时间')
+    cancelled_at = db.Column(db.DateTime, comment='取消时间')
+
+    def __repr__(self):
+        return f'<ReservationRule {self.id}: {self.device_id} {self.rrule}>'
+
+    def to_dict(self):
+        """将规则信息转为字典"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'device_id': self.device_id,
+            'rrule': self.rrule,
+            'dtstart': self.dtstart.isoformat() if self.dtstart else None,
+            'duration_minutes': self.duration_minutes,
+            'ends_at': self.ends_at.isoformat() if self.ends_at else None,
+            'exdates': self.exdates or [],
+            'purpose': self.purpose,
+            'experiment_name': self.experiment_name,
+            'research_field': self.research_field,
+            'course_name': self.course_name,
+            'status': self.status,
+            'review_notes': self.review_notes,
+            'reviewed_by': self.reviewed_by,
+            'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'cancelled_at': self.cancelled_at.isoformat() if self.cancelled_at else None
+        }
+
+    def occurrences(self, window_start, window_end):
+        """在窗口内惰性展开各次占用"""
+        from app.recurrence import expand_rule
+        return expand_rule(self, window_start, window_end)
@@ -0,0 +1,49 @@
+# app/occupancy.py
+"""
+设备占用网格模块
+将设备的占用区间按固定时间桶离散化，输出游程编码（RLE）或位图，
+供排期界面一次性渲染大量设备的周视图。
+"""
+import base64
+
+
+def bucket_runs(intervals, window_start, window_end, bucket):
+    """
+    将按开始时间排序的占用区间转换为被占用时间桶的游程
+
+    Args:
+        intervals: 按开始时间排序的 (开始时间, 结束时间) 序列
+        window_start: 网格起始时间
+        window_end: 网格结束时间
+        bucket: 单个时间桶的时长(timedelta)
+
+    Returns:
+        list: [[起始桶序号, 连续桶数], ...]，任何部分被占用的桶都视为占用
+    """
+    total = bucket_count(window_start, window_end, bucket)
+    runs = []
+    for start, end in intervals:
+        start, end = max(start, window_start), min(end, window_end)
+        if start >= end:
+            continue
+        first = (start - window_start) // bucket
+        last = min(-((window_start - end) // bucket), total)  # 向上取整
+        if runs and first <= runs[-1][0] + runs[-1][1]:
+            runs[-1][1] = max(runs[-1][1], last - runs[-1][0])
+        else:
+            runs.append([first, last - first])
+    return runs
+
+
+def bucket_count(window_start, window_end, bucket):
+    """网格中的时间桶数量"""
+    return -((window_start - window_end) // bucket)
+
+
+def runs_to_bitmap(runs, total):
+    """将游程转换为base64编码的位图（第i位对应第i个时间桶，低位在前）"""
+    bits = bytearray((total + 7) // 8)
+    for first, length in runs:
+        for i in range(first, first + length):
+            bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bits)).decode('ascii')
@@ -0,0 +1,150 @@
+# app/pagination.py
+"""
+列表分页模块
+游标（keyset）分页：按 (created_at, id) 排序，用上一页首/尾记录的键值作为查询条件，
+每页只读取 limit+1 行，翻页耗时与页码无关，也不需要 COUNT(*)。
+游标是对键值的不透明编码，客户端只需原样回传。
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at, record_id, direction):
+    """将分页键值编码为不透明游标"""
+    raw = json.dumps([created_at.isoformat() if created_at else None, record_id, direction],
+                     separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    解码游标
+
+    Returns:
+        tuple: (created_at, id, direction)
+
+    Raises:
+        ValueError: 游标格式错误
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, record_id, direction = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if direction not in ('next', 'prev') or not isinstance(record_id, int) or created_at is None:
+            raise ValueError
+        return datetime.fromisoformat(created_at), record_id, direction
+    except (TypeError, ValueError, UnicodeError, json.JSONDecodeError):
+        raise ValueError('无效的分页游标')
+
+
+def keyset_page(query, model, limit, cursor=None, descending=True):
+    """
+    按 (created_at, id) 游标分页
+
+    Args:
+        query: 已应用筛选条件、尚未排序的查询
+        model: 模型类（需要 created_at 与 id 列）
+        limit: 每页条数
+        cursor: 上一次返回的 next_cursor / prev_cursor，为空时返回第一页
+        descending: 是否按创建时间倒序
+
+    Returns:
+        tuple: (本页记录, next_cursor, prev_cursor)
+
+    Raises:
+        ValueError: 游标格式错误
+    """
+    key = tuple_(model.created_at, model.id)
+    direction = 'next'
+    if cursor:
+        created_at, record_id, direction = decode_cursor(cursor)
+        bound = tuple_(created_at, record_id)
+        # 向后翻页沿排序方向取，向前翻页逆排序方向取再反转
+        forward = (direction == 'next') == descending
+        query = query.filter(key < bound if forward else key > bound)
+
+    reverse = direction == 'prev'
+    ascending = descending == reverse
+    if ascending:
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+    else:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+
+    items = query.limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    if reverse:
+        items.reverse()
+
+    if not items:
+        return items, None, None
+
+    first, last = items[0], items[-1]
+    if reverse:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, bool(cursor)
+
+    next_cursor = encode_cursor(last.created_at, last.id, 'next') if has_next else None
+    prev_cursor = encode_cursor(first.created_at, first.id, 'prev') if has_prev else None
+    return items, next_cursor, prev_cursor
+
+
+def is_cursor_request(args):
+    """请求中带有 cursor 参数（首页可为空值）或 paginate=cursor 时使用游标分页"""
+    return 'cursor' in args or args.get('paginate') == 'cursor'
+
+
+def paginate_listing(query, model, args, order_by, filters, descending=True, max_limit=100):
+    """
+    按请求参数分页：游标分页，或兼容旧客户端的 page/per_page 分页
+
+    总数通过总数缓存获取，结果集过大时返回估算值（total_is_estimate 为True），
+    请求参数 exact_total=true 时强制精确计数。
+
+    Args:
+        query: 已应用筛选条件、尚未排序的查询
+        model: 模型类
+        args: 请求参数（request.args）
+        order_by: page/per_page 分页使用的排序条件
+        filters: 决定结果集的全部筛选条件（含权限范围），用作总数缓存键
+        descending: 游标分页是否按创建时间倒序
+        max_limit: 游标分页每页最大条数
+
+    Returns:
+        tuple: (本页记录, 分页信息字典)
+
+    Raises:
+        ValueError: 游标格式错误
+    """
+    from app.count_cache import count_listing, total_pages
+
+    exact = args.get('exact_total') == 'true'
+
+    if is_cursor_request(args):
+        limit = max(1, min(args.get('limit', args.get('per_page', 10, type=int), type=int), max_limit))
+        items, next_cursor, prev_cursor = keyset_page(query, model, limit, args.get('cursor'), descending)
+        pagination = {
+            'mode': 'cursor',
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor
+        }
+        # 总数需要额外计数，默认不返回
+        if args.get('include_total') == 'true' or exact:
+            pagination['total'], pagination['total_is_estimate'] = count_listing(query, model, filters, exact)
+        return items, pagination
+
+    page = max(args.get('page', 1, type=int), 1)
+    per_page = max(args.get('per_page', 10, type=int), 1)
+    items = query.order_by(*order_by).limit(per_page).offset((page - 1) * per_page).all()
+    total, estimated = count_listing(query, model, filters, exact)
+    return items, {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': total_pages(total, per_page),
+        'total_is_estimate': estimated
+    }
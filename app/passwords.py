@@ -0,0 +1,118 @@
+# app/passwords.py
+"""
+密码哈希模块
+哈希算法与参数由配置 PASSWORD_HASH_METHOD / PASSWORD_SALT_LENGTH 决定；
+参数调整后，用户下次登录成功时透明地按新参数重新哈希。
+
+scrypt/pbkdf2 是刻意设计的CPU密集计算，放在请求线程中会在登录高峰时占满工作线程。
+因此哈希与校验提交到有界进程池执行：排队的任务数有上限，超过上限的请求在等待
+PASSWORD_HASH_QUEUE_TIMEOUT 秒后返回繁忙，而不是无限堆积。
+"""
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app, has_app_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+DEFAULT_SALT_LENGTH = 16
+
+
+class PasswordHasherBusy(Exception):
+    """哈希进程池排队已满"""
+
+
+def normalize_method(method):
+    """补全默认参数，使其与哈希值中记录的方法字符串一致"""
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        defaults = ['32768', '8', '1']
+    elif name == 'pbkdf2':
+        defaults = ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        raise ValueError(f'不支持的密码哈希算法: {name}')
+    return ':'.join([name] + args + defaults[len(args):])
+
+
+class PasswordHasher:
+    """
+    在有界进程池中执行密码哈希与校验
+
+    Args:
+        method: werkzeug 哈希方法，如 'scrypt:32768:8:1' 或 'pbkdf2:sha256:600000'
+        salt_length: 盐长度
+        workers: 进程数，为0时在调用线程内同步执行
+        max_pending: 允许同时提交（执行中+排队）的任务数
+        queue_timeout: 等待排队名额的秒数
+    """
+
+    def __init__(self, method=DEFAULT_METHOD, salt_length=DEFAULT_SALT_LENGTH,
+                 workers=0, max_pending=None, queue_timeout=5):
+        self.method = normalize_method(method)
+        self.salt_length = salt_length
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max_pending or max(workers, 1) * 4)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.rejected += 1
+            raise PasswordHasherBusy('密码校验繁忙，请稍后重试')
+        try:
+            return self._get_executor().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        if not pwhash:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """哈希值使用的方法与当前配置不同时返回True"""
+        return not pwhash or pwhash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+def init_app(app):
+    """为应用创建密码哈希器"""
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+        salt_length=app.config.get('PASSWORD_SALT_LENGTH', DEFAULT_SALT_LENGTH),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 0),
+        max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING'),
+        queue_timeout=app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 5)
+    )
+
+
+_fallback_hasher = None
+
+
+def get_password_hasher():
+    """当前应用的密码哈希器；应用上下文外（如脚本）使用同步执行的默认哈希器"""
+    global _fallback_hasher
+    if has_app_context() and 'password_hasher' in current_app.extensions:
+        return current_app.extensions['password_hasher']
+    if _fallback_hasher is None:
+        _fallback_hasher = PasswordHasher()
+    return _fallback_hasher
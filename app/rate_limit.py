@@ -0,0 +1,190 @@
+# app/rate_limit.py
+"""
+登录限流模块
+按用户名和客户端IP分别维护令牌桶，在校验密码之前拒绝超额的登录尝试，
+使撞库流量无法转化为大量昂贵的密码哈希计算。
+
+令牌桶默认保存在进程内；多进程部署时可配置 LOGIN_LIMIT_STORE 为SQLite文件路径，
+各进程共享同一份桶状态。
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+
+
+def _refill(tokens, updated, now, capacity, rate):
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def _take(tokens, capacity, rate):
+    """尝试取出一个令牌，返回 (剩余令牌数, 需等待的秒数或None)"""
+    if tokens >= 1:
+        return tokens - 1, None
+    return tokens, (1 - tokens) / rate if rate > 0 else float('inf')
+
+
+class MemoryBucketStore:
+    """进程内令牌桶存储（LRU淘汰，线程安全）"""
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()  # 键 -> (令牌数, 更新时间)
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now):
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens, retry_after = _take(_refill(tokens, updated, now, capacity, rate), capacity, rate)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """基于SQLite文件的共享令牌桶存储，供多个工作进程共用"""
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, idle_seconds=24 * 3600):
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self._local = threading.local()
+        self._ops = 0
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS login_buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key, capacity, rate, now):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM login_buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens, retry_after = _take(_refill(tokens, updated, now, capacity, rate), capacity, rate)
+            conn.execute('INSERT OR REPLACE INTO login_buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                         (key, tokens, now))
+            self._ops += 1
+            if self._ops % self.PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM login_buckets WHERE updated < ?', (now - self.idle_seconds,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return retry_after
+
+    def reset(self, key):
+        self._connect().execute('DELETE FROM login_buckets WHERE key = ?', (key,))
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM login_buckets').fetchone()[0]
+
+
+class LoginLimiter:
+    """
+    登录尝试限流器
+
+    Args:
+        store: 令牌桶存储
+        username_burst: 单个用户名允许的突发尝试次数
+        username_per_minute: 单个用户名每分钟恢复的尝试次数
+        ip_burst: 单个IP允许的突发尝试次数
+        ip_per_minute: 单个IP每分钟恢复的尝试次数
+        clock: 时间函数（测试时可替换）
+    """
+
+    def __init__(self, store, username_burst=5, username_per_minute=5,
+                 ip_burst=30, ip_per_minute=30, clock=time.time):
+        self.store = store
+        self.username_limit = (username_burst, username_per_minute / 60.0)
+        self.ip_limit = (ip_burst, ip_per_minute / 60.0)
+        self.clock = clock
+        self.allowed = 0
+        self.rejected_ip = 0
+        self.rejected_username = 0
+
+    @staticmethod
+    def _username_key(username):
+        return 'user:' + username.strip().lower()
+
+    def check(self, username, ip):
+        """
+        记录一次登录尝试
+
+        Returns:
+            float or None: 超出限制时返回建议的重试等待秒数，否则返回None
+        """
+        now = self.clock()
+        if ip:
+            retry_after = self.store.consume('ip:' + ip, *self.ip_limit, now)
+            if retry_after is not None:
+                self.rejected_ip += 1
+                return retry_after
+
+        retry_after = self.store.consume(self._username_key(username), *self.username_limit, now)
+        if retry_after is not None:
+            self.rejected_username += 1
+            return retry_after
+
+        self.allowed += 1
+        return None
+
+    def reset_username(self, username):
+        """登录成功后重置该用户名的桶，输错几次后成功登录的用户不受影响"""
+        self.store.reset(self._username_key(username))
+
+    def stats(self):
+        return {
+            'allowed': self.allowed,
+            'rejected': self.rejected_ip + self.rejected_username,
+            'rejected_ip': self.rejected_ip,
+            'rejected_username': self.rejected_username,
+            'buckets': len(self.store)
+        }
+
+
+def init_app(app):
+    """为应用创建登录限流器，LOGIN_RATE_LIMIT_ENABLED 为False时不启用"""
+    if not app.config.get('LOGIN_RATE_LIMIT_ENABLED', True):
+        app.extensions['login_limiter'] = None
+        return
+
+    store_path = app.config.get('LOGIN_LIMIT_STORE')
+    if store_path:
+        store = SQLiteBucketStore(store_path)
+    else:
+        store = MemoryBucketStore(maxsize=app.config.get('LOGIN_LIMIT_MAX_KEYS', 100000))
+
+    app.extensions['login_limiter'] = LoginLimiter(
+        store,
+        username_burst=app.config.get('LOGIN_USERNAME_BURST', 5),
+        username_per_minute=app.config.get('LOGIN_USERNAME_PER_MINUTE', 5),
+        ip_burst=app.config.get('LOGIN_IP_BURST', 30),
+        ip_per_minute=app.config.get('LOGIN_IP_PER_MINUTE', 30)
+    )
+
+
+def get_login_limiter():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('login_limiter')
@@ -0,0 +1,195 @@
+# app/recurrence.py
+"""
+周期预约规则模块
+解析RRULE风格的重复规则（如 FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20250630），
+并按查询窗口惰性展开为具体的时间区间，避免为每次课程物化大量预约记录。
+"""
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+SUPPORTED_FREQS = ('DAILY', 'WEEKLY')
+
+# 单条规则允许的最大展开次数（仅在创建规则时完整展开校验）
+MAX_OCCURRENCES = 500
+
+# 规则展开后的单次占用，与 IndexedReservation 字段兼容（id 为 None）
+Occurrence = namedtuple('Occurrence', ['id', 'rule_id', 'user_id', 'start_time', 'end_time', 'status'])
+
+
+def _parse_rrule_datetime(value):
+    """解析RRULE中的时间：YYYYMMDD 或 YYYYMMDDTHHMMSS[Z]"""
+    value = value.rstrip('Z')
+    if 'T' in value:
+        return datetime.strptime(value, '%Y%m%dT%H%M%S')
+    # 仅日期时包含当天全天
+    return datetime.strptime(value, '%Y%m%d') + timedelta(days=1) - timedelta(microseconds=1)
+
+
+class RecurrenceRule:
+    """RRULE风格的重复规则（支持 FREQ/INTERVAL/BYDAY/UNTIL/COUNT）"""
+
+    def __init__(self, freq, interval=1, byday=None, until=None, count=None):
+        if freq not in SUPPORTED_FREQS:
+            raise ValueError(f'不支持的重复频率: {freq}，必须是: {", ".join(SUPPORTED_FREQS)}')
+        if interval < 1:
+            raise ValueError('INTERVAL必须大于0')
+        if until is None and count is None:
+            raise ValueError('重复规则必须指定UNTIL或COUNT')
+        if count is not None and not 0 < count <= MAX_OCCURRENCES:
+            raise ValueError(f'COUNT必须在1到{MAX_OCCURRENCES}之间')
+
+        self.freq = freq
+        self.interval = interval
+        self.byday = sorted(set(byday or []))
+        self.until = until
+        self.count = count
+
+    @classmethod
+    def parse(cls, text):
+        """从RRULE字符串解析规则"""
+        parts = {}
+        text = text.strip()
+        if text.upper().startswith('RRULE:'):
+            text = text[len('RRULE:'):]
+        for item in text.split(';'):
+            if not item:
+                continue
+            key, sep, value = item.partition('=')
+            if not sep:
+                raise ValueError(f'重复规则格式错误: {item}')
+            parts[key.strip().upper()] = value.strip().upper()
+
+        unknown = set(parts) - {'FREQ', 'INTERVAL', 'BYDAY', 'UNTIL', 'COUNT'}
+        if unknown:
+            raise ValueError(f'不支持的重复规则字段: {", ".join(sorted(unknown))}')
+
+        byday = None
+        if 'BYDAY' in parts:
+            try:
+                byday = [WEEKDAYS.index(day) for day in parts['BYDAY'].split(',')]
+            except ValueError:
+                raise ValueError(f'BYDAY格式错误: {parts["BYDAY"]}')
+
+        return cls(
+            freq=parts.get('FREQ'),
+            interval=int(parts.get('INTERVAL', 1)),
+            byday=byday,
+            until=_parse_rrule_datetime(parts['UNTIL']) if 'UNTIL' in parts else None,
+            count=int(parts['COUNT']) if 'COUNT' in parts else None
+        )
+
+    def starts(self, dtstart, after=None):
+        """
+        按时间顺序惰性生成各次开始时间
+
+        Args:
+            dtstart: 首次开始时间
+            after: 只关心不早于该时间的开始时间；未指定COUNT时据此直接跳到窗口附近
+        """
+        step_days = self.interval * (7 if self.freq == 'WEEKLY' else 1)
+        weekdays = (self.byday or [dtstart.weekday()]) if self.freq == 'WEEKLY' else None
+
+        if self.freq == 'WEEKLY':
+            period_start = datetime.combine(dtstart.date() - timedelta(days=dtstart.weekday()), dtstart.time())
+        else:
+            period_start = dtstart
+
+        # COUNT需要从头计数，只有仅含UNTIL的规则可以跳过窗口之前的周期
+        if after is not None and self.count is None and after > period_start:
+            skipped = (after - period_start).days // step_days
+            period_start += timedelta(days=skipped * step_days)
+
+        emitted = 0
+        while True:
+            offsets = weekdays if weekdays is not None else [0]
+            for offset in offsets:
+                start = period_start + timedelta(days=offset)
+                if start < dtstart:
+                    continue
+                if weekdays is None and self.byday and start.weekday() not in self.byday:
+                    continue
+                if self.until is not None and start > self.until:
+                    return
+                yield start
+                emitted += 1
+                if self.count is not None and emitted >= self.count:
+                    return
+            period_start += timedelta(days=step_days)
+
+    def between(self, dtstart, duration, window_start, window_end, exdates=()):
+        """
+        生成与[window_start, window_end)重叠的各次占用区间
+
+        Args:
+            dtstart: 首次开始时间
+            duration: 单次时长(timedelta)
+            window_start: 窗口开始时间
+            window_end: 窗口结束时间
+            exdates: 排除的日期集合
+
+        Yields:
+            tuple: (开始时间, 结束时间)
+        """
+        for start in self.starts(dtstart, after=window_start - duration):
+            if start >= window_end:
+                return
+            end = start + duration
+            if end > window_start and start.date() not in exdates:
+                yield start, end
+
+    def last_end(self, dtstart, duration):
+        """计算最后一次占用的结束时间，超过最大展开次数时抛出ValueError"""
+        last = None
+        for i, start in enumerate(self.starts(dtstart)):
+            if i >= MAX_OCCURRENCES:
+                raise ValueError(f'重复规则展开次数超过上限({MAX_OCCURRENCES})')
+            last = start
+        if last is None:
+            raise ValueError('重复规则没有任何有效的时间')
+        return last + duration
+
+
+def parse_exdates(values):
+    """解析排除日期列表（ISO日期字符串）"""
+    return sorted({date.fromisoformat(str(value)[:10]) for value in values or []})
+
+
+def expand_rule(rule, window_start, window_end):
+    """将一条 ReservationRule 在窗口内惰性展开为 Occurrence"""
+    recurrence = RecurrenceRule.parse(rule.rrule)
+    duration = timedelta(minutes=rule.duration_minutes)
+    exdates = set(parse_exdates(rule.exdates))
+    for start, end in recurrence.between(rule.dtstart, duration, window_start, window_end, exdates):
+        yield Occurrence(None, rule.id, rule.user_id, start, end, rule.status)
+
+
+def active_rules_query(window_start, window_end, statuses):
+    """查询与窗口相交的周期规则"""
+    from app.models import ReservationRule
+
+    return ReservationRule.query.filter(
+        ReservationRule.status.in_(statuses),
+        ReservationRule.dtstart < window_end,
+        ReservationRule.ends_at > window_start
+    )
+
+
+def rule_occurrences(device_ids, window_start, window_end, statuses):
+    """
+    获取多台设备在窗口内的周期预约占用
+
+    Returns:
+        dict: 设备ID -> 按开始时间排序的 Occurrence 列表
+    """
+    from app.models import ReservationRule
+
+    grouped = {device_id: [] for device_id in device_ids}
+    rules = active_rules_query(window_start, window_end, statuses).filter(
+        ReservationRule.device_id.in_(list(device_ids))
+    ).all()
+    for rule in rules:
+        grouped[rule.device_id].extend(expand_rule(rule, window_start, window_end))
+    for occurrences in grouped.values():
+        occurrences.sort(key=lambda o: o.start_time)
+    return grouped
@@ -0,0 +1,151 @@
+# app/refresh_tokens.py
+"""
+刷新令牌模块
+访问令牌短期有效、无状态验证；刷新令牌长期有效，仅以SHA-256摘要存库。
+每次刷新都会轮换刷新令牌：旧令牌作废并指向新令牌。若已轮换的旧令牌被再次使用，
+说明令牌可能已泄露，立即吊销该用户的全部刷新令牌。
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import update
+
+from app import db
+
+
+class RefreshTokenError(Exception):
+    """刷新令牌无效、过期、已吊销或被重复使用"""
+
+
+def hash_refresh_token(raw_token):
+    """刷新令牌为高熵随机串，使用快速摘要即可，无需慢哈希"""
+    return hashlib.sha256(raw_token.encode('utf-8')).hexdigest()
+
+
+def issue_refresh_token(user_id):
+    """
+    签发刷新令牌（需由调用方提交事务）
+
+    Returns:
+        tuple: (原始令牌字符串, RefreshToken记录)
+    """
+    from app.models import RefreshToken
+
+    raw_token = secrets.token_urlsafe(32)
+    record = RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(raw_token),
+        expires_at=datetime.utcnow() + timedelta(seconds=current_app.config.get('REFRESH_TOKEN_EXPIRES', 30 * 24 * 3600))
+    )
+    db.session.add(record)
+    return raw_token, record
+
+
+def issue_token_pair(user):
+    """
+    为用户签发访问令牌与刷新令牌（需由调用方提交事务）
+
+    Returns:
+        tuple: (登录/刷新接口返回的令牌字段, RefreshToken记录)
+    """
+    from app.auth import generate_token
+
+    expires_in = current_app.config.get('ACCESS_TOKEN_EXPIRES', 300)
+    raw_refresh, record = issue_refresh_token(user.id)
+    tokens = {
+        'token': generate_token(user.id, user.username, user.role, expires_in),
+        'refresh_token': raw_refresh,
+        'expires_in': expires_in
+    }
+    return tokens, record
+
+
+def find_refresh_token(raw_token):
+    from app.models import RefreshToken
+
+    if not raw_token:
+        return None
+    return RefreshToken.query.filter_by(token_hash=hash_refresh_token(raw_token)).first()
+
+
+def rotate_refresh_token(raw_token):
+    """
+    使用刷新令牌换取新的令牌对（需由调用方提交事务）
+
+    刷新时重新读取用户，使新访问令牌携带当前角色。
+    旧令牌通过条件 UPDATE 原子地占用：并发使用同一令牌的请求中只有一个能轮换成功，
+    其余请求按重复使用处理。
+
+    Raises:
+        RefreshTokenError: 令牌无效、过期、已吊销，或已轮换的令牌被重复使用
+    """
+    from app.models import User, RefreshToken
+
+    record = find_refresh_token(raw_token)
+    if record is None:
+        raise RefreshTokenError('刷新令牌无效')
+
+    now = datetime.utcnow()
+    if record.revoked_at is not None:
+        if record.replaced_by_id is not None:
+            _revoke_reused_family(record.user_id)
+        raise RefreshTokenError('刷新令牌已失效')
+    if record.expires_at <= now:
+        raise RefreshTokenError('刷新令牌已过期')
+
+    user = db.session.get(User, record.user_id)
+    if user is None:
+        raise RefreshTokenError('用户不存在')
+
+    table = RefreshToken.__table__
+    claimed = db.session.execute(
+        update(table).where(table.c.id == record.id, table.c.revoked_at.is_(None)).values(revoked_at=now)
+    )
+    if claimed.rowcount != 1:
+        # 读取之后已被其他请求轮换：同一令牌被并发使用
+        _revoke_reused_family(record.user_id)
+        raise RefreshTokenError('刷新令牌已失效')
+
+    tokens, new_record = issue_token_pair(user)
+    db.session.flush()
+    db.session.execute(update(table).where(table.c.id == record.id).values(replaced_by_id=new_record.id))
+    return user, tokens
+
+
+def _revoke_reused_family(user_id):
+    """已轮换的令牌被重复使用：立即吊销并提交该用户的全部刷新令牌"""
+    revoke_refresh_tokens(user_id)
+    db.session.commit()
+    current_app.logger.warning(f'检测到已轮换的刷新令牌被重复使用，已吊销用户{user_id}的全部刷新令牌')
+
+
+def revoke_refresh_token(raw_token):
+    """吊销单个刷新令牌（如登出），需由调用方提交事务"""
+    record = find_refresh_token(raw_token)
+    if record is None or record.revoked_at is not None:
+        return False
+    record.revoked_at = datetime.utcnow()
+    return True
+
+
+def revoke_refresh_tokens(user_id, connection=None):
+    """
+    吊销用户的全部刷新令牌
+
+    Args:
+        user_id: 用户ID
+        connection: 在映射器事件中调用时传入当前连接；否则通过会话执行（需由调用方提交事务）
+    """
+    from app.models import RefreshToken
+
+    statement = update(RefreshToken.__table__).where(
+        RefreshToken.__table__.c.user_id == user_id,
+        RefreshToken.__table__.c.revoked_at.is_(None)
+    ).values(revoked_at=datetime.utcnow())
+
+    if connection is not None:
+        connection.execute(statement)
+    else:
+        db.session.execute(statement)
@@ -0,0 +1,408 @@
+# app/reservation_index.py
+"""
+预约冲突索引模块
+按设备在内存中维护活动预约的区间结构，用于快速检测时间冲突。
+索引在首次查询某设备时从数据库加载，之后通过SQLAlchemy会话事件在每次提交后增量更新。
+索引只能看到本进程的提交，因此默认关闭（RESERVATION_INDEX_ENABLED），冲突检测走SQL范围查询；
+仅适用于单进程部署，或同时开启 RESERVATION_INDEX_VERIFY 用SQL结果校验。
+"""
+import bisect
+import heapq
+import math
+import threading
+from collections import namedtuple
+from datetime import timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import db
+
+# 参与冲突检测的预约状态
+ACTIVE_STATUSES = ('approved', 'pending', 'in_progress')
+
+# 会话中待应用到索引的变更（提交后应用，回滚时丢弃）
+_PENDING_KEY = 'reservation_index_pending'
+
+IndexedReservation = namedtuple('IndexedReservation', ['id', 'user_id', 'start_time', 'end_time', 'status'])
+
+
+def to_naive(value):
+    """去掉时间的时区信息（SQLite按字面时间存储和比较，索引需与之保持一致）"""
+    if value is not None and value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    return value
+
+
+class DeviceIntervals:
+    """
+    单个设备的活动预约区间
+
+    按时长分组（第k组的时长不超过2^k秒），组内按开始时间排序。与[s, e)重叠的区间，
+    其开始时间必然落在(s - 组时长上限, e)内，每组一次二分即可定位；组内被扫描但不重叠的区间
+    时长都超过上限的一半，数量有常数上界。组数只与时长的数量级有关，个别很长的预约
+    （多日预约、维护占用）只影响它所在的组，删除后组随之消失。
+    """
+
+    def __init__(self, entries=()):
+        self._groups = {}  # 组号 -> (时长上限, 开始时间列表, 区间列表)
+        for entry in sorted(entries, key=lambda e: e.start_time):
+            self.add(entry)
+
+    @staticmethod
+    def _group_key(entry):
+        seconds = math.ceil((entry.end_time - entry.start_time).total_seconds())
+        return max(seconds - 1, 0).bit_length()
+
+    @property
+    def entries(self):
+        return [entry for _, _, entries in self._groups.values() for entry in entries]
+
+    def __len__(self):
+        return sum(len(entries) for _, _, entries in self._groups.values())
+
+    def add(self, entry):
+        key = self._group_key(entry)
+        if key not in self._groups:
+            self._groups[key] = (timedelta(seconds=2 ** key), [], [])
+        _, starts, entries = self._groups[key]
+        pos = bisect.bisect_right(starts, entry.start_time)
+        starts.insert(pos, entry.start_time)
+        entries.insert(pos, entry)
+
+    def remove(self, reservation_id, start_time):
+        for key, (_, starts, entries) in self._groups.items():
+            pos = bisect.bisect_left(starts, start_time)
+            while pos < len(starts) and starts[pos] == start_time:
+                if entries[pos].id == reservation_id:
+                    del starts[pos]
+                    del entries[pos]
+                    if not entries:
+                        del self._groups[key]
+                    return True
+                pos += 1
+        return False
+
+    def candidates(self, start, end):
+        """各组中开始时间落在(start - 组时长上限, end)内的区间（重叠检测需扫描的范围）"""
+        for bound, starts, entries in self._groups.values():
+            lo = bisect.bisect_right(starts, start - bound)
+            hi = bisect.bisect_left(starts, end)
+            yield entries[lo:hi]
+
+    def overlapping(self, start, end):
+        """返回与[start, end)重叠的区间，按开始时间排序"""
+        found = [e for group in self.candidates(start, end) for e in group if e.end_time > start]
+        found.sort(key=lambda e: e.start_time)
+        return found
+
+
+class ReservationIndex:
+    """按设备划分的预约冲突索引（线程安全）"""
+
+    def __init__(self):
+        self._devices = {}
+        self._locations = {}  # 预约ID -> (设备ID, 开始时间)
+        self._versions = {}  # 设备ID -> 变更计数，用于丢弃与并发提交交错的加载结果
+        self._lock = threading.RLock()
+
+    def find_conflicts(self, device_id, start_time, end_time):
+        """查询设备在[start_time, end_time)内的活动预约"""
+        start_time, end_time = to_naive(start_time), to_naive(end_time)
+        with self._lock:
+            intervals = self._devices.get(device_id)
+        if intervals is None:
+            intervals = self._load(device_id)
+        with self._lock:
+            return intervals.overlapping(start_time, end_time)
+
+    def _load(self, device_id):
+        """从数据库加载设备的活动预约"""
+        from app.models import Reservation
+
+        with self._lock:
+            version = self._versions.get(device_id, 0)
+
+        with db.session.no_autoflush:
+            rows = db.session.query(
+                Reservation.id, Reservation.user_id, Reservation.start_time,
+                Reservation.end_time, Reservation.status
+            ).filter(
+                Reservation.device_id == device_id,
+                Reservation.status.in_(ACTIVE_STATUSES)
+            ).order_by(Reservation.start_time).all()
+        intervals = DeviceIntervals(IndexedReservation(*row) for row in rows)
+
+        # 当前事务中已有未提交的写入时，查询结果可能包含将被回滚的数据，不缓存
+        if db.session.info.get(_PENDING_KEY):
+            return intervals
+
+        with self._lock:
+            if self._versions.get(device_id, 0) == version and device_id not in self._devices:
+                self._devices[device_id] = intervals
+                for entry in intervals.entries:
+                    self._locations[entry.id] = (device_id, entry.start_time)
+            return self._devices.get(device_id, intervals)
+
+    def discard(self, reservation_id):
+        with self._lock:
+            location = self._locations.pop(reservation_id, None)
+            if location is None:
+                return
+            device_id, start_time = location
+            self._versions[device_id] = self._versions.get(device_id, 0) + 1
+            intervals = self._devices.get(device_id)
+            if intervals is not None:
+                intervals.remove(reservation_id, start_time)
+
+    def apply(self, device_id, entry):
+        """应用一条已提交的预约变更"""
+        with self._lock:
+            self.discard(entry.id)
+            self._versions[device_id] = self._versions.get(device_id, 0) + 1
+            intervals = self._devices.get(device_id)
+            # 未加载的设备无需维护，下次查询时会完整加载
+            if intervals is None or entry.status not in ACTIVE_STATUSES:
+                return
+            entry = entry._replace(start_time=to_naive(entry.start_time),
+                                   end_time=to_naive(entry.end_time))
+            intervals.add(entry)
+            self._locations[entry.id] = (device_id, entry.start_time)
+
+    def reset(self):
+        """清空索引（批量更新/删除等无法逐条跟踪的写入后调用）"""
+        with self._lock:
+            self._devices.clear()
+            self._locations.clear()
+            for device_id in self._versions:
+                self._versions[device_id] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'devices': len(self._devices),
+                'reservations': sum(len(i) for i in self._devices.values())
+            }
+
+
+def init_app(app):
+    """为应用创建预约冲突索引"""
+    app.extensions['reservation_index'] = ReservationIndex()
+
+
+def get_reservation_index():
+    """获取当前应用的预约冲突索引，未启用时返回None"""
+    if not has_app_context() or not current_app.config.get('RESERVATION_INDEX_ENABLED', False):
+        return None
+    return current_app.extensions.get('reservation_index')
+
+
+def query_conflicts(device_id, start_time, end_time):
+    """通过SQL范围查询检测冲突（回退/校验路径）"""
+    from app.models import Reservation
+
+    return Reservation.query.filter(
+        Reservation.device_id == device_id,
+        Reservation.status.in_(ACTIVE_STATUSES),
+        Reservation.start_time < end_time,
+        Reservation.end_time > start_time
+    ).all()
+
+
+def find_conflicting_reservations(device_id, start_time, end_time):
+    """
+    检测设备在指定时间段内的冲突预约
+
+    Args:
+        device_id: 设备主键ID
+        start_time: 开始时间
+        end_time: 结束时间
+
+    Returns:
+        list: 冲突的预约及周期规则占用（具有id、user_id、start_time、end_time、status属性）
+    """
+    from app.recurrence import rule_occurrences
+
+    # 周期预约规则按需在窗口内展开
+    occurrences = rule_occurrences([device_id], to_naive(start_time), to_naive(end_time),
+                                   ACTIVE_STATUSES)[device_id]
+
+    index = get_reservation_index()
+    if index is None:
+        return query_conflicts(device_id, start_time, end_time) + occurrences
+
+    conflicts = index.find_conflicts(device_id, start_time, end_time)
+
+    if current_app.config.get('RESERVATION_INDEX_VERIFY'):
+        expected = query_conflicts(device_id, start_time, end_time)
+        if sorted(r.id for r in expected) != sorted(r.id for r in conflicts):
+            current_app.logger.warning(f'预约冲突索引与数据库不一致（设备 {device_id}），已重置索引')
+            index.reset()
+            conflicts = expected
+
+    return conflicts + occurrences
+
+
+def active_reservations_in_window(device_ids, start_time, end_time):
+    """
+    获取多台设备在时间窗口内的活动预约（含周期规则在窗口内展开的占用）
+
+    Args:
+        device_ids: 设备主键ID集合
+        start_time: 窗口开始时间
+        end_time: 窗口结束时间
+
+    Returns:
+        dict: 设备ID -> 按开始时间排序的预约列表
+    """
+    from app.models import Reservation
+    from app.recurrence import rule_occurrences
+
+    start_time, end_time = to_naive(start_time), to_naive(end_time)
+    occurrences = rule_occurrences(device_ids, start_time, end_time, ACTIVE_STATUSES)
+
+    index = get_reservation_index()
+    if index is not None:
+        return {
+            device_id: list(heapq.merge(index.find_conflicts(device_id, start_time, end_time),
+                                        occurrences[device_id], key=lambda r: r.start_time))
+            for device_id in device_ids
+        }
+
+    # 回退路径：一次查询取回所有设备的窗口内预约
+    grouped = {device_id: [] for device_id in device_ids}
+    rows = db.session.query(
+        Reservation.device_id, Reservation.id, Reservation.user_id,
+        Reservation.start_time, Reservation.end_time, Reservation.status
+    ).filter(
+        Reservation.device_id.in_(list(device_ids)),
+        Reservation.status.in_(ACTIVE_STATUSES),
+        Reservation.start_time < end_time,
+        Reservation.end_time > start_time
+    ).order_by(Reservation.device_id, Reservation.start_time).all()
+    for device_id, *fields in rows:
+        grouped[device_id].append(IndexedReservation(*fields))
+    return {
+        device_id: list(heapq.merge(reservations, occurrences[device_id], key=lambda r: r.start_time))
+        for device_id, reservations in grouped.items()
+    }
+
+
+def sweep_conflicts(existing, candidates):
+    """
+    单次扫描检测同一设备上一组候选区间的冲突
+
+    Args:
+        existing: 按开始时间排序的已有预约
+        candidates: 按开始时间排序的候选区间（具有start_time、end_time属性）
+
+    Yields:
+        tuple: (候选区间, 冲突列表)；无冲突的候选区间会参与后续候选区间的检测
+    """
+    open_items = []
+    pos = 0
+    for candidate in candidates:
+        while pos < len(existing) and existing[pos].start_time < candidate.end_time:
+            open_items.append(existing[pos])
+            pos += 1
+        # 候选区间按开始时间递增，已结束的区间不会再与后续候选区间重叠
+        open_items = [item for item in open_items if item.end_time > candidate.start_time]
+        # 较早、较长的候选区间加入的已有预约可能开始于本区间结束之后：保留给后续候选区间，但不算冲突
+        conflicts = [item for item in open_items if item.start_time < candidate.end_time]
+        if not conflicts:
+            open_items.append(candidate)
+        yield candidate, conflicts
+
+
+def free_slots(busy, window_start, window_end, min_duration=None, max_duration=None):
+    """
+    合并扫描已占用区间，计算窗口内的空闲时段
+
+    Args:
+        busy: 按开始时间排序的占用区间（具有start_time、end_time属性）
+        window_start: 窗口开始时间
+        window_end: 窗口结束时间
+        min_duration: 最短空闲时长(timedelta)，更短的空闲时段不返回
+        max_duration: 单个时段的最长时长(timedelta)，更长的空闲时段从头依次切分
+
+    Returns:
+        list: [(开始时间, 结束时间), ...]
+    """
+    slots = []
+    cursor = window_start
+    for item in busy:
+        if item.start_time >= window_end:
+            break
+        if item.start_time > cursor:
+            slots.append((cursor, item.start_time))
+        cursor = max(cursor, item.end_time)
+    if cursor < window_end:
+        slots.append((cursor, window_end))
+
+    if max_duration:
+        split = []
+        for start, end in slots:
+            while end - start > max_duration:
+                split.append((start, start + max_duration))
+                start += max_duration
+            split.append((start, end))
+        slots = split
+
+    if min_duration:
+        slots = [(start, end) for start, end in slots if end - start >= min_duration]
+    return slots
+
+
+# ==================== 会话事件：保持索引与已提交数据一致 ====================
+
+def _snapshot(reservation):
+    return reservation.device_id, IndexedReservation(
+        reservation.id, reservation.user_id, reservation.start_time,
+        reservation.end_time, reservation.status
+    )
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    from app.models import Reservation
+
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Reservation):
+            pending.append(('apply', _snapshot(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, Reservation):
+            pending.append(('discard', obj.id))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_changes(orm_execute_state):
+    from app.models import Reservation
+
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is Reservation:
+            orm_execute_state.session.info.setdefault(_PENDING_KEY, []).append(('reset', None))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not has_app_context():
+        return
+    index = current_app.extensions.get('reservation_index')
+    if index is None:
+        return
+    for action, payload in pending:
+        if action == 'apply':
+            index.apply(*payload)
+        elif action == 'discard':
+            index.discard(payload)
+        else:
+            index.reset()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
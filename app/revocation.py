@@ -0,0 +1,190 @@
+# app/revocation.py
+"""
+令牌吊销模块
+授权完全基于签名令牌中的声明（user_id/username/role），不再逐请求查询用户。
+为使降级、封禁等操作及时生效，在进程内维护吊销列表：
+    - 单个令牌的 jti（如用户登出）
+    - 用户的"令牌失效时间"（角色变更、删除、封禁），早于该时间签发的令牌全部失效
+吊销记录持久化在 token_revocations 表中，各进程按固定间隔增量同步。
+本进程的吊销随事务提交后才加入内存列表，回滚时丢弃，与其他进程同步到的结果一致。
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import db
+
+_PENDING_KEY = 'pending_revocations'
+
+
+def _to_timestamp(value):
+    """数据库中的UTC时间 -> Unix时间戳"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationList:
+    """进程内令牌吊销列表（线程安全）"""
+
+    def __init__(self, sync_interval=5):
+        self.sync_interval = sync_interval
+        self._jtis = {}  # jti -> 记录失效时间戳
+        self._cutoffs = {}  # 用户ID -> (令牌失效时间戳, 记录失效时间戳)
+        self._last_id = 0
+        self._last_sync = None
+        self._lock = threading.Lock()
+
+    def is_revoked(self, payload):
+        """检查令牌载荷是否已被吊销"""
+        jti = payload.get('jti')
+        if jti is not None and jti in self._jtis:
+            return True
+        cutoff = self._cutoffs.get(payload.get('user_id'))
+        return cutoff is not None and payload.get('iat', 0) < cutoff[0]
+
+    def add_jti(self, jti, expires_ts):
+        with self._lock:
+            self._jtis[jti] = expires_ts
+
+    def add_cutoff(self, user_id, cutoff_ts, expires_ts):
+        with self._lock:
+            current = self._cutoffs.get(user_id)
+            if current is None or current[0] < cutoff_ts:
+                self._cutoffs[user_id] = (cutoff_ts, expires_ts)
+
+    def sync(self):
+        """从数据库增量加载新的吊销记录，并清理已过期的条目"""
+        from app.models import TokenRevocation
+
+        now = datetime.utcnow()
+        rows = db.session.query(
+            TokenRevocation.id, TokenRevocation.jti, TokenRevocation.user_id,
+            TokenRevocation.invalid_before, TokenRevocation.expires_at
+        ).filter(
+            TokenRevocation.id > self._last_id,
+            TokenRevocation.expires_at > now
+        ).order_by(TokenRevocation.id).all()
+
+        for row_id, jti, user_id, invalid_before, expires_at in rows:
+            expires_ts = _to_timestamp(expires_at)
+            if jti:
+                self.add_jti(jti, expires_ts)
+            if user_id is not None and invalid_before is not None:
+                self.add_cutoff(user_id, _to_timestamp(invalid_before), expires_ts)
+
+        now_ts = time.time()
+        with self._lock:
+            if rows:
+                self._last_id = max(self._last_id, rows[-1][0])
+            self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now_ts}
+            self._cutoffs = {uid: c for uid, c in self._cutoffs.items() if c[1] > now_ts}
+            self._last_sync = time.monotonic()
+
+    def maybe_sync(self):
+        """距上次同步超过间隔时执行同步；同步失败时沿用内存中的列表"""
+        last_sync = self._last_sync
+        if last_sync is not None and time.monotonic() - last_sync < self.sync_interval:
+            return
+        try:
+            self.sync()
+        except Exception as e:
+            self._last_sync = time.monotonic()
+            current_app.logger.error(f'同步令牌吊销列表失败: {e}')
+
+    def __len__(self):
+        return len(self._jtis) + len(self._cutoffs)
+
+
+def init_app(app):
+    """为应用创建令牌吊销列表"""
+    app.extensions['revocation_list'] = RevocationList(
+        sync_interval=app.config.get('AUTH_REVOCATION_SYNC_INTERVAL', 5)
+    )
+
+
+def get_revocation_list():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('revocation_list')
+
+
+def revoke_token(payload, reason=None):
+    """
+    吊销单个令牌（需由调用方提交事务）
+
+    Args:
+        payload: 已验证的令牌载荷
+        reason: 吊销原因
+    """
+    from app.models import TokenRevocation
+
+    jti = payload.get('jti')
+    if not jti:
+        return False
+
+    expires_at = datetime.fromtimestamp(payload['exp'], timezone.utc).replace(tzinfo=None)
+    db.session.add(TokenRevocation(jti=jti, user_id=payload.get('user_id'), reason=reason, expires_at=expires_at))
+    _queue_revocation(db.session, 'jti', jti, payload['exp'])
+    return True
+
+
+def revoke_user_tokens(user_id, reason=None, connection=None, session=None):
+    """
+    吊销用户当前已签发的全部令牌（访问令牌与刷新令牌）
+
+    Args:
+        user_id: 用户ID
+        reason: 吊销原因
+        connection: 在映射器事件中调用时传入当前连接；否则通过会话写入（需由调用方提交事务）
+        session: 在映射器事件中调用时传入正在 flush 的会话，默认为 db.session
+    """
+    from app.models import TokenRevocation
+    from app.refresh_tokens import revoke_refresh_tokens
+
+    now = datetime.utcnow()
+    max_age = current_app.config.get('AUTH_TOKEN_MAX_AGE', 24 * 3600) if has_app_context() else 24 * 3600
+    values = {
+        'user_id': user_id,
+        'invalid_before': now,
+        'reason': reason,
+        'expires_at': now + timedelta(seconds=max_age),
+        'created_at': now
+    }
+
+    if connection is not None:
+        connection.execute(TokenRevocation.__table__.insert().values(**values))
+    else:
+        db.session.add(TokenRevocation(**values))
+    revoke_refresh_tokens(user_id, connection=connection)
+    _queue_revocation(session or db.session, 'cutoff', user_id, _to_timestamp(now),
+                      _to_timestamp(values['expires_at']))
+
+
+def _queue_revocation(session, kind, *args):
+    """登记吊销，随会话提交后加入内存列表"""
+    session.info.setdefault(_PENDING_KEY, []).append((kind, args))
+
+
+# ==================== 会话事件：提交后生效，回滚时丢弃 ====================
+
+@event.listens_for(Session, 'after_commit')
+def _apply_revocations(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    revocations = get_revocation_list()
+    if revocations is None:
+        return
+    for kind, args in pending:
+        if kind == 'jti':
+            revocations.add_jti(*args)
+        else:
+            revocations.add_cutoff(*args)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_revocations(session):
+    session.info.pop(_PENDING_KEY, None)
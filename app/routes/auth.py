@@ -1,7 +1,13 @@
-from flask import Blueprint, request, jsonify
+import math
+
+from flask import Blueprint, request, jsonify, g, current_app
 from app import db
 from app.models import User
-from app.auth import generate_token, verify_token
+from app.auth import authenticate_token, token_required, admin_required
+from app.revocation import revoke_token, revoke_user_tokens
+from app.passwords import PasswordHasherBusy
+from app.rate_limit import get_login_limiter
+from app.refresh_tokens import RefreshTokenError, issue_token_pair, rotate_refresh_token, revoke_refresh_token
 
 # 创建蓝图对象 - 这行必须存在且正确
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -34,18 +40,23 @@ def register():
 
         # 保存到数据库
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()
 
-        # 生成令牌
-        token = generate_token(user.id)
+        # 生成访问令牌与刷新令牌
+        tokens, _ = issue_token_pair(user)
+        db.session.commit()
 
         return jsonify({
             'success': True,
             'message': '注册成功',
             'user': user.to_dict(),
-            'token': token
+            **tokens
         }), 201
 
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'注册失败: {str(e)}'}), 500
@@ -59,23 +70,77 @@ def login():
     if not data or not all(k in data for k in ['username', 'password']):
         return jsonify({'error': '缺少用户名或密码'}), 400
 
+    # 限流：在查询用户和校验密码之前拒绝超额尝试
+    limiter = get_login_limiter()
+    if limiter is not None:
+        retry_after = limiter.check(str(data['username']), request.remote_addr)
+        if retry_after is not None:
+            return jsonify({'error': '登录尝试过于频繁，请稍后再试'}), 429, {'Retry-After': str(math.ceil(retry_after))}
+
     # 查找用户（支持用户名或邮箱登录）
     user = User.query.filter(
         (User.username == data['username']) |
         (User.email == data['username'])
     ).first()
 
-    if not user or not user.check_password(data['password']):
+    try:
+        valid = user is not None and user.check_password(data['password'])
+    except PasswordHasherBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+
+    if not valid:
         return jsonify({'error': '用户名或密码错误'}), 401
 
-    # 生成令牌
-    token = generate_token(user.id, user.username, user.role)
+    try:
+        # 哈希参数变更后，借登录时的明文密码透明地重新哈希
+        if user.password_needs_rehash():
+            try:
+                user.set_password(data['password'])
+            except PasswordHasherBusy:
+                pass  # 下次登录时再重新哈希
+
+        # 生成访问令牌与刷新令牌
+        tokens, _ = issue_token_pair(user)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'登录失败: {str(e)}'}), 500
+
+    if limiter is not None:
+        limiter.reset_username(str(data['username']))
 
     return jsonify({
         'success': True,
         'message': '登录成功',
         'user': user.to_dict(),
-        'token': token
+        **tokens
+    })
+
+
+@bp.route('/refresh', methods=['POST'])
+def refresh():
+    """刷新令牌接口：用刷新令牌换取新的访问令牌，并轮换刷新令牌"""
+    data = request.get_json()
+    refresh_token = data.get('refresh_token') if data else None
+
+    if not refresh_token:
+        return jsonify({'error': '缺少刷新令牌'}), 400
+
+    try:
+        user, tokens = rotate_refresh_token(refresh_token)
+        db.session.commit()
+    except RefreshTokenError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 401
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'刷新令牌失败: {e}')
+        return jsonify({'error': '刷新令牌失败'}), 500
+
+    return jsonify({
+        'success': True,
+        'user': user.to_dict(),
+        **tokens
     })
 
 
@@ -88,11 +153,11 @@ def verify():
     if not token:
         return jsonify({'error': '缺少令牌'}), 400
 
-    user_id = verify_token(token)
-    if not user_id:
-        return jsonify({'error': '令牌无效或已过期'}), 401
+    principal = authenticate_token(token)
+    if not principal:
+        return jsonify({'error': '令牌无效、已过期或已吊销'}), 401
 
-    user = User.query.get(user_id)
+    user = db.session.get(User, principal.id)
     if not user:
         return jsonify({'error': '用户不存在'}), 404
 
@@ -100,4 +165,52 @@ def verify():
         'success': True,
         'message': '令牌有效',
         'user': user.to_dict()
-    })
\ No newline at end of file
+    })
+
+
+@bp.route('/logout', methods=['POST'])
+@token_required
+def logout(current_user):
+    """登出接口：吊销当前访问令牌，以及请求体中提供的刷新令牌"""
+    data = request.get_json(silent=True) or {}
+    try:
+        revoke_token(g.token_payload, reason='用户登出')
+        if data.get('refresh_token'):
+            revoke_refresh_token(data['refresh_token'])
+        db.session.commit()
+        return jsonify({'success': True, 'message': '已登出'})
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'登出失败: {e}')
+        return jsonify({'success': False, 'error': '登出失败'}), 500
+
+
+@bp.route('/revoke', methods=['POST'])
+@admin_required
+def revoke(current_user):
+    """吊销指定用户已签发的全部令牌（如封禁账号，需要管理员权限）"""
+    data = request.get_json() or {}
+    user_id = data.get('user_id')
+    if not isinstance(user_id, int):
+        return jsonify({'success': False, 'error': '缺少或无效的user_id'}), 400
+
+    try:
+        revoke_user_tokens(user_id, reason=data.get('reason') or f'管理员{current_user.username}吊销')
+        db.session.commit()
+        return jsonify({'success': True, 'message': '已吊销该用户的全部令牌'})
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'吊销令牌失败: {e}')
+        return jsonify({'success': False, 'error': '吊销令牌失败'}), 500
+
+
+@bp.route('/login-limits', methods=['GET'])
+@admin_required
+def login_limit_stats(current_user):
+    """获取登录限流计数（需要管理员权限）"""
+    limiter = get_login_limiter()
+    if limiter is None:
+        return jsonify({'success': True, 'enabled': False})
+    return jsonify({'success': True, 'enabled': True, 'stats': limiter.stats()})
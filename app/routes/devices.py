@@ -1,125 +1,239 @@
 from flask import Blueprint, request, jsonify, current_app
 from app import db
-from app.models import Device, User
-from app.auth import verify_token
-from functools import wraps
+from sqlalchemy import func, select
+from werkzeug.datastructures import MultiDict
+from app.models import Device, Reservation, ReservationRule
+from app.auth import token_required, admin_required
+from app.reservation_index import active_reservations_in_window, free_slots, to_naive, ACTIVE_STATUSES
+from app.recurrence import rule_occurrences
+from app.occupancy import bucket_runs, bucket_count, runs_to_bitmap
+from app.pagination import paginate_listing
+from app.count_cache import facet_counts
+from app.fulltext import fulltext_matches
+from app import device_import
+from app.conditional import listing_etag, not_modified_response, record_etag, with_validators
+from app.events import get_event_broker, queue_event, status_event
+import heapq
 import datetime
 
 bp = Blueprint('devices', __name__, url_prefix='/api/devices')
 
 
-# ==================== 权限验证装饰器 ====================
-
-def token_required(f):
-    """验证JWT令牌的装饰器"""
-
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        # 从请求头获取令牌
-        auth_header = request.headers.get('Authorization')
-        if not auth_header:
-            return jsonify({'error': '缺少认证令牌'}), 401
-
-        # 解析Bearer令牌
-        parts = auth_header.split()
-        if len(parts) != 2 or parts[0].lower() != 'bearer':
-            return jsonify({'error': '令牌格式错误，应为: Bearer <token>'}), 401
+# ==================== 设备API接口 ====================
 
-        token = parts[1]
-        user_id = verify_token(token)
-        if not user_id:
-            return jsonify({'error': '令牌无效或已过期'}), 401
+def build_device_query(args):
+    """
+    按请求参数构建设备列表查询（设备列表与分面统计共用）
+
+    Returns:
+        tuple: (查询, 默认排序条件, 筛选条件字典)
+    """
+    # 筛选参数
+    filters = {
+        'status': args.get('status'),
+        'type': args.get('type'),
+        'category': args.get('category'),
+        'location': args.get('location'),
+        'lab_room': args.get('lab_room'),
+        'search': args.get('search')
+    }
+
+    # 构建查询
+    query = Device.query
+
+    # 应用筛选条件
+    if filters['status']:
+        query = query.filter(Device.status == filters['status'])
+    if filters['type']:
+        query = query.filter(Device.device_type == filters['type'])
+    if filters['category']:
+        query = query.filter(Device.category == filters['category'])
+    if filters['location']:
+        query = query.filter(Device.location.contains(filters['location']))
+    if filters['lab_room']:
+        query = query.filter(Device.lab_room == filters['lab_room'])
+
+    # 默认按创建时间倒序；全文检索时按相关度排序
+    order_by = [Device.created_at.desc(), Device.id.desc()]
+    search = filters['search']
+    if search:
+        matches = fulltext_matches('devices_fts', search)
+        if matches is not None:
+            query = query.join(matches, matches.c.rowid == Device.id)
+            order_by.insert(0, matches.c.rank)
+        else:
+            # 全文索引不可用或检索词过短时，回退到多字段模糊搜索
+            search_pattern = f'%{search}%'
+            query = query.filter(
+                (Device.name.ilike(search_pattern)) |
+                (Device.device_id.ilike(search_pattern)) |
+                (Device.description.ilike(search_pattern))
+            )
 
-        # 获取用户并添加到请求上下文
-        user = User.query.get(user_id)
-        if not user:
-            return jsonify({'error': '用户不存在'}), 404
+    return query, order_by, filters
 
-        # 将用户对象传递给被装饰的函数
-        return f(user, *args, **kwargs)
 
-    return decorated
+@bp.route('/', methods=['GET'])
+@token_required
+def get_devices(user):
+    """获取设备列表（支持分页、筛选、搜索）"""
+    try:
+        # 条件请求：设备表没有新的写入时直接返回304
+        etag = listing_etag(['devices'], None)
+        not_modified = not_modified_response(etag)
+        if not_modified:
+            return not_modified
+
+        query, order_by, filters = build_device_query(request.args)
+
+        # 分页查询：支持游标分页与 page/per_page 分页；只查询输出字段（fields=）所需的列
+        try:
+            fields = Device.parse_fields(request.args.get('fields')) or Device.default_fields()
+            columns, serialize = Device.row_serializer(fields)
+            rows, pagination = paginate_listing(query.with_entities(*columns), Device, request.args,
+                                                order_by=order_by, filters=filters)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        return with_validators(jsonify({
+            'success': True,
+            'data': [serialize(row) for row in rows],
+            'pagination': pagination,
+            'filters': filters
+        }), etag)
 
+    except Exception as e:
+        current_app.logger.error(f'获取设备列表失败: {e}')
+        return jsonify({'success': False, 'error': '获取设备列表失败'}), 500
 
-def admin_required(f):
-    """验证管理员权限的装饰器"""
 
-    @wraps(f)
-    def decorated(user, *args, **kwargs):
-        if not user.is_admin():
-            return jsonify({'error': '需要管理员权限'}), 403
-        return f(user, *args, **kwargs)
+@bp.route('/facets', methods=['GET'])
+@token_required
+def get_device_facets(user):
+    """获取设备分面统计（按状态、类型、分类、实验室房间计数，筛选条件与设备列表相同）"""
+    try:
+        query, _, filters = build_device_query(request.args)
+        facets = facet_counts(query, Device, {
+            'status': Device.status,
+            'type': Device.device_type,
+            'category': func.coalesce(Device.category, 'general'),  # 与 to_dict 的默认分类一致
+            'lab_room': Device.lab_room
+        }, filters)
 
-    return decorated
+        return jsonify({
+            'success': True,
+            'data': facets,
+            'filters': filters
+        })
 
+    except Exception as e:
+        current_app.logger.error(f'获取设备分面统计失败: {e}')
+        return jsonify({'success': False, 'error': '获取设备分面统计失败'}), 500
 
-# ==================== 设备API接口 ====================
 
-@bp.route('/', methods=['GET'])
+@bp.route('/occupancy', methods=['GET'])
 @token_required
-def get_devices(user):
-    """获取设备列表（支持分页、筛选、搜索）"""
+def get_occupancy_matrix(user):
+    """获取多台设备的占用网格（设备 × 时间桶）"""
     try:
-        # 分页参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-
-        # 筛选参数
-        status = request.args.get('status')
-        device_type = request.args.get('type')
+        # 时间窗口：默认从今天零点起7天
+        try:
+            window_start = request.args.get('from')
+            window_start = (to_naive(datetime.datetime.fromisoformat(window_start.replace('Z', '+00:00')))
+                            if window_start else
+                            datetime.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0))
+            window_end = request.args.get('to')
+            window_end = (to_naive(datetime.datetime.fromisoformat(window_end.replace('Z', '+00:00')))
+                          if window_end else window_start + datetime.timedelta(days=7))
+        except ValueError:
+            return jsonify({'success': False, 'error': '时间格式错误，应为ISO格式'}), 400
+
+        if window_start >= window_end:
+            return jsonify({'success': False, 'error': '结束时间必须晚于开始时间'}), 400
+
+        max_days = current_app.config.get('AVAILABILITY_MAX_DAYS', 31)
+        if window_end - window_start > datetime.timedelta(days=max_days):
+            return jsonify({'success': False, 'error': f'查询窗口不能超过{max_days}天'}), 400
+
+        bucket_minutes = request.args.get('bucket_minutes', 60, type=int)
+        if bucket_minutes < 15:
+            return jsonify({'success': False, 'error': 'bucket_minutes不能小于15'}), 400
+        bucket = datetime.timedelta(minutes=bucket_minutes)
+
+        output_format = request.args.get('format', 'rle')
+        if output_format not in ('rle', 'bitmap'):
+            return jsonify({'success': False, 'error': 'format必须是rle或bitmap'}), 400
+
+        # 筛选设备
+        lab_room = request.args.get('lab_room')
         category = request.args.get('category')
-        location = request.args.get('location')
-        search = request.args.get('search')
-
-        # 构建查询
-        query = Device.query
+        device_type = request.args.get('type')
 
-        # 应用筛选条件
-        if status:
-            query = query.filter(Device.status == status)
-        if device_type:
-            query = query.filter(Device.device_type == device_type)
+        device_query = Device.query
+        if lab_room:
+            device_query = device_query.filter(Device.lab_room == lab_room)
         if category:
-            query = query.filter(Device.category == category)
-        if location:
-            query = query.filter(Device.location.contains(location))
-        if search:
-            # 多字段搜索
-            search_pattern = f'%{search}%'
-            query = query.filter(
-                (Device.name.ilike(search_pattern)) |
-                (Device.device_id.ilike(search_pattern)) |
-                (Device.description.ilike(search_pattern))
-            )
-
-        # 排序（默认按创建时间倒序）
-        query = query.order_by(Device.created_at.desc())
-
-        # 分页查询
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-        devices = pagination.items
+            device_query = device_query.filter(Device.category == category)
+        if device_type:
+            device_query = device_query.filter(Device.device_type == device_type)
+
+        max_devices = current_app.config.get('OCCUPANCY_MAX_DEVICES', 1000)
+        devices = device_query.with_entities(
+            Device.id, Device.device_id, Device.name, Device.status, Device.lab_room
+        ).order_by(Device.id).limit(max_devices + 1).all()
+        if len(devices) > max_devices:
+            return jsonify({'success': False, 'error': f'设备数量超过{max_devices}台，请缩小筛选范围'}), 400
+
+        # 一次分组查询取回所有设备的窗口内活动预约（按设备、开始时间排序）
+        busy = {d.id: [] for d in devices}
+        if devices:
+            rows = db.session.query(
+                Reservation.device_id, Reservation.start_time, Reservation.end_time
+            ).filter(
+                Reservation.device_id.in_(device_query.with_entities(Device.id).scalar_subquery()),
+                Reservation.status.in_(ACTIVE_STATUSES),
+                Reservation.start_time < window_end,
+                Reservation.end_time > window_start
+            ).order_by(Reservation.device_id, Reservation.start_time).all()
+            for device_id, start_time, end_time in rows:
+                busy[device_id].append((start_time, end_time))
+
+            occurrences = rule_occurrences(busy.keys(), window_start, window_end, ACTIVE_STATUSES)
+            for device_id, items in occurrences.items():
+                if items:
+                    busy[device_id] = list(heapq.merge(
+                        busy[device_id], [(o.start_time, o.end_time) for o in items]))
+
+        total = bucket_count(window_start, window_end, bucket)
+        occupancy = {}
+        for device_id, intervals in busy.items():
+            runs = bucket_runs(intervals, window_start, window_end, bucket)
+            occupancy[device_id] = runs_to_bitmap(runs, total) if output_format == 'bitmap' else runs
 
         return jsonify({
             'success': True,
-            'data': [device.to_dict() for device in devices],
-            'pagination': {
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'total': pagination.total,
-                'pages': pagination.pages
+            'data': {
+                'from': window_start.isoformat(),
+                'to': window_end.isoformat(),
+                'bucket_minutes': bucket_minutes,
+                'buckets': total,
+                'format': output_format,
+                'devices': [
+                    {'id': d.id, 'device_id': d.device_id, 'name': d.name, 'status': d.status, 'lab_room': d.lab_room}
+                    for d in devices
+                ],
+                'occupancy': [occupancy[d.id] for d in devices]
             },
             'filters': {
-                'status': status,
-                'type': device_type,
+                'lab_room': lab_room,
                 'category': category,
-                'location': location,
-                'search': search
+                'type': device_type
             }
         })
 
     except Exception as e:
-        current_app.logger.error(f'获取设备列表失败: {e}')
-        return jsonify({'success': False, 'error': '获取设备列表失败'}), 500
+        current_app.logger.error(f'获取设备占用网格失败: {e}')
+        return jsonify({'success': False, 'error': '获取设备占用网格失败'}), 500
 
 
 @bp.route('/<int:device_id>', methods=['GET'])
@@ -128,17 +242,23 @@ def get_device(user, device_id):
     """获取单个设备详情"""
     try:
         device = Device.query.get_or_404(device_id)
-        return jsonify({
+
+        # 条件请求：设备未修改时直接返回304
+        etag = record_etag(device)
+        not_modified = not_modified_response(etag, device.updated_at)
+        if not_modified:
+            return not_modified
+
+        return with_validators(jsonify({
             'success': True,
             'data': device.to_dict(detail=True)
-        })
+        }), etag, device.updated_at)
     except Exception as e:
         current_app.logger.error(f'获取设备详情失败: {e}')
         return jsonify({'success': False, 'error': '设备不存在'}), 404
 
 
 @bp.route('/', methods=['POST'])
-@token_required
 @admin_required
 def create_device(user):
     """创建设备（管理员权限）"""
@@ -182,14 +302,11 @@ def create_device(user):
             device.technical_parameters = data['technical_parameters']
 
         # 处理日期字段
-        date_fields = ['purchase_date', 'last_maintenance']
-        for date_field in date_fields:
-            if date_field in data and data[date_field]:
-                try:
-                    setattr(device, date_field,
-                            datetime.datetime.fromisoformat(data[date_field].replace('Z', '+00:00')))
-                except ValueError:
-                    return jsonify({'success': False, 'error': f'{date_field}日期格式错误，应为ISO格式'}), 400
+        try:
+            for date_field, value in device_import.parse_device_dates(data).items():
+                setattr(device, date_field, value)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
 
         # 保存到数据库
         db.session.add(device)
@@ -209,8 +326,87 @@ def create_device(user):
         return jsonify({'success': False, 'error': '创建设备失败'}), 500
 
 
+def _import_format(upload):
+    """导入格式：优先使用 format 参数，其次按文件扩展名或内容类型判断"""
+    import_format = request.args.get('format')
+    if import_format:
+        return import_format if import_format in device_import.IMPORT_FORMATS else None
+    filename = (upload.filename if upload else '') or ''
+    mimetype = upload.mimetype if upload else request.mimetype
+    if filename.endswith('.csv') or mimetype == 'text/csv':
+        return 'csv'
+    if filename.endswith(('.jsonl', '.ndjson')) or mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return 'jsonl'
+    return None
+
+
+@bp.route('/import', methods=['POST'])
+@admin_required
+def import_devices(user):
+    """
+    批量导入设备（管理员权限）
+
+    上传 CSV（首行为字段名）或 JSON Lines 文件（multipart 的 file 字段，或直接作为请求体），
+    逐行校验后分块批量写入，返回逐行错误报告；atomic=true 时有任何错误则全部不写入。
+    """
+    try:
+        upload = request.files.get('file')
+        import_format = _import_format(upload)
+        if import_format is None:
+            return jsonify({'success': False, 'error': '无法识别导入格式，请指定 format=csv 或 format=jsonl'}), 400
+
+        atomic = request.args.get('atomic') == 'true'
+        records = device_import.iter_records(upload.stream if upload else request.stream, import_format)
+        total, created, errors = device_import.import_devices(
+            records, chunk_size=current_app.config.get('DEVICE_IMPORT_CHUNK_SIZE', 500)
+        )
+
+        if not total:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': '导入文件为空'}), 400
+
+        if atomic and errors:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'存在{len(errors)}行错误，未写入任何设备',
+                'total': total,
+                'created': 0,
+                'errors': errors
+            }), 409
+
+        db.session.commit()
+        current_app.logger.info(f'管理员 {user.username} 导入设备: 成功{created}条，失败{len(errors)}条')
+
+        if created == total:
+            status_code = 201
+        elif created:
+            status_code = 207
+        else:
+            status_code = 400
+
+        return jsonify({
+            'success': created == total,
+            'message': f'成功导入{created}台设备，失败{len(errors)}条',
+            'total': total,
+            'created': created,
+            'errors': errors
+        }), status_code
+
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': '导入文件必须是UTF-8编码'}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'导入设备失败: {e}')
+        return jsonify({'success': False, 'error': '导入设备失败'}), 500
+
+
+# 更新设备时可修改的日期字段
+UPDATE_DATE_FIELDS = ['purchase_date', 'last_maintenance', 'next_maintenance']
+
+
 @bp.route('/<int:device_id>', methods=['PUT'])
-@token_required
 @admin_required
 def update_device(user, device_id):
     """更新设备信息（管理员权限）"""
@@ -243,18 +439,16 @@ def update_device(user, device_id):
         if 'technical_parameters' in data:
             device.technical_parameters = data['technical_parameters']
 
-        # 处理日期字段
-        date_fields = ['purchase_date', 'last_maintenance', 'next_maintenance']
-        for date_field in date_fields:
-            if date_field in data and data[date_field] is not None:
-                try:
-                    if data[date_field]:  # 非空字符串
-                        setattr(device, date_field,
-                                datetime.datetime.fromisoformat(data[date_field].replace('Z', '+00:00')))
-                    else:  # 空字符串表示清空
-                        setattr(device, date_field, None)
-                except ValueError:
-                    return jsonify({'success': False, 'error': f'{date_field}日期格式错误，应为ISO格式'}), 400
+        # 处理日期字段（空字符串表示清空，null 不修改）
+        try:
+            dates = device_import.parse_device_dates(
+                {field: data[field] for field in UPDATE_DATE_FIELDS if data.get(field) is not None},
+                UPDATE_DATE_FIELDS, clear_empty=True
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        for date_field, value in dates.items():
+            setattr(device, date_field, value)
 
         # 保存更新
         db.session.commit()
@@ -274,7 +468,6 @@ def update_device(user, device_id):
 
 
 @bp.route('/<int:device_id>', methods=['DELETE'])
-@token_required
 @admin_required
 def delete_device(user, device_id):
     """删除设备（管理员权限）"""
@@ -303,7 +496,6 @@ def delete_device(user, device_id):
 
 
 @bp.route('/<int:device_id>/status', methods=['PUT'])
-@token_required
 @admin_required
 def update_device_status(user, device_id):
     """更新设备状态（管理员权限）"""
@@ -336,6 +528,148 @@ def update_device_status(user, device_id):
         return jsonify({'success': False, 'error': '更新设备状态失败'}), 500
 
 
+# 批量更新允许修改的字段（不含 device_id、serial_number 等唯一列）
+BULK_UPDATE_FIELDS = ['status', 'category', 'location', 'lab_room', 'is_shared', 'max_reservation_hours',
+                      'maintenance_interval', 'responsible_person', 'contact_info']
+BULK_DATE_FIELDS = ['last_maintenance', 'next_maintenance']
+
+
+def bulk_patch_values(patch):
+    """
+    校验批量更新内容
+
+    Returns:
+        dict: UPDATE 的列值（含 updated_at）
+
+    Raises:
+        ValueError: 内容无效
+    """
+    if not isinstance(patch, dict) or not patch:
+        raise ValueError('缺少更新内容 patch')
+    allowed = BULK_UPDATE_FIELDS + BULK_DATE_FIELDS
+    unknown = [field for field in patch if field not in allowed]
+    if unknown:
+        raise ValueError(f'不支持批量更新的字段: {", ".join(unknown)}，可选: {", ".join(allowed)}')
+
+    values = dict(patch)
+    if 'status' in values:
+        Device.validate_status(values['status'])  # 与 update_status 相同的校验规则
+    for field in ('max_reservation_hours', 'maintenance_interval'):
+        if field in values and values[field] is not None and (
+                not isinstance(values[field], int) or isinstance(values[field], bool)):
+            raise ValueError(f'{field} 必须是整数')
+    if 'is_shared' in values and not isinstance(values['is_shared'], bool):
+        raise ValueError('is_shared 必须是布尔值')
+    values.update(device_import.parse_device_dates(patch, BULK_DATE_FIELDS, clear_empty=True))
+
+    values['updated_at'] = datetime.datetime.utcnow()
+    return values
+
+
+@bp.route('/bulk', methods=['PUT'])
+@admin_required
+def bulk_update_devices(user):
+    """
+    批量更新设备（管理员权限）
+
+    请求体指定目标设备（ids 列表，或与设备列表相同的 filter 条件）和 patch，
+    以一条 UPDATE 写入并返回受影响的设备数。状态变为维修或退役时，在同一事务中
+    拒绝这些设备上尚未结束的待审核预约和周期预约规则，并返回仍需处理的已批准预约及规则数。
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'success': False, 'error': '请求数据为空'}), 400
+
+        try:
+            values = bulk_patch_values(data.get('patch'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        # 目标设备：只作为子查询使用，不逐个加载
+        ids = data.get('ids')
+        filters = data.get('filter')
+        if ids:
+            if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+                return jsonify({'success': False, 'error': 'ids 必须是设备ID列表'}), 400
+            target_ids = select(Device.id).where(Device.id.in_(ids))
+        elif isinstance(filters, dict) and filters:
+            query, _, applied = build_device_query(MultiDict(filters))
+            unknown = [name for name in filters if name not in applied]
+            if unknown:
+                return jsonify({'success': False,
+                                'error': f'未知筛选条件: {", ".join(unknown)}，可选: {", ".join(applied)}'}), 400
+            if not any(applied.values()):
+                return jsonify({'success': False, 'error': '筛选条件不能为空'}), 400
+            target_ids = query.with_entities(Device.id).statement
+        else:
+            return jsonify({'success': False, 'error': '必须指定 ids 或 filter'}), 400
+
+        # 先处理预约：筛选条件可能包含将被修改的列（如 status），需在设备更新前求值
+        rejected = approved = 0
+        new_status = values.get('status')
+        # 批量 UPDATE 不经过ORM对象：有事件订阅者时按更新前的状态登记状态事件
+        broker = get_event_broker()
+        publish_events = new_status is not None and broker is not None and len(broker) > 0
+        if new_status in Device.UNRESERVABLE_STATUSES:
+            now = datetime.datetime.utcnow()
+            review = {
+                'status': 'rejected',
+                'reviewed_by': user.id,
+                'reviewed_at': now,
+                'review_notes': f'设备进入{new_status}状态，预约自动拒绝',
+                'updated_at': now
+            }
+            open_reservations = Reservation.query.filter(
+                Reservation.device_id.in_(target_ids),
+                Reservation.end_time > now
+            )
+            open_rules = ReservationRule.query.filter(
+                ReservationRule.device_id.in_(target_ids),
+                ReservationRule.ends_at > now
+            )
+            if publish_events:
+                for row in open_reservations.filter(Reservation.status == 'pending').join(Device).with_entities(
+                        Reservation.id, Reservation.device_id, Reservation.user_id, Device.lab_room):
+                    queue_event(db.session, status_event('reservation', row.device_id, row.lab_room, 'rejected',
+                                                         'pending', reservation_id=row.id, user_id=row.user_id))
+                for row in open_rules.filter(ReservationRule.status == 'pending').join(Device).with_entities(
+                        ReservationRule.id, ReservationRule.device_id, ReservationRule.user_id, Device.lab_room):
+                    queue_event(db.session, status_event('reservation_rule', row.device_id, row.lab_room, 'rejected',
+                                                         'pending', rule_id=row.id, user_id=row.user_id))
+            rejected = open_reservations.filter(Reservation.status == 'pending').update(
+                review, synchronize_session=False)
+            rejected += open_rules.filter(ReservationRule.status == 'pending').update(
+                dict(review, review_notes=f'设备进入{new_status}状态，周期预约自动拒绝'), synchronize_session=False)
+            approved = (open_reservations.filter(Reservation.status == 'approved').count()
+                        + open_rules.filter(ReservationRule.status == 'approved').count())
+
+        if publish_events:
+            for row in Device.query.filter(Device.id.in_(target_ids), Device.status != new_status).with_entities(
+                    Device.id, Device.lab_room, Device.status):
+                queue_event(db.session, status_event('device', row.id, row.lab_room, new_status, row.status))
+
+        affected = Device.query.filter(Device.id.in_(target_ids)).update(values, synchronize_session=False)
+        db.session.commit()
+
+        current_app.logger.info(
+            f'管理员 {user.username} 批量更新设备: {affected}台，字段 {", ".join(sorted(data["patch"]))}'
+        )
+
+        return jsonify({
+            'success': True,
+            'message': f'已更新{affected}台设备',
+            'affected': affected,
+            'rejected_reservations': rejected,
+            'approved_reservations': approved
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'批量更新设备失败: {e}')
+        return jsonify({'success': False, 'error': '批量更新设备失败'}), 500
+
+
 @bp.route('/<int:device_id>/usage', methods=['POST'])
 @token_required
 def record_device_usage(user, device_id):
@@ -367,3 +701,67 @@ def record_device_usage(user, device_id):
         db.session.rollback()
         current_app.logger.error(f'记录设备使用失败: {e}')
         return jsonify({'success': False, 'error': '记录设备使用失败'}), 500
+
+
+@bp.route('/<int:device_id>/availability', methods=['GET'])
+@token_required
+def get_device_availability(user, device_id):
+    """查询设备在时间窗口内的空闲时段"""
+    try:
+        device = Device.query.get(device_id)
+        if not device:
+            return jsonify({'success': False, 'error': '设备不存在'}), 404
+
+        # 时间窗口：默认从当前时间起7天
+        try:
+            window_start = request.args.get('from')
+            window_start = (to_naive(datetime.datetime.fromisoformat(window_start.replace('Z', '+00:00')))
+                            if window_start else datetime.datetime.utcnow())
+            window_end = request.args.get('to')
+            window_end = (to_naive(datetime.datetime.fromisoformat(window_end.replace('Z', '+00:00')))
+                          if window_end else window_start + datetime.timedelta(days=7))
+        except ValueError:
+            return jsonify({'success': False, 'error': '时间格式错误，应为ISO格式'}), 400
+
+        if window_start >= window_end:
+            return jsonify({'success': False, 'error': '结束时间必须晚于开始时间'}), 400
+
+        max_days = current_app.config.get('AVAILABILITY_MAX_DAYS', 31)
+        if window_end - window_start > datetime.timedelta(days=max_days):
+            return jsonify({'success': False, 'error': f'查询窗口不能超过{max_days}天'}), 400
+
+        max_hours = device.max_reservation_hours if device.max_reservation_hours is not None else 4
+        min_hours = request.args.get('min_hours', type=float)
+        if min_hours is not None and not 0 < min_hours <= max_hours:
+            return jsonify({'success': False, 'error': f'min_hours必须大于0且不超过单次最大预约时长({max_hours}小时)'}), 400
+
+        slots = []
+        if device.is_available():
+            # 活动预约与周期预约占用按开始时间有序，合并扫描得到空闲时段；
+            # 超过单次最大预约时长的空闲时段切分为可直接预约的时段
+            busy = active_reservations_in_window([device.id], window_start, window_end)[device.id]
+            min_duration = datetime.timedelta(hours=min_hours) if min_hours else None
+            max_duration = datetime.timedelta(hours=max_hours)
+            for start, end in free_slots(busy, window_start, window_end, min_duration, max_duration):
+                slots.append({
+                    'start_time': start.isoformat(),
+                    'end_time': end.isoformat(),
+                    'hours': round((end - start).total_seconds() / 3600, 2)
+                })
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'device_id': device.id,
+                'status': device.status,
+                'bookable': device.is_available(),
+                'max_reservation_hours': max_hours,
+                'from': window_start.isoformat(),
+                'to': window_end.isoformat(),
+                'slots': slots
+            }
+        })
+
+    except Exception as e:
+        current_app.logger.error(f'查询设备空闲时段失败: {e}')
+        return jsonify({'success': False, 'error': '查询设备空闲时段失败'}), 500
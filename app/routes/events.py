@@ -0,0 +1,91 @@
+import json
+
+from flask import Blueprint, request, jsonify, current_app, g
+from app.auth import authenticate_token
+from app.events import EventBrokerFull, get_event_broker
+
+bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+# 断线后客户端重连的等待时间（毫秒）
+RETRY_MS = 3000
+
+
+def format_event(event_id, item):
+    """编码为一条 SSE 消息"""
+    data = json.dumps(item, ensure_ascii=False, separators=(',', ':'))
+    return f'id: {event_id}\nevent: {item["type"]}\ndata: {data}\n\n'
+
+
+def parse_id_list(value):
+    """解析逗号分隔的设备ID"""
+    try:
+        return {int(v) for v in value.split(',') if v.strip()}
+    except ValueError:
+        raise ValueError('device_id 必须是逗号分隔的设备ID')
+
+
+def stream_events(subscription, heartbeat):
+    """
+    逐条发送事件；空闲 heartbeat 秒发送一次注释行保持连接，并让服务器及时发现已断开的客户端。
+    不使用 stream_with_context：长连接期间不占用请求上下文和数据库会话。
+    """
+    try:
+        yield f'retry: {RETRY_MS}\n: connected\n\n'
+        while True:
+            if subscription.overflowed:
+                # 连接消费过慢已被代理断开：通知客户端重连并增量同步
+                yield 'event: overflow\ndata: {}\n\n'
+                return
+            message = subscription.get(timeout=heartbeat)
+            if message is None:
+                yield ': heartbeat\n\n'
+            else:
+                yield format_event(*message)
+    finally:
+        subscription.close()
+
+
+@bp.route('', methods=['GET'])
+def event_stream():
+    """
+    设备与预约状态事件流（Server-Sent Events）
+
+    可按实验室房间（lab_room）和设备ID（device_id）过滤，均支持逗号分隔的多个值。
+    浏览器的 EventSource 不能设置请求头，因此也接受 access_token 查询参数。
+    普通用户只接收自己的预约和周期预约事件，以及全部设备事件。
+    """
+    user, auth_error = g.current_user, g.auth_error
+    if user is None and request.args.get('access_token'):
+        user = authenticate_token(request.args['access_token'])
+        auth_error = None if user else '令牌无效或已过期'
+    if user is None:
+        return jsonify({'error': auth_error or '缺少认证令牌'}), 401
+
+    try:
+        lab_room = request.args.get('lab_room', '')
+        lab_rooms = {v.strip() for v in lab_room.split(',') if v.strip()}
+        try:
+            device_ids = parse_id_list(request.args.get('device_id', ''))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        broker = get_event_broker()
+        try:
+            # 在返回响应前订阅，连接建立后发生的变化都不会遗漏
+            subscription = broker.subscribe(lab_rooms, device_ids, user_id=None if user.is_admin() else user.id)
+        except EventBrokerFull as e:
+            return jsonify({'success': False, 'error': str(e)}), 503, {'Retry-After': '5'}
+
+        heartbeat = current_app.config.get('EVENT_HEARTBEAT_SECONDS', 15)
+        response = current_app.response_class(
+            stream_events(subscription, heartbeat),
+            mimetype='text/event-stream'
+        )
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # 关闭反向代理的响应缓冲
+        response.call_on_close(subscription.close)  # 客户端在首次读取前断开时生成器不会执行 finally
+        return response
+
+    except Exception as e:
+        current_app.logger.error(f'订阅状态事件失败: {e}')
+        return jsonify({'success': False, 'error': '订阅状态事件失败'}), 500
@@ -1,56 +1,53 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from app import db
-from app.models import Reservation, Device, User
+from app.models import Reservation, ReservationRule, Device
+import csv
+import io
 from datetime import datetime, timezone
-from functools import wraps
-from app.auth import verify_token
+from collections import namedtuple
+from itertools import groupby
+from app.auth import token_required, admin_required
+from app.reservation_index import (
+    find_conflicting_reservations, active_reservations_in_window, sweep_conflicts, to_naive, ACTIVE_STATUSES
+)
+from app.pagination import is_cursor_request, paginate_listing
+from app.fulltext import fulltext_matches
+from app.conditional import listing_etag, not_modified_response, record_etag, with_validators
+from app.recurrence import RecurrenceRule, Occurrence, parse_exdates, active_rules_query
 
 bp = Blueprint('reservations', __name__, url_prefix='/api/reservations')
 
+# 批量预约中的单个候选区间
+BatchItem = namedtuple('BatchItem', ['index', 'device_id', 'start_time', 'end_time', 'data'])
 
-# ==================== 权限验证装饰器 ====================
 
-def token_required(f):
-    """验证JWT令牌的装饰器"""
+def parse_datetime(value):
+    """解析ISO格式时间（兼容末尾的Z）"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
 
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        # 从请求头获取令牌
-        auth_header = request.headers.get('Authorization')
-        if not auth_header:
-            return jsonify({'error': '缺少认证令牌'}), 401
 
-        # 解析Bearer令牌
-        parts = auth_header.split()
-        if len(parts) != 2 or parts[0].lower() != 'bearer':
-            return jsonify({'error': '令牌格式错误，应为: Bearer <token>'}), 401
-
-        token = parts[1]
-        user_id = verify_token(token)
-        if not user_id:
-            return jsonify({'error': '令牌无效或已过期'}), 401
-
-        # 获取用户并添加到请求上下文
-        user = User.query.get(user_id)
-        if not user:
-            return jsonify({'error': '用户不存在'}), 404
-
-        # 将用户对象传递给被装饰的函数
-        return f(user, *args, **kwargs)
-
-    return decorated
-
-
-def admin_required(f):
-    """验证管理员权限的装饰器"""
+def parse_device_id(value):
+    """解析设备主键ID（整数或数字字符串）"""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError('设备ID无效')
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError('设备ID无效')
 
-    @wraps(f)
-    def decorated(user, *args, **kwargs):
-        if not user.is_admin():
-            return jsonify({'error': '需要管理员权限'}), 403
-        return f(user, *args, **kwargs)
 
-    return decorated
+def conflict_to_dict(res):
+    """冲突预约的摘要信息"""
+    info = {
+        'id': res.id,
+        'start_time': res.start_time.isoformat(),
+        'end_time': res.end_time.isoformat(),
+        'user_id': res.user_id,
+        'status': res.status
+    }
+    if getattr(res, 'rule_id', None) is not None:
+        info['rule_id'] = res.rule_id
+    return info
 
 
 # ==================== 预约API接口 ====================
@@ -76,8 +73,13 @@ def create_reservation(user):
         if start_time >= end_time:
             return jsonify({'error': '结束时间必须晚于开始时间'}), 400
 
+        try:
+            device_id = parse_device_id(data['device_id'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         # 检查设备是否存在
-        device = Device.query.get(data['device_id'])
+        device = Device.query.get(device_id)
         if not device:
             return jsonify({'error': '设备不存在'}), 404
 
@@ -86,23 +88,10 @@ def create_reservation(user):
             return jsonify({'error': f'设备当前状态为{device.status}，不可预约'}), 400
 
         # 检查时间冲突
-        conflicting_reservations = Reservation.query.filter(
-            Reservation.device_id == data['device_id'],
-            Reservation.status.in_(['approved', 'pending', 'in_progress']),
-            Reservation.start_time < end_time,
-            Reservation.end_time > start_time
-        ).all()
+        conflicting_reservations = find_conflicting_reservations(device.id, start_time, end_time)
 
         if conflicting_reservations:
-            conflict_info = []
-            for res in conflicting_reservations:
-                conflict_info.append({
-                    'id': res.id,
-                    'start_time': res.start_time.isoformat(),
-                    'end_time': res.end_time.isoformat(),
-                    'user_id': res.user_id,
-                    'status': res.status
-                })
+            conflict_info = [conflict_to_dict(res) for res in conflicting_reservations]
 
             return jsonify({
                 'error': '时间冲突',
@@ -113,7 +102,7 @@ def create_reservation(user):
         # 创建预约对象
         reservation = Reservation(
             user_id=user.id,
-            device_id=data['device_id'],
+            device_id=device.id,
             start_time=start_time,
             end_time=end_time,
             purpose=data['purpose'],
@@ -144,83 +133,276 @@ def create_reservation(user):
         return jsonify({'error': '创建预约失败'}), 500
 
 
-@bp.route('/', methods=['GET'])
+@bp.route('/batch', methods=['POST'])
 @token_required
-def get_reservations(user):
-    """获取预约列表（支持分页、筛选、排序）"""
-    try:
-        # 获取查询参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+def create_reservations_batch(user):
+    """批量创建预约（单次扫描检测冲突，单个事务批量写入）"""
+    data = request.get_json() or {}
+    items = data.get('reservations')
+    atomic = bool(data.get('atomic', False))
 
-        # 筛选参数
-        user_id = request.args.get('user_id', type=int)
-        device_id = request.args.get('device_id', type=int)
-        status = request.args.get('status')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': '缺少预约列表: reservations'}), 400
 
-        # 时间范围
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
+    batch_limit = current_app.config.get('RESERVATION_BATCH_LIMIT', 200)
+    if len(items) > batch_limit:
+        return jsonify({'error': f'单次最多提交{batch_limit}条预约'}), 400
 
-        # 搜索关键词
-        search = request.args.get('search')
+    results = [None] * len(items)
+    candidates = []
 
-        # 构建查询
-        query = Reservation.query
+    # 1. 字段与时间校验
+    required_fields = ['device_id', 'start_time', 'end_time', 'purpose']
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[i] = {'index': i, 'success': False, 'error': '预约数据格式错误'}
+            continue
+
+        missing_fields = [field for field in required_fields if not item.get(field)]
+        if missing_fields:
+            results[i] = {'index': i, 'success': False, 'error': f'缺少必要字段: {", ".join(missing_fields)}'}
+            continue
+
+        try:
+            device_id = parse_device_id(item['device_id'])
+        except ValueError as e:
+            results[i] = {'index': i, 'success': False, 'error': str(e)}
+            continue
+
+        try:
+            start_time = to_naive(parse_datetime(item['start_time']))
+            end_time = to_naive(parse_datetime(item['end_time']))
+        except (ValueError, TypeError, AttributeError) as e:
+            results[i] = {'index': i, 'success': False, 'error': f'时间格式错误: {e}'}
+            continue
 
-        # 权限控制：普通用户只能查看自己的预约
-        if not user.is_admin():
-            query = query.filter(Reservation.user_id == user.id)
-        elif user_id:  # 管理员可以按用户筛选
-            query = query.filter(Reservation.user_id == user_id)
+        if start_time >= end_time:
+            results[i] = {'index': i, 'success': False, 'error': '结束时间必须晚于开始时间'}
+            continue
 
-        # 其他筛选条件
-        if device_id:
-            query = query.filter(Reservation.device_id == device_id)
+        candidates.append(BatchItem(i, device_id, start_time, end_time, item))
 
-        if status:
-            status_list = status.split(',')
-            query = query.filter(Reservation.status.in_(status_list))
-
-        # 时间范围筛选
-        if start_date:
-            start_time = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            query = query.filter(Reservation.start_time >= start_time)
+    try:
+        # 2. 一次查询加载所有涉及的设备
+        device_ids = {c.device_id for c in candidates}
+        devices = {d.id: d for d in Device.query.filter(Device.id.in_(device_ids))} if device_ids else {}
+
+        valid = []
+        for candidate in candidates:
+            device = devices.get(candidate.device_id)
+            if not device:
+                results[candidate.index] = {'index': candidate.index, 'success': False, 'error': '设备不存在'}
+            elif not device.is_available():
+                results[candidate.index] = {'index': candidate.index, 'success': False,
+                                            'error': f'设备当前状态为{device.status}，不可预约'}
+            else:
+                valid.append(candidate)
+
+        # 3. 按设备、开始时间排序后单次扫描：同时检测批内冲突与已有预约冲突
+        accepted = []
+        if valid:
+            valid.sort(key=lambda c: (c.device_id, c.start_time))
+            existing = active_reservations_in_window(
+                {c.device_id for c in valid},
+                min(c.start_time for c in valid),
+                max(c.end_time for c in valid)
+            )
+            for device_id, group in groupby(valid, key=lambda c: c.device_id):
+                for candidate, conflicts in sweep_conflicts(existing[device_id], list(group)):
+                    if not conflicts:
+                        accepted.append(candidate)
+                        continue
+                    results[candidate.index] = {
+                        'index': candidate.index,
+                        'success': False,
+                        'error': '时间冲突',
+                        'conflicts': [
+                            {'batch_index': c.index} if isinstance(c, BatchItem) else conflict_to_dict(c)
+                            for c in conflicts
+                        ]
+                    }
+
+        if atomic and len(accepted) != len(items):
+            for candidate in accepted:
+                results[candidate.index] = {'index': candidate.index, 'success': False,
+                                            'error': '批量预约中存在失败项，未写入'}
+            return jsonify({'success': False, 'created': 0, 'results': results}), 409
+
+        # 4. 单个事务批量写入
+        optional_fields = ['experiment_name', 'research_field', 'course_name']
+        reservations = []
+        for candidate in accepted:
+            reservation = Reservation(
+                user_id=user.id,
+                device_id=candidate.device_id,
+                start_time=candidate.start_time,
+                end_time=candidate.end_time,
+                purpose=candidate.data['purpose'],
+                status='pending'
+            )
+            for field in optional_fields:
+                if field in candidate.data:
+                    setattr(reservation, field, candidate.data[field])
+            reservations.append((candidate.index, reservation))
+
+        if reservations:
+            db.session.add_all([reservation for _, reservation in reservations])
+            db.session.commit()
+
+        for index, reservation in reservations:
+            results[index] = {'index': index, 'success': True, 'reservation': reservation.to_dict()}
+
+        created = len(reservations)
+        if created == len(items):
+            status_code = 201
+        elif created:
+            status_code = 207
+        else:
+            status_code = 400
 
-        if end_date:
-            end_time = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            query = query.filter(Reservation.end_time <= end_time)
+        return jsonify({
+            'success': created == len(items),
+            'message': f'成功创建{created}条预约，失败{len(items) - created}条',
+            'created': created,
+            'results': results
+        }), status_code
 
-        # 搜索功能
-        if search:
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'批量创建预约失败: {e}')
+        return jsonify({'error': '批量创建预约失败'}), 500
+
+
+def build_reservation_query(user, args):
+    """
+    根据请求参数构建预约查询（权限范围、筛选条件、全文检索），预约列表与导出共用
+
+    Returns:
+        tuple: (查询, 全文检索子查询或None, 筛选条件字典)
+    """
+    # 筛选参数
+    user_id = args.get('user_id', type=int)
+    device_id = args.get('device_id', type=int)
+    status = args.get('status')
+
+    # 时间范围
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+
+    # 搜索关键词
+    search = args.get('search')
+
+    # 构建查询
+    query = Reservation.query
+
+    # 权限控制：普通用户只能查看自己的预约
+    if not user.is_admin():
+        query = query.filter(Reservation.user_id == user.id)
+    elif user_id:  # 管理员可以按用户筛选
+        query = query.filter(Reservation.user_id == user_id)
+
+    # 其他筛选条件
+    if device_id:
+        query = query.filter(Reservation.device_id == device_id)
+
+    if status:
+        status_list = status.split(',')
+        query = query.filter(Reservation.status.in_(status_list))
+
+    # 时间范围筛选
+    if start_date:
+        query = query.filter(Reservation.start_time >= parse_datetime(start_date))
+
+    if end_date:
+        query = query.filter(Reservation.end_time <= parse_datetime(end_date))
+
+    # 搜索功能：使用全文索引，可与上面的筛选条件组合
+    matches = None
+    if search:
+        matches = fulltext_matches('reservations_fts', search)
+        if matches is not None:
+            query = query.join(matches, matches.c.rowid == Reservation.id)
+        else:
+            # 全文索引不可用或检索词过短时，回退到多字段模糊搜索
             search_pattern = f'%{search}%'
             query = query.filter(
                 (Reservation.purpose.ilike(search_pattern)) |
-                (Reservation.experiment_name.ilike(search_pattern))
+                (Reservation.experiment_name.ilike(search_pattern)) |
+                (Reservation.research_field.ilike(search_pattern)) |
+                (Reservation.course_name.ilike(search_pattern))
             )
 
+    filters = {
+        'scope_user_id': None if user.is_admin() else user.id,
+        'user_id': user_id if user.is_admin() else None,
+        'device_id': device_id, 'status': status, 'start_date': start_date,
+        'end_date': end_date, 'search': search
+    }
+    return query, matches, filters
+
+
+@bp.route('/', methods=['GET'])
+@token_required
+def get_reservations(user):
+    """获取预约列表（支持分页、筛选、排序）"""
+    try:
+        # 条件请求：预约和周期预约规则都没有新的写入时直接返回304（普通用户只能看到自己的预约）
+        etag = listing_etag(['reservations', 'reservation_rules'], None if user.is_admin() else user.id)
+        not_modified = not_modified_response(etag)
+        if not_modified:
+            return not_modified
+
+        query, matches, filters = build_reservation_query(user, request.args)
+        user_id = request.args.get('user_id', type=int)
+        device_id = filters['device_id']
+        status = filters['status']
+        start_date = filters['start_date']
+        end_date = filters['end_date']
+        search = filters['search']
+
         # 排序：默认按创建时间倒序
         sort_by = request.args.get('sort_by', 'created_at')
         sort_order = request.args.get('sort_order', 'desc')
 
+        if is_cursor_request(request.args) and sort_by != 'created_at':
+            return jsonify({'success': False, 'error': '游标分页仅支持按created_at排序'}), 400
+
+        sort_column = getattr(Reservation, sort_by)
         if sort_order == 'asc':
-            query = query.order_by(getattr(Reservation, sort_by).asc())
+            order_by = [sort_column.asc(), Reservation.id.asc()]
         else:
-            query = query.order_by(getattr(Reservation, sort_by).desc())
-
-        # 分页查询
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-        reservations = pagination.items
+            order_by = [sort_column.desc(), Reservation.id.desc()]
+
+        # 全文检索且未指定排序字段时按相关度排序
+        if matches is not None and 'sort_by' not in request.args:
+            order_by.insert(0, matches.c.rank)
+
+        # 分页查询：支持游标分页与 page/per_page 分页；只查询输出字段（fields=）所需的列
+        try:
+            fields = Reservation.parse_fields(request.args.get('fields')) or Reservation.default_fields(detail=True)
+            columns, serialize = Reservation.row_serializer(fields)
+            rows, pagination = paginate_listing(
+                query.with_entities(*columns), Reservation, request.args, order_by,
+                filters=filters, descending=sort_order != 'asc'
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        # 周期预约：仅在指定了时间窗口时按窗口展开
+        occurrences = None
+        if start_date and end_date and request.args.get('include_recurring', 'true') != 'false':
+            occurrences = expand_recurring_reservations(
+                user, to_naive(parse_datetime(start_date)), to_naive(parse_datetime(end_date)),
+                user_id=user_id, device_id=device_id,
+                statuses=status.split(',') if status else ACTIVE_STATUSES,
+                search=search
+            )
 
-        return jsonify({
+        return with_validators(jsonify({
             'success': True,
-            'data': [res.to_dict(detail=True) for res in reservations],
-            'pagination': {
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'total': pagination.total,
-                'pages': pagination.pages
-            },
+            'data': [serialize(row) for row in rows],
+            'occurrences': occurrences,
+            'pagination': pagination,
             'filters': {
                 'user_id': user_id,
                 'device_id': device_id,
@@ -231,13 +413,330 @@ def get_reservations(user):
                 'sort_by': sort_by,
                 'sort_order': sort_order
             }
-        })
+        }), etag)
 
     except Exception as e:
         current_app.logger.error(f'获取预约列表失败: {e}')
         return jsonify({'success': False, 'error': '获取预约列表失败'}), 500
 
 
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'reservations.ndjson'),
+    'csv': ('text/csv', 'reservations.csv'),
+}
+
+
+def _export_chunks(rows, serialize, fields, export_format, batch_size):
+    """将查询结果按批编码为 NDJSON 行或 CSV 行"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == 'csv' else None
+    if writer:
+        writer.writerow(fields)
+
+    count = 0
+    for row in rows:
+        item = serialize(row)
+        if writer:
+            writer.writerow(['' if item[name] is None else item[name] for name in fields])
+        else:
+            buffer.write(current_app.json.dumps(item, separators=(',', ':')))
+            buffer.write('\n')
+        count += 1
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@bp.route('/export', methods=['GET'])
+@token_required
+def export_reservations(user):
+    """
+    流式导出预约（format=ndjson|csv）
+
+    筛选参数与权限范围与预约列表相同，支持 fields= 选择导出字段；按ID顺序以服务端游标
+    分批读取并写出，内存占用与导出行数无关。
+    """
+    try:
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'success': False, 'error': f'不支持的导出格式: {export_format}，可选: ndjson, csv'}), 400
+
+        try:
+            fields = Reservation.parse_fields(request.args.get('fields')) or Reservation.default_fields(detail=True)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        query, _, _ = build_reservation_query(user, request.args)
+        columns, serialize = Reservation.row_serializer(fields)
+        batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+        rows = query.with_entities(*columns).order_by(Reservation.id).yield_per(batch_size)
+
+        def generate():
+            try:
+                yield from _export_chunks(rows, serialize, fields, export_format, batch_size)
+            except Exception as e:
+                # 响应已开始发送，无法再返回错误状态码，只能记录日志并截断输出
+                current_app.logger.error(f'导出预约失败: {e}')
+
+        mimetype, filename = EXPORT_FORMATS[export_format]
+        return Response(stream_with_context(generate()), mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+    except Exception as e:
+        current_app.logger.error(f'导出预约失败: {e}')
+        return jsonify({'success': False, 'error': '导出预约失败'}), 500
+
+
+# ==================== 周期预约 ====================
+
+def expand_recurring_reservations(user, window_start, window_end, user_id=None, device_id=None,
+                                  statuses=ACTIVE_STATUSES, search=None):
+    """将窗口内的周期预约规则展开为具体占用（与预约列表相同的权限和筛选条件）"""
+    query = active_rules_query(window_start, window_end, statuses)
+
+    if not user.is_admin():
+        query = query.filter(ReservationRule.user_id == user.id)
+    elif user_id:
+        query = query.filter(ReservationRule.user_id == user_id)
+
+    if device_id:
+        query = query.filter(ReservationRule.device_id == device_id)
+
+    if search:
+        search_pattern = f'%{search}%'
+        query = query.filter(
+            (ReservationRule.purpose.ilike(search_pattern)) |
+            (ReservationRule.experiment_name.ilike(search_pattern)) |
+            (ReservationRule.research_field.ilike(search_pattern)) |
+            (ReservationRule.course_name.ilike(search_pattern))
+        )
+
+    occurrences = []
+    for rule in query.all():
+        for occurrence in rule.occurrences(window_start, window_end):
+            occurrences.append({
+                'rule_id': rule.id,
+                'user_id': rule.user_id,
+                'device_id': rule.device_id,
+                'start_time': occurrence.start_time.isoformat(),
+                'end_time': occurrence.end_time.isoformat(),
+                'purpose': rule.purpose,
+                'status': rule.status,
+                'recurring': True
+            })
+    occurrences.sort(key=lambda o: o['start_time'])
+    return occurrences
+
+
+@bp.route('/recurring', methods=['POST'])
+@token_required
+def create_recurring_reservation(user):
+    """创建周期预约规则（按规则整体检测冲突，不物化每次预约）"""
+    data = request.get_json() or {}
+
+    required_fields = ['device_id', 'start_time', 'end_time', 'rrule', 'purpose']
+    missing_fields = [field for field in required_fields if not data.get(field)]
+    if missing_fields:
+        return jsonify({'error': f'缺少必要字段: {", ".join(missing_fields)}'}), 400
+
+    try:
+        # 首次占用的时间段
+        dtstart = to_naive(parse_datetime(data['start_time']))
+        first_end = to_naive(parse_datetime(data['end_time']))
+        if dtstart >= first_end:
+            return jsonify({'error': '结束时间必须晚于开始时间'}), 400
+        duration = first_end - dtstart
+
+        recurrence = RecurrenceRule.parse(data['rrule'])
+        exdates = parse_exdates(data.get('exdates'))
+        ends_at = recurrence.last_end(dtstart, duration)
+    except (ValueError, TypeError, AttributeError) as e:
+        return jsonify({'error': f'重复规则或时间格式错误: {e}'}), 400
+
+    try:
+        device = Device.query.get(data['device_id'])
+        if not device:
+            return jsonify({'error': '设备不存在'}), 404
+
+        if not device.is_available():
+            return jsonify({'error': f'设备当前状态为{device.status}，不可预约'}), 400
+
+        # 展开全部占用，与已有预约及其他周期规则单次扫描检测冲突
+        candidates = [
+            Occurrence(None, None, user.id, start, end, 'pending')
+            for start, end in recurrence.between(dtstart, duration, dtstart, ends_at, set(exdates))
+        ]
+        existing = active_reservations_in_window([device.id], dtstart, ends_at)[device.id]
+
+        conflict_info = []
+        for candidate, conflicts in sweep_conflicts(existing, candidates):
+            for res in conflicts:
+                info = conflict_to_dict(res)
+                info['occurrence_start'] = candidate.start_time.isoformat()
+                conflict_info.append(info)
+
+        if conflict_info:
+            return jsonify({
+                'error': '时间冲突',
+                'message': '周期预约的部分时间段内设备已被预约',
+                'conflicts': conflict_info
+            }), 409
+
+        rule = ReservationRule(
+            user_id=user.id,
+            device_id=device.id,
+            rrule=data['rrule'].strip(),
+            dtstart=dtstart,
+            duration_minutes=int(duration.total_seconds() // 60),
+            ends_at=ends_at,
+            exdates=[d.isoformat() for d in exdates],
+            purpose=data['purpose'],
+            status='pending'
+        )
+
+        optional_fields = ['experiment_name', 'research_field', 'course_name']
+        for field in optional_fields:
+            if field in data:
+                setattr(rule, field, data[field])
+
+        db.session.add(rule)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': f'周期预约创建成功（共{len(candidates)}次），等待审核',
+            'rule': rule.to_dict(),
+            'occurrence_count': len(candidates)
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'创建周期预约失败: {e}')
+        return jsonify({'error': '创建周期预约失败'}), 500
+
+
+@bp.route('/recurring', methods=['GET'])
+@token_required
+def get_recurring_reservations(user):
+    """获取周期预约规则列表"""
+    try:
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+        device_id = request.args.get('device_id', type=int)
+        status = request.args.get('status')
+
+        query = ReservationRule.query
+        if not user.is_admin():
+            query = query.filter(ReservationRule.user_id == user.id)
+        if device_id:
+            query = query.filter(ReservationRule.device_id == device_id)
+        if status:
+            query = query.filter(ReservationRule.status.in_(status.split(',')))
+
+        pagination = query.order_by(ReservationRule.created_at.desc()).paginate(
+            page=page, per_page=per_page, error_out=False)
+
+        return jsonify({
+            'success': True,
+            'data': [rule.to_dict() for rule in pagination.items],
+            'pagination': {
+                'page': pagination.page,
+                'per_page': pagination.per_page,
+                'total': pagination.total,
+                'pages': pagination.pages
+            }
+        })
+
+    except Exception as e:
+        current_app.logger.error(f'获取周期预约列表失败: {e}')
+        return jsonify({'success': False, 'error': '获取周期预约列表失败'}), 500
+
+
+@bp.route('/recurring/<int:rule_id>/status', methods=['PUT'])
+@admin_required
+def update_recurring_status(user, rule_id):
+    """审核周期预约规则（管理员权限）"""
+    try:
+        rule = ReservationRule.query.get_or_404(rule_id)
+        data = request.get_json()
+
+        if not data or 'status' not in data:
+            return jsonify({'success': False, 'error': '缺少状态字段'}), 400
+
+        new_status = data['status']
+        if new_status not in ('approved', 'rejected'):
+            return jsonify({'success': False, 'error': f'不支持的状态: {new_status}'}), 400
+
+        if rule.status != 'pending':
+            return jsonify({'success': False, 'error': f'只有待审核的周期预约可审核，当前状态: {rule.status}'}), 400
+
+        if new_status == 'approved':
+            device = db.session.get(Device, rule.device_id)
+            if device is None or device.status in Device.UNRESERVABLE_STATUSES:
+                status = device.status if device else '不存在'
+                return jsonify({'success': False, 'error': f'设备当前状态为{status}，不可批准周期预约'}), 400
+
+        rule.status = new_status
+        rule.reviewed_by = user.id
+        rule.reviewed_at = datetime.now(timezone.utc)
+        rule.review_notes = data.get('notes') or ('周期预约被拒绝' if new_status == 'rejected' else None)
+        rule.updated_at = datetime.now(timezone.utc)
+        db.session.commit()
+
+        current_app.logger.info(f'管理员 {user.username} 更新周期预约状态: {rule.id} -> {new_status}')
+
+        return jsonify({
+            'success': True,
+            'message': f'周期预约状态已更新为 {rule.status}',
+            'data': rule.to_dict()
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'更新周期预约状态失败: {e}')
+        return jsonify({'success': False, 'error': '更新周期预约状态失败'}), 500
+
+
+@bp.route('/recurring/<int:rule_id>', methods=['DELETE'])
+@token_required
+def cancel_recurring_reservation(user, rule_id):
+    """取消周期预约规则（此后的所有占用一并释放）"""
+    try:
+        rule = ReservationRule.query.get_or_404(rule_id)
+
+        if not user.is_admin() and rule.user_id != user.id:
+            return jsonify({'error': '无权取消此周期预约'}), 403
+
+        if rule.status in ['cancelled', 'rejected']:
+            return jsonify({'error': f'当前状态为{rule.status}，不可取消'}), 400
+
+        data = request.get_json(silent=True) or {}
+        reason = data.get('reason', '用户取消')
+
+        rule.status = 'cancelled'
+        rule.cancelled_at = datetime.now(timezone.utc)
+        rule.updated_at = datetime.now(timezone.utc)
+        rule.review_notes = f'取消原因: {reason}'
+        db.session.commit()
+
+        current_app.logger.info(f'用户 {user.username} 取消周期预约: {rule.id}')
+
+        return jsonify({
+            'success': True,
+            'message': '周期预约已取消',
+            'data': rule.to_dict()
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'取消周期预约失败: {e}')
+        return jsonify({'success': False, 'error': '取消周期预约失败'}), 500
+
+
 @bp.route('/<int:reservation_id>', methods=['GET'])
 @token_required
 def get_reservation(user, reservation_id):
@@ -249,10 +748,16 @@ def get_reservation(user, reservation_id):
         if not user.is_admin() and reservation.user_id != user.id:
             return jsonify({'error': '无权查看此预约'}), 403
 
-        return jsonify({
+        # 条件请求：预约未修改时直接返回304
+        etag = record_etag(reservation)
+        not_modified = not_modified_response(etag, reservation.updated_at)
+        if not_modified:
+            return not_modified
+
+        return with_validators(jsonify({
             'success': True,
             'data': reservation.to_dict(detail=True)
-        })
+        }), etag, reservation.updated_at)
 
     except Exception as e:
         current_app.logger.error(f'获取预约详情失败: {e}')
@@ -260,7 +765,6 @@ def get_reservation(user, reservation_id):
 
 
 @bp.route('/<int:reservation_id>/status', methods=['PUT'])
-@token_required
 @admin_required
 def update_reservation_status(user, reservation_id):
     """更新预约状态（管理员权限）"""
@@ -445,7 +949,13 @@ def test():
         'message': '预约API工作正常',
         'endpoints': [
             {'method': 'POST', 'path': '/api/reservations/', 'description': '创建预约'},
+            {'method': 'POST', 'path': '/api/reservations/batch', 'description': '批量创建预约'},
+            {'method': 'POST', 'path': '/api/reservations/recurring', 'description': '创建周期预约'},
+            {'method': 'GET', 'path': '/api/reservations/recurring', 'description': '获取周期预约列表'},
+            {'method': 'PUT', 'path': '/api/reservations/recurring/<id>/status', 'description': '审核周期预约'},
+            {'method': 'DELETE', 'path': '/api/reservations/recurring/<id>', 'description': '取消周期预约'},
             {'method': 'GET', 'path': '/api/reservations/', 'description': '获取预约列表'},
+            {'method': 'GET', 'path': '/api/reservations/export', 'description': '流式导出预约（ndjson/csv）'},
             {'method': 'GET', 'path': '/api/reservations/<id>', 'description': '获取预约详情'},
             {'method': 'PUT', 'path': '/api/reservations/<id>/status', 'description': '更新预约状态'},
             {'method': 'DELETE', 'path': '/api/reservations/<id>', 'description': '取消预约'}
@@ -0,0 +1,53 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.models import Device, Reservation
+from app.auth import token_required
+from app.sync import changes_since, decode_watermark, encode_watermark, tombstones_since
+
+bp = Blueprint('sync', __name__, url_prefix='/api/sync')
+
+
+@bp.route('', methods=['GET'])
+@token_required
+def sync_changes(user):
+    """
+    增量同步：返回水位（since）之后新建、修改和删除的设备与预约
+
+    不带 since 时从头返回全部记录。每张表每次最多返回 SYNC_BATCH_SIZE 条，
+    has_more 为真时客户端应立即用新的 watermark 继续请求。
+    普通用户只同步自己的预约。
+    """
+    try:
+        tables = {'devices': Device, 'reservations': Reservation}
+        try:
+            positions, tombstone_id = decode_watermark(request.args.get('since'), tables)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        limit = current_app.config.get('SYNC_BATCH_SIZE', 500)
+        settle_seconds = current_app.config.get('SYNC_SETTLE_SECONDS', 5)
+
+        result = {}
+        has_more = False
+        for table, model in tables.items():
+            columns, serialize = model.row_serializer(model.default_fields(detail=True))
+            query = model.query.with_entities(*columns)
+            # 权限控制：普通用户只能同步自己的预约
+            if model is Reservation and not user.is_admin():
+                query = query.filter(Reservation.user_id == user.id)
+            rows, more, positions[table] = changes_since(query, model, positions[table], limit, settle_seconds)
+            result[table] = [serialize(row) for row in rows]
+            has_more = has_more or more
+
+        deleted, more, tombstone_id = tombstones_since(tombstone_id, limit)
+
+        return jsonify({
+            'success': True,
+            **result,
+            'deleted': deleted,
+            'watermark': encode_watermark(positions, tombstone_id),
+            'has_more': has_more or more
+        })
+
+    except Exception as e:
+        current_app.logger.error(f'增量同步失败: {e}')
+        return jsonify({'success': False, 'error': '增量同步失败'}), 500
@@ -0,0 +1,121 @@
+# app/sync.py
+"""
+增量同步模块
+客户端保存上次同步返回的水位（watermark），之后只拉取此后新建、修改（含取消、拒绝等状态变化）
+和删除的记录，用很小的响应维护本地副本。
+
+    - 新建与修改：按 (updated_at, id) 键集顺序读取，updated_at 上有索引
+    - 删除：删除设备时在同一事务中写入删除日志（sync_tombstones），按自增ID读取
+    - 水位是对各表读取位置的不透明编码。事务可能在设置 updated_at 之后稍晚才提交，
+      因此水位不越过“当前时间 - SYNC_SETTLE_SECONDS”，最近的变更会在下次同步时重复返回，
+      客户端按ID覆盖即可
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, tuple_
+
+from app.models import Device, SyncTombstone
+
+
+def encode_watermark(positions, tombstone_id):
+    """
+    编码水位
+
+    Args:
+        positions: 表名 -> (updated_at, id) 或 None
+        tombstone_id: 已读取的最后一条删除日志ID
+    """
+    state = {
+        'p': {table: [position[0].isoformat(), position[1]] for table, position in positions.items() if position},
+        't': tombstone_id
+    }
+    raw = json.dumps(state, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_watermark(token, tables):
+    """
+    解码水位，为空时表示首次同步
+
+    Returns:
+        tuple: (表名 -> (updated_at, id) 或 None, 删除日志ID)
+
+    Raises:
+        ValueError: 水位格式错误
+    """
+    if not token:
+        return {table: None for table in tables}, 0
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        positions = {table: None for table in tables}
+        for table, (updated_at, record_id) in state['p'].items():
+            if table not in positions or not isinstance(record_id, int):
+                raise ValueError
+            positions[table] = (datetime.fromisoformat(updated_at), record_id)
+        tombstone_id = state['t']
+        if not isinstance(tombstone_id, int):
+            raise ValueError
+        return positions, tombstone_id
+    except (TypeError, ValueError, KeyError, AttributeError, UnicodeError, json.JSONDecodeError):
+        raise ValueError('无效的同步水位')
+
+
+def changes_since(query, model, position, limit, settle_seconds=5):
+    """
+    读取水位之后新建或修改的记录
+
+    Args:
+        query: 已应用权限范围的查询（可为按列查询，结果需包含 updated_at 与 id）
+        model: 模型类
+        position: 上次读取到的 (updated_at, id)，为None时从头读取
+        limit: 最多返回条数
+        settle_seconds: 水位不越过的最近时间窗口（秒）
+
+    Returns:
+        tuple: (记录, 是否还有更多, 新的读取位置)
+    """
+    key = tuple_(model.updated_at, model.id)
+    query = query.filter(model.updated_at.isnot(None))
+    if position:
+        query = query.filter(key > tuple_(*position))
+    rows = query.order_by(model.updated_at, model.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return rows, False, position
+
+    last = (rows[-1].updated_at, rows[-1].id)
+    settled = (datetime.utcnow() - timedelta(seconds=settle_seconds), 0)
+    if has_more or last <= settled:
+        return rows, has_more, last
+    # 最近的变更之前可能还有未提交的写入：水位停在稳定时间点，下次重复返回这些记录
+    return rows, False, settled if position is None or position < settled else position
+
+
+def tombstones_since(tombstone_id, limit):
+    """
+    读取删除日志
+
+    Returns:
+        tuple: (表名 -> 被删除的ID列表, 是否还有更多, 最后一条日志ID)
+    """
+    entries = SyncTombstone.query.filter(SyncTombstone.id > tombstone_id) \
+        .order_by(SyncTombstone.id).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    deleted = {}
+    for entry in entries:
+        deleted.setdefault(entry.table_name, []).append(entry.record_id)
+    return deleted, has_more, entries[-1].id if entries else tombstone_id
+
+
+# ==================== 映射器事件：删除设备时写入删除日志 ====================
+
+@event.listens_for(Device, 'after_delete')
+def _record_device_tombstone(mapper, connection, target):
+    connection.execute(SyncTombstone.__table__.insert().values(
+        table_name=Device.__tablename__, record_id=target.id, deleted_at=datetime.utcnow()
+    ))
@@ -0,0 +1,93 @@
+"""
+认证开销微基准测试
+
+对比同一个空路由在以下情况下的单次请求耗时，差值即为认证中间件的开销：
+    1. 公开路由（不带令牌）
+    2. 受保护路由，令牌缓存命中
+    3. 受保护路由，禁用缓存（每次解码并验证JWT）
+
+用法:
+    python benchmarks/bench_auth_overhead.py --requests 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import jsonify  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.auth import generate_token, token_required  # noqa: E402
+from app.models import User  # noqa: E402
+from config import Config  # noqa: E402
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+class NoCacheConfig(BenchConfig):
+    AUTH_CACHE_SIZE = 0
+
+
+def build_app(config_class):
+    app = create_app(config_class)
+
+    def public():
+        return jsonify({'ok': True})
+
+    @token_required
+    def protected(user):
+        return jsonify({'ok': True})
+
+    app.add_url_rule('/bench/public', 'bench_public', public)
+    app.add_url_rule('/bench/protected', 'bench_protected', protected)
+
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench', email='bench@test.com', role='student')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.commit()
+        token = generate_token(user.id, user.username, user.role)
+
+    return app, token
+
+
+def measure(client, path, headers, requests):
+    for _ in range(min(100, requests)):
+        client.get(path, headers=headers)
+    begin = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers=headers)
+    return (time.perf_counter() - begin) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='认证开销微基准测试')
+    parser.add_argument('--requests', type=int, default=5000, help='每种情况的请求次数')
+    args = parser.parse_args()
+
+    app, token = build_app(BenchConfig)
+    no_cache_app, no_cache_token = build_app(NoCacheConfig)
+
+    results = [
+        ('公开路由（无认证）', measure(app.test_client(), '/bench/public', {}, args.requests)),
+        ('受保护路由（缓存命中）', measure(app.test_client(), '/bench/protected',
+                                        {'Authorization': f'Bearer {token}'}, args.requests)),
+        ('受保护路由（无缓存）', measure(no_cache_app.test_client(), '/bench/protected',
+                                       {'Authorization': f'Bearer {no_cache_token}'}, args.requests)),
+    ]
+
+    baseline = results[0][1]
+    print('\n' + '=' * 60)
+    print(f'{"场景":<24}{"每请求(μs)":>12}{"认证开销(μs)":>14}')
+    for label, micros in results:
+        print(f'{label:<24}{micros:>12.1f}{micros - baseline:>14.1f}')
+    print('=' * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+预约冲突查询基准测试
+
+在临时SQLite数据库中生成大量预约记录，分别在旧索引结构（单列索引）和
+升级后的复合索引结构下输出 EXPLAIN QUERY PLAN 与查询延迟。
+
+用法:
+    python benchmarks/bench_conflict_query.py --rows 1000000 --devices 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from app import db  # noqa: E402
+from app import models  # noqa: E402,F401  注册模型元数据
+from app.migrations import upgrade_database  # noqa: E402
+
+STATUSES = ['completed'] * 6 + ['cancelled'] * 2 + ['rejected', 'approved', 'pending', 'in_progress']
+BASE_TIME = datetime(2023, 1, 1, 8, 0)
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+CONFLICT_SQL = """
+SELECT id, user_id, start_time, end_time, status FROM reservations
+WHERE device_id = :device_id
+  AND status IN ('approved', 'pending', 'in_progress')
+  AND start_time < :end_time AND end_time > :start_time
+"""
+
+LISTING_SQL = """
+SELECT * FROM reservations
+WHERE device_id = :device_id AND status IN ('approved', 'pending')
+ORDER BY created_at DESC LIMIT 10
+"""
+
+
+def create_legacy_schema(engine):
+    """创建升级前的表结构：device_id/start_time/end_time 各自的单列索引"""
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text('DROP INDEX IF EXISTS ix_reservations_device_status_time'))
+        connection.execute(text('CREATE INDEX ix_reservations_device_id ON reservations (device_id)'))
+
+
+def seed(engine, rows, devices):
+    """批量生成预约数据：每台设备按时间顺序排列、互不重叠的预约"""
+    now = datetime.utcnow().strftime(TIME_FORMAT)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("INSERT INTO users (id, username, email, password_hash, role) "
+                       "VALUES (1, 'bench', 'bench@test.com', 'x', 'student')")
+        cursor.executemany(
+            "INSERT INTO devices (id, device_id, name, device_type, status) VALUES (?, ?, ?, ?, 'available')",
+            [(i, f'BENCH_{i:05d}', f'基准设备{i}', '测试仪器') for i in range(1, devices + 1)]
+        )
+
+        per_device = rows // devices
+        batch = []
+        for device in range(1, devices + 1):
+            cursor_time = BASE_TIME
+            for _ in range(per_device):
+                start = cursor_time + timedelta(hours=random.randint(0, 3))
+                end = start + timedelta(hours=random.randint(1, 4))
+                cursor_time = end
+                batch.append((1, device, start.strftime(TIME_FORMAT), end.strftime(TIME_FORMAT),
+                              '基准测试', random.choice(STATUSES), now, now))
+                if len(batch) >= 50000:
+                    cursor.executemany(
+                        "INSERT INTO reservations (user_id, device_id, start_time, end_time, purpose, "
+                        "status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                    batch.clear()
+        if batch:
+            cursor.executemany(
+                "INSERT INTO reservations (user_id, device_id, start_time, end_time, purpose, "
+                "status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+        raw.commit()
+        cursor.execute('ANALYZE')
+        raw.commit()
+    finally:
+        raw.close()
+    return per_device
+
+
+def explain(connection, sql, params):
+    rows = connection.execute(text('EXPLAIN QUERY PLAN ' + sql), params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def measure(engine, label, devices, per_device, iterations):
+    span_hours = per_device * 4
+    random.seed(42)
+    samples = []
+    for _ in range(iterations):
+        start = BASE_TIME + timedelta(hours=random.randint(0, span_hours))
+        samples.append({
+            'device_id': random.randint(1, devices),
+            'start_time': start.strftime(TIME_FORMAT),
+            'end_time': (start + timedelta(hours=2)).strftime(TIME_FORMAT)
+        })
+
+    print(f'\n--- {label} ---')
+    with engine.connect() as connection:
+        for name, sql in [('冲突检测', CONFLICT_SQL), ('设备预约列表', LISTING_SQL)]:
+            print(f'{name} 查询计划:')
+            for step in explain(connection, sql, samples[0]):
+                print(f'    {step}')
+
+            begin = time.perf_counter()
+            for params in samples:
+                connection.execute(text(sql), params).fetchall()
+            elapsed = time.perf_counter() - begin
+            print(f'{name} 平均延迟: {elapsed / iterations * 1000:.3f} ms ({iterations} 次)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='预约冲突查询基准测试')
+    parser.add_argument('--rows', type=int, default=1000000, help='预约记录数')
+    parser.add_argument('--devices', type=int, default=200, help='设备数量')
+    parser.add_argument('--iterations', type=int, default=2000, help='每种查询的执行次数')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='labmanager_bench_')
+    engine = create_engine('sqlite:///' + os.path.join(workdir, 'bench.db'))
+
+    print(f'生成 {args.rows} 条预约记录（{args.devices} 台设备）...')
+    begin = time.perf_counter()
+    create_legacy_schema(engine)
+    per_device = seed(engine, args.rows, args.devices)
+    print(f'数据生成耗时: {time.perf_counter() - begin:.1f} s')
+
+    measure(engine, '升级前（单列索引）', args.devices, per_device, args.iterations)
+
+    print('\n执行结构升级...')
+    begin = time.perf_counter()
+    upgrade_database(engine)
+    print(f'升级耗时: {time.perf_counter() - begin:.1f} s')
+
+    measure(engine, '升级后（复合索引）', args.devices, per_device, args.iterations)
+    engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
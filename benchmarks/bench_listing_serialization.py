@@ -0,0 +1,129 @@
+"""
+列表序列化基准测试
+
+在临时SQLite数据库中生成设备与预约记录，对比两种列表序列化路径的吞吐量（行/秒）：
+    - ORM路径：查询模型对象，逐个调用 to_dict
+    - 快速路径：只按列查询元组，用预编译的序列化函数转为字典
+两者都以应用的JSON编码器编码，并校验编码结果逐字节一致。
+
+用法:
+    python benchmarks/bench_listing_serialization.py --rows 100000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import db  # noqa: E402
+from app.models import Device, Reservation  # noqa: E402
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+BASE_TIME = datetime(2023, 1, 1, 8, 0)
+
+
+def seed(engine, rows):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("INSERT INTO users (id, username, email, password_hash, role) "
+                       "VALUES (1, 'bench', 'bench@test.com', 'x', 'student')")
+        cursor.executemany(
+            'INSERT INTO devices (device_id, name, device_type, category, status, location, lab_room, '
+            'description, technical_parameters, purchase_date, total_usage_hours, usage_count, is_shared, '
+            'created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            ((f'BENCH-{i:07d}', f'基准设备{i}', rng.choice(['光学仪器', '分离设备', '电子仪器']),
+              rng.choice(['imaging', 'electronics', None]), rng.choice(['available', 'maintenance']),
+              '实验楼', f'A{i % 50:03d}', '设备说明' * 20, json.dumps({'power': i % 7}),
+              (BASE_TIME - timedelta(days=i % 900)).strftime(TIME_FORMAT), round(rng.random() * 100, 2),
+              i % 40, 1, (now - timedelta(seconds=i)).strftime(TIME_FORMAT), now.strftime(TIME_FORMAT))
+             for i in range(rows))
+        )
+        cursor.executemany(
+            'INSERT INTO reservations (user_id, device_id, start_time, end_time, purpose, experiment_name, '
+            'status, created_at, updated_at) VALUES (1, ?, ?, ?, ?, ?, ?, ?, ?)',
+            ((i % rows + 1, (BASE_TIME + timedelta(minutes=30 * i)).strftime(TIME_FORMAT),
+              (BASE_TIME + timedelta(minutes=30 * i + 90)).strftime(TIME_FORMAT), f'基准预约{i}', '光谱分析',
+              rng.choice(['approved', 'completed', 'pending']), (now - timedelta(seconds=i)).strftime(TIME_FORMAT),
+              now.strftime(TIME_FORMAT))
+             for i in range(rows))
+        )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def dumps(data):
+    """与 jsonify 在非调试模式下的编码参数一致"""
+    return json.dumps(data, ensure_ascii=True, sort_keys=True, separators=(',', ':'))
+
+
+def orm_path(engine, model, fields):
+    with Session(engine) as session:
+        return dumps([obj.to_dict(fields=fields) for obj in session.query(model).order_by(model.id)])
+
+
+def fast_path(engine, model, fields):
+    columns, serialize = model.row_serializer(fields)
+    with Session(engine) as session:
+        return dumps([serialize(row) for row in session.query(*columns).order_by(model.id)])
+
+
+def measure(func, rows, repeat):
+    best = None
+    output = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        output = func()
+        elapsed = time.perf_counter() - begin
+        best = elapsed if best is None else min(best, elapsed)
+    return rows / best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列表序列化基准测试')
+    parser.add_argument('--rows', type=int, default=100000, help='设备与预约各生成的记录数')
+    parser.add_argument('--repeat', type=int, default=3, help='每种路径的重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    engine = create_engine(f'sqlite:///{path}')
+    try:
+        db.metadata.create_all(engine)
+        print(f'生成设备与预约各 {args.rows} 条...')
+        seed(engine, args.rows)
+
+        cases = [
+            ('设备列表', Device, Device.default_fields()),
+            ('设备详情字段', Device, Device.default_fields(detail=True)),
+            ('预约列表', Reservation, Reservation.default_fields(detail=True)),
+            ('预约 fields=id,status', Reservation, ('id', 'status')),
+        ]
+
+        print('\n' + '=' * 72)
+        print(f'{"场景":<24}{"ORM(行/秒)":>14}{"快速路径(行/秒)":>18}{"加速比":>10}')
+        for label, model, fields in cases:
+            orm_rate, orm_output = measure(lambda: orm_path(engine, model, fields), args.rows, args.repeat)
+            fast_rate, fast_output = measure(lambda: fast_path(engine, model, fields), args.rows, args.repeat)
+            assert fast_output == orm_output, f'{label}: 快速路径输出与 to_dict 不一致'
+            print(f'{label:<24}{orm_rate:>14,.0f}{fast_rate:>18,.0f}{fast_rate / orm_rate:>9.1f}x')
+        print('=' * 72)
+        print('两种路径的JSON输出逐字节一致')
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+登录吞吐量基准测试
+
+模拟实验课开始时的登录高峰：多个并发线程持续调用 /api/auth/login，
+同时另一个线程请求普通接口，分别统计：
+    1. 登录吞吐量（次/秒）与平均耗时
+    2. 登录高峰期间普通接口的平均/最大耗时（衡量哈希计算对其他请求的挤占）
+
+对比密码校验在请求线程内同步执行与提交到进程池两种方式。
+
+用法:
+    python benchmarks/bench_login_throughput.py --threads 16 --seconds 10
+    python benchmarks/bench_login_throughput.py --method pbkdf2:sha256:600000 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import create_app, db  # noqa: E402
+from app.models import User  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def build_app(db_path, method, workers, users):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        PASSWORD_HASH_METHOD = method
+        PASSWORD_HASH_WORKERS = workers
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        password_hash = app.extensions['password_hasher'].hash('bench')
+        db.session.add_all([
+            User(username=f'bench{i}', email=f'bench{i}@test.com', role='student', password_hash=password_hash)
+            for i in range(users)
+        ])
+        db.session.commit()
+    return app
+
+
+def run(app, threads, seconds, users):
+    stop = threading.Event()
+    login_times = []
+    probe_times = []
+    lock = threading.Lock()
+
+    def login_worker(index):
+        client = app.test_client()
+        local = []
+        while not stop.is_set():
+            begin = time.perf_counter()
+            response = client.post('/api/auth/login', json={'username': f'bench{index % users}', 'password': 'bench'})
+            if response.status_code == 200:
+                local.append(time.perf_counter() - begin)
+        with lock:
+            login_times.extend(local)
+
+    def probe_worker():
+        client = app.test_client()
+        while not stop.is_set():
+            begin = time.perf_counter()
+            client.get('/api/reservations/test')
+            probe_times.append(time.perf_counter() - begin)
+            time.sleep(0.01)
+
+    workers = [threading.Thread(target=login_worker, args=(i,)) for i in range(threads)]
+    workers.append(threading.Thread(target=probe_worker))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    return {
+        'logins_per_sec': len(login_times) / seconds,
+        'login_ms': sum(login_times) / max(len(login_times), 1) * 1000,
+        'probe_avg_ms': sum(probe_times) / max(len(probe_times), 1) * 1000,
+        'probe_max_ms': max(probe_times, default=0) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='登录吞吐量基准测试')
+    parser.add_argument('--threads', type=int, default=16, help='并发登录线程数')
+    parser.add_argument('--seconds', type=float, default=10, help='每种方式的持续时间（秒）')
+    parser.add_argument('--users', type=int, default=50, help='用户数')
+    parser.add_argument('--method', default=Config.PASSWORD_HASH_METHOD, help='密码哈希方法')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='进程池大小')
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    results = []
+    try:
+        for label, workers in [('请求线程内同步', 0), (f'进程池({args.workers})', args.workers)]:
+            app = build_app(db_path, args.method, workers, args.users)
+            results.append((label, run(app, args.threads, args.seconds, args.users)))
+            app.extensions['password_hasher'].shutdown()
+    finally:
+        os.remove(db_path)
+
+    print('\n' + '=' * 72)
+    print(f'哈希方法: {args.method}，并发登录线程: {args.threads}')
+    print(f'{"方式":<16}{"登录/秒":>10}{"登录耗时(ms)":>14}{"探测平均(ms)":>14}{"探测最大(ms)":>14}')
+    for label, r in results:
+        print(f'{label:<16}{r["logins_per_sec"]:>10.1f}{r["login_ms"]:>14.1f}'
+              f'{r["probe_avg_ms"]:>14.1f}{r["probe_max_ms"]:>14.1f}')
+    print('=' * 72)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,4 +10,76 @@ class Config:
     # 数据库配置（SQLite）
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
                               'sqlite:///' + os.path.join(basedir, 'app.db')
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # 密码哈希：算法与参数（werkzeug格式，如 scrypt:32768:8:1 或 pbkdf2:sha256:600000）
+    # 修改后，用户下次登录成功时自动按新参数重新哈希
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_SALT_LENGTH = 16
+
+    # 密码哈希/校验进程池：进程数（0表示在请求线程内同步执行）、
+    # 同时提交的任务上限（默认进程数的4倍）以及等待排队名额的秒数
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = None
+    PASSWORD_HASH_QUEUE_TIMEOUT = 5
+
+    # 登录限流：按用户名和IP的令牌桶（突发次数/每分钟恢复次数），在校验密码之前拒绝超额尝试
+    # LOGIN_LIMIT_STORE 为SQLite文件路径时多个工作进程共享桶状态，为空时保存在进程内
+    LOGIN_RATE_LIMIT_ENABLED = True
+    LOGIN_USERNAME_BURST = 5
+    LOGIN_USERNAME_PER_MINUTE = 5
+    LOGIN_IP_BURST = 30
+    LOGIN_IP_PER_MINUTE = 30
+    LOGIN_LIMIT_STORE = os.environ.get('LOGIN_LIMIT_STORE')
+    LOGIN_LIMIT_MAX_KEYS = 100000
+
+    # 已验证令牌缓存：条目上限与有效期（秒）
+    AUTH_CACHE_SIZE = 10000
+    AUTH_CACHE_TTL = 300
+
+    # 访问令牌有效期（秒）：短期、无状态验证；刷新令牌有效期（秒）：长期、哈希后存库
+    ACCESS_TOKEN_EXPIRES = 300
+    REFRESH_TOKEN_EXPIRES = 30 * 24 * 3600
+
+    # 令牌吊销列表：各进程从数据库同步的间隔（秒），以及吊销记录的保留时长（秒）
+    # 角色变更、删除或封禁用户在本进程立即生效，其他进程最迟在一个同步间隔后生效
+    # 保留时长须不短于曾签发过的访问令牌的最长有效期（含升级前签发的24小时令牌）
+    AUTH_REVOCATION_SYNC_INTERVAL = 5
+    AUTH_TOKEN_MAX_AGE = 24 * 3600
+
+    # 预约冲突检测：默认在写入事务中执行SQL范围查询；单进程部署可开启内存区间索引
+    # 各进程的索引只跟踪本进程的写入，多进程部署开启索引时必须同时开启校验，否则会接受重叠预约
+    RESERVATION_INDEX_ENABLED = os.environ.get('RESERVATION_INDEX_ENABLED', '0') == '1'
+    RESERVATION_INDEX_VERIFY = os.environ.get('RESERVATION_INDEX_VERIFY', '0') == '1'
+
+    # 批量预约单次最大条数
+    RESERVATION_BATCH_LIMIT = 200
+
+    # 空闲时段/占用网格查询的最大窗口（天）
+    AVAILABILITY_MAX_DAYS = 31
+
+    # 列表总数缓存：条目上限、有效期（秒，用于兜底其他进程的写入）
+    # 结果数超过阈值时改为按最近 COUNT_ESTIMATE_SAMPLE 条记录估算（请求参数 exact_total=true 强制精确计数）
+    COUNT_CACHE_SIZE = 1024
+    COUNT_CACHE_TTL = 60
+    COUNT_ESTIMATE_THRESHOLD = 10000
+    COUNT_ESTIMATE_SAMPLE = 10000
+
+    # 占用网格单次最多返回的设备数
+    OCCUPANCY_MAX_DEVICES = 1000
+
+    # 预约导出每批从数据库读取并写出的行数（流式导出，内存占用与总行数无关）
+    EXPORT_BATCH_SIZE = 1000
+
+    # 设备批量导入每条 INSERT 写入的行数
+    DEVICE_IMPORT_CHUNK_SIZE = 500
+
+    # 增量同步：每张表每次最多返回的记录数；水位不越过最近若干秒（等待稍晚提交的写入）
+    SYNC_BATCH_SIZE = 500
+    SYNC_SETTLE_SECONDS = 5
+
+    # 状态事件流：每个连接最多积压的事件数（写满即断开，客户端重连后增量同步）、
+    # 空闲时的心跳间隔（秒）、最大订阅连接数
+    EVENT_QUEUE_SIZE = 100
+    EVENT_HEARTBEAT_SECONDS = 15
+    EVENT_MAX_SUBSCRIBERS = 100
@@ -19,13 +19,42 @@ api.interceptors.request.use(
   }
 )
 
+// 访问令牌短期有效：过期后用刷新令牌换取新令牌，并发请求共用同一次刷新
+let refreshing = null
+
+const refreshAccessToken = () => {
+  if (!refreshing) {
+    const refreshToken = localStorage.getItem('refresh_token')
+    refreshing = (refreshToken
+      ? axios.post('/api/auth/refresh', { refresh_token: refreshToken })
+      : Promise.reject(new Error('缺少刷新令牌'))
+    ).then((response) => {
+      localStorage.setItem('token', response.data.token)
+      localStorage.setItem('refresh_token', response.data.refresh_token)
+      return response.data.token
+    }).finally(() => {
+      refreshing = null
+    })
+  }
+  return refreshing
+}
+
 // 响应拦截器
 api.interceptors.response.use(
   (response) => response.data,
-  (error) => {
-    if (error.response?.status === 401) {
-      localStorage.removeItem('token')
-      window.location.href = '/login'
+  async (error) => {
+    const original = error.config
+    if (error.response?.status === 401 && original && !original._retried) {
+      original._retried = true
+      try {
+        const token = await refreshAccessToken()
+        original.headers.Authorization = `Bearer ${token}`
+        return api(original)
+      } catch (refreshError) {
+        localStorage.removeItem('token')
+        localStorage.removeItem('refresh_token')
+        window.location.href = '/login'
+      }
     }
     return Promise.reject(error)
   }
@@ -10,6 +10,10 @@ export const useAuthStore = defineStore('auth', () => {
     localStorage.setItem('token', newToken)
   }
 
+  const setRefreshToken = (newToken) => {
+    localStorage.setItem('refresh_token', newToken)
+  }
+
   const setUser = (userData) => {
     user.value = userData
     localStorage.setItem('user', JSON.stringify(userData))
@@ -19,6 +23,7 @@ export const useAuthStore = defineStore('auth', () => {
     token.value = ''
     user.value = null
     localStorage.removeItem('token')
+    localStorage.removeItem('refresh_token')
     localStorage.removeItem('user')
   }
 
@@ -34,6 +39,7 @@ export const useAuthStore = defineStore('auth', () => {
     token,
     user,
     setToken,
+    setRefreshToken,
     setUser,
     logoutUser,
     isAuthenticated,
@@ -0,0 +1,21 @@
+from app import create_app
+from app.migrations import upgrade_database
+
+# 与 init_db.py 不同：本脚本不会删除任何表或数据，可在已有的 app.db 上重复执行
+app = create_app()
+
+with app.app_context():
+    print("=" * 60)
+    print("=== 实验室设备管理系统 - 数据库结构升级 ===")
+    print("=" * 60)
+    print(f"📁 数据库: {app.config['SQLALCHEMY_DATABASE_URI']}")
+
+    print("\n🛠️ 正在检查并升级表结构...")
+    changes = upgrade_database()
+
+    print("\n" + "=" * 60)
+    if changes:
+        print(f"🎉 升级完成，共执行 {len(changes)} 项变更。")
+    else:
+        print("✅ 数据库结构已是最新，无需变更。")
+    print("=" * 60)
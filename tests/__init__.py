@@ -1,7 +1,7 @@
-"""׼ - ʵ豸ϵͳ"""
+"""测试套件 - 实验室设备管理系统"""
 
 def run_all_tests():
-    """в"""
+    """运行所有测试"""
     import unittest
     loader = unittest.TestLoader()
     suite = loader.discover(start_dir='.', pattern='test_*.py')
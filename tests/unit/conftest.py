@@ -0,0 +1,74 @@
+"""单元测试公共夹具：内存数据库应用、测试客户端与认证头"""
+import pytest
+
+from app import create_app, db
+from app.auth import generate_token
+from app.models import User
+from config import Config
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    TESTING = True
+    PASSWORD_HASH_WORKERS = 0
+
+
+@pytest.fixture
+def config_overrides():
+    """测试模块中覆盖此夹具即可为应用追加配置（如 {'EXPORT_BATCH_SIZE': 3}）"""
+    return {}
+
+
+@pytest.fixture
+def make_app():
+    """按追加的配置创建应用并建表"""
+    def factory(**overrides):
+        app = create_app(type('TestConfig', (TestConfig,), overrides))
+        with app.app_context():
+            db.create_all()
+        return app
+    return factory
+
+
+@pytest.fixture
+def app(make_app, config_overrides):
+    return make_app(**config_overrides)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def create_user(app):
+    """创建用户并返回（已脱离会话，可在应用上下文外读取属性）"""
+    def factory(username, role='student', password=None):
+        with app.app_context():
+            user = User(username=username, email=f'{username}@test.com', role=role, password_hash='x')
+            if password:
+                user.set_password(password)
+            db.session.add(user)
+            db.session.commit()
+            db.session.refresh(user)
+            db.session.expunge(user)
+            return user
+    return factory
+
+
+@pytest.fixture
+def auth_headers():
+    """用户的 Bearer 认证头"""
+    def headers(user):
+        return {'Authorization': f'Bearer {generate_token(user.id, user.username, user.role)}'}
+    return headers
+
+
+@pytest.fixture
+def admin(create_user):
+    return create_user('admin', role='admin')
+
+
+@pytest.fixture
+def admin_headers(admin, auth_headers):
+    return auth_headers(admin)
@@ -0,0 +1,46 @@
+"""统一认证中间件单元测试"""
+import pytest
+
+from app.auth import parse_bearer_token
+
+
+def test_parse_bearer_token():
+    assert parse_bearer_token('Bearer abc') == 'abc'
+    assert parse_bearer_token('bearer abc') == 'abc'
+    assert parse_bearer_token('Bearer') is None
+    assert parse_bearer_token('Token abc') is None
+    assert parse_bearer_token('Bearer a b') is None
+    assert parse_bearer_token(None) is None
+
+
+def test_token_and_admin_checks(client, create_user, auth_headers):
+    headers = auth_headers(create_user('mw_student'))
+
+    resp = client.get('/api/reservations/')
+    assert resp.status_code == 401 and resp.get_json()['error'] == '缺少认证令牌'
+
+    resp = client.get('/api/reservations/', headers={'Authorization': 'Token abc'})
+    assert resp.status_code == 401 and '格式错误' in resp.get_json()['error']
+
+    resp = client.get('/api/reservations/', headers={'Authorization': 'Bearer invalid'})
+    assert resp.status_code == 401 and resp.get_json()['error'] == '令牌无效或已过期'
+
+    assert client.get('/api/reservations/', headers=headers).status_code == 200
+    assert client.delete('/api/devices/1', headers=headers).status_code == 403
+    assert client.delete('/api/devices/1').status_code == 401
+
+
+def test_register_returns_usable_token(client):
+    resp = client.post('/api/auth/register', json={
+        'username': 'mw_new', 'email': 'mw_new@test.com', 'password': 'test123'
+    })
+    assert resp.status_code == 201
+    token = resp.get_json()['token']
+
+    assert client.post('/api/auth/verify', json={'token': token}).status_code == 200
+    assert client.get('/api/devices/', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 统一认证中间件测试通过')
@@ -0,0 +1,41 @@
+"""设备空闲时段查询单元测试"""
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Device
+
+
+def test_slots_split_at_max_reservation_hours(app, client, admin_headers):
+    with app.app_context():
+        db.session.add(Device(device_id='AVL-1', name='空闲时段设备', device_type='光学仪器', max_reservation_hours=4))
+        db.session.commit()
+
+    def availability(**params):
+        return client.get('/api/devices/1/availability', headers=admin_headers,
+                          query_string={'from': '2030-01-01T08:00:00', 'to': '2030-01-01T22:00:00', **params})
+
+    # 14小时的空闲时段按单次最大预约时长（4小时）切分
+    data = availability().get_json()['data']
+    assert data['max_reservation_hours'] == 4
+    assert [(slot['start_time'][11:16], slot['end_time'][11:16], slot['hours']) for slot in data['slots']] == [
+        ('08:00', '12:00', 4.0), ('12:00', '16:00', 4.0), ('16:00', '20:00', 4.0), ('20:00', '22:00', 2.0)
+    ]
+    slots = availability(min_hours=3).get_json()['data']['slots']
+    assert [slot['hours'] for slot in slots] == [4.0, 4.0, 4.0]
+    assert availability(min_hours=5).status_code == 400
+
+    # 返回的时段可直接预约
+    slot = slots[0]
+    response = client.post('/api/reservations/', headers=admin_headers, json={
+        'device_id': 1, 'start_time': slot['start_time'], 'end_time': slot['end_time'], 'purpose': '预约空闲时段'
+    })
+    assert response.status_code == 201
+    slots = availability().get_json()['data']['slots']
+    assert slots[0]['start_time'] == datetime(2030, 1, 1, 12).isoformat()
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 设备空闲时段测试通过')
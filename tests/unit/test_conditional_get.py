@@ -0,0 +1,84 @@
+"""条件请求（ETag / Last-Modified）单元测试"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Device, Reservation
+
+
+def test_conditional_get_for_details_and_listings(app, client, admin_headers, create_user, auth_headers):
+    student = create_user('etag_student')
+    with app.app_context():
+        device = Device(device_id='ETG-1', name='条件请求设备', device_type='光学仪器')
+        db.session.add(device)
+        db.session.flush()
+        start = datetime(2030, 1, 1, 9)
+        db.session.add(Reservation(user_id=student.id, device_id=device.id, start_time=start,
+                                   end_time=start + timedelta(hours=1), purpose='条件请求'))
+        db.session.commit()
+    student_headers = auth_headers(student)
+
+    def get(url, headers, etag=None, **params):
+        if etag:
+            headers = dict(headers, **{'If-None-Match': etag})
+        return client.get(url, headers=headers, query_string=params)
+
+    # 设备详情：ETag 与 Last-Modified，未修改时304且不带响应体
+    response = get('/api/devices/1', admin_headers)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert etag.startswith('"devices-1-')
+    assert response.last_modified is not None
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    response = get('/api/devices/1', admin_headers, etag)
+    assert response.status_code == 304 and response.data == b''
+    assert response.headers['ETag'] == etag
+
+    response = client.get('/api/devices/1', headers=dict(
+        admin_headers, **{'If-Modified-Since': 'Wed, 01 Jan 2098 00:00:00 GMT'}))
+    assert response.status_code == 304
+
+    with app.app_context():
+        db.session.get(Device, 1).update_status('maintenance')
+        db.session.commit()
+    response = get('/api/devices/1', admin_headers, etag)
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+
+    # 预约详情：先校验权限再比较ETag
+    response = get('/api/reservations/1', student_headers)
+    etag = response.headers['ETag']
+    assert get('/api/reservations/1', student_headers, etag).status_code == 304
+    other = auth_headers(create_user('etag_other'))
+    assert get('/api/reservations/1', other, etag).status_code == 403
+
+    # 设备列表：表版本号不变时304，写入后失效；不同参数的ETag不同
+    response = get('/api/devices/', admin_headers, status='maintenance')
+    list_etag = response.headers['ETag']
+    assert get('/api/devices/', admin_headers, list_etag, status='maintenance').status_code == 304
+    assert get('/api/devices/', admin_headers, list_etag, status='available').status_code == 200
+
+    with app.app_context():
+        db.session.add(Device(device_id='ETG-2', name='新设备', device_type='光学仪器', status='maintenance'))
+        db.session.commit()
+    response = get('/api/devices/', admin_headers, list_etag, status='maintenance')
+    assert response.status_code == 200 and len(response.get_json()['data']) == 2
+
+    # 预约列表：ETag 区分可见范围，预约写入后失效
+    student_etag = get('/api/reservations/', student_headers).headers['ETag']
+    admin_etag = get('/api/reservations/', admin_headers).headers['ETag']
+    assert student_etag != admin_etag
+    assert get('/api/reservations/', student_headers, student_etag).status_code == 304
+    assert get('/api/reservations/', admin_headers, student_etag).status_code == 200
+
+    with app.app_context():
+        db.session.get(Reservation, 1).status = 'approved'
+        db.session.commit()
+    assert get('/api/reservations/', student_headers, student_etag).status_code == 200
+    assert get('/api/reservations/1', student_headers, etag).status_code == 200
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 条件请求测试通过')
@@ -0,0 +1,63 @@
+"""列表总数缓存单元测试"""
+import pytest
+
+from app import db
+from app.count_cache import normalize_filters
+from app.models import Device
+
+
+@pytest.fixture
+def config_overrides():
+    return {'COUNT_ESTIMATE_THRESHOLD': 20, 'COUNT_ESTIMATE_SAMPLE': 10}
+
+
+def test_normalize_filters():
+    assert normalize_filters({'status': 'pending,approved', 'search': ' 显微镜 ', 'type': None}) == \
+        normalize_filters({'search': '显微镜', 'status': 'approved,pending', 'type': ''})
+
+
+def test_total_cached_until_write_and_estimated_past_threshold(app, client, create_user, auth_headers):
+    headers = auth_headers(create_user('count_user'))
+    with app.app_context():
+        for i in range(10):
+            db.session.add(Device(device_id=f'DEV_COUNT_{i}', name=f'计数设备{i}', device_type='测试仪器',
+                                  status='available' if i % 2 else 'maintenance'))
+        db.session.commit()
+
+    cache = app.extensions['count_cache']
+
+    def pagination(query):
+        response = client.get(f'/api/devices/?{query}', headers=headers)
+        assert response.status_code == 200
+        return response.get_json()['pagination']
+
+    assert pagination('status=available&per_page=2')['total'] == 5
+    assert pagination('status=available&per_page=2&page=2')['total'] == 5
+    assert cache.hits == 1 and cache.misses == 1
+
+    # 提交写入后缓存失效
+    with app.app_context():
+        db.session.add(Device(device_id='DEV_COUNT_NEW', name='新设备', device_type='测试仪器', status='available'))
+        db.session.commit()
+    assert pagination('status=available&per_page=2')['total'] == 6
+
+    # 超过阈值后返回估算值：最近10条中 status=available 占一半
+    with app.app_context():
+        for i in range(30):
+            db.session.add(Device(device_id=f'DEV_BULK_{i}', name=f'批量设备{i}', device_type='测试仪器',
+                                  status='available' if i % 2 else 'maintenance'))
+        db.session.commit()
+
+    result = pagination('per_page=5')
+    assert result['total_is_estimate'] and result['total'] == 41
+    result = pagination('status=available&per_page=5')
+    assert result['total_is_estimate'] and result['total'] == 21
+    result = pagination('status=available&per_page=5&exact_total=true')
+    assert not result['total_is_estimate'] and result['total'] == 21
+    result = pagination('status=maintenance&per_page=5&exact_total=true')
+    assert result == {'page': 1, 'per_page': 5, 'total': 20, 'pages': 4, 'total_is_estimate': False}
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 列表总数缓存测试通过')
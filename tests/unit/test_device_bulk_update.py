@@ -0,0 +1,121 @@
+"""设备批量更新单元测试"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Device, Reservation, ReservationRule
+
+
+def test_bulk_update_by_filter_and_ids(app, client, admin, admin_headers):
+    with app.app_context():
+        for i, lab_room in enumerate(['A101', 'A101', 'A101', 'B202']):
+            db.session.add(Device(device_id=f'BLK-{i}', name=f'批量设备{i}', device_type='光学仪器',
+                                  lab_room=lab_room, category='imaging' if i < 2 else 'general'))
+        db.session.flush()
+        future = datetime.utcnow() + timedelta(days=2)
+        past = datetime.utcnow() - timedelta(days=2)
+        db.session.add_all([
+            Reservation(user_id=admin.id, device_id=1, start_time=future, end_time=future + timedelta(hours=1),
+                        purpose='待审核', status='pending'),
+            Reservation(user_id=admin.id, device_id=2, start_time=future, end_time=future + timedelta(hours=1),
+                        purpose='已批准', status='approved'),
+            Reservation(user_id=admin.id, device_id=3, start_time=past, end_time=past + timedelta(hours=1),
+                        purpose='已过期的待审核', status='pending'),
+            Reservation(user_id=admin.id, device_id=4, start_time=future, end_time=future + timedelta(hours=1),
+                        purpose='其他房间', status='pending'),
+            ReservationRule(user_id=admin.id, device_id=1, rrule='FREQ=WEEKLY', dtstart=future, duration_minutes=60,
+                            ends_at=future + timedelta(days=30), purpose='待审核规则', status='pending'),
+            ReservationRule(user_id=admin.id, device_id=2, rrule='FREQ=WEEKLY', dtstart=future, duration_minutes=60,
+                            ends_at=future + timedelta(days=30), purpose='已批准规则', status='approved'),
+            ReservationRule(user_id=admin.id, device_id=4, rrule='FREQ=WEEKLY', dtstart=future, duration_minutes=60,
+                            ends_at=future + timedelta(days=30), purpose='其他房间规则', status='pending'),
+        ])
+        db.session.commit()
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+    def bulk(body):
+        return client.put('/api/devices/bulk', json=body, headers=admin_headers)
+
+    subscription = app.extensions['event_broker'].subscribe()
+
+    # 按房间整体进入维修：一条 UPDATE，同时拒绝未结束的待审核预约
+    response = bulk({'filter': {'lab_room': 'A101'}, 'patch': {'status': 'maintenance',
+                                                               'next_maintenance': '2030-01-08T00:00:00Z'}})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['affected'] == 3
+    assert body['rejected_reservations'] == 2  # 预约与周期预约规则各一条
+    assert body['approved_reservations'] == 2
+    assert len([s for s in statements if s.startswith('UPDATE devices')]) == 1
+
+    # 批量写入也推送状态事件
+    events = iter(lambda: subscription.get(timeout=0), None)
+    transitions = sorted((item['type'], item['transition']) for _, item in events)
+    assert transitions == [('device', 'available->maintenance')] * 3 + [
+        ('reservation', 'pending->rejected'), ('reservation_rule', 'pending->rejected')]
+    subscription.close()
+
+    with app.app_context():
+        statuses = {d.device_id: d.status for d in Device.query.all()}
+        assert statuses == {'BLK-0': 'maintenance', 'BLK-1': 'maintenance', 'BLK-2': 'maintenance',
+                            'BLK-3': 'available'}
+        assert db.session.get(Device, 1).next_maintenance == datetime(2030, 1, 8)
+        reservations = {r.purpose: r for r in Reservation.query.all()}
+        assert reservations['待审核'].status == 'rejected'
+        assert reservations['待审核'].reviewed_by == admin.id
+        assert reservations['已批准'].status == 'approved'
+        assert reservations['已过期的待审核'].status == 'pending'
+        assert reservations['其他房间'].status == 'pending'
+        rules = {r.purpose: r for r in ReservationRule.query.all()}
+        assert rules['待审核规则'].status == 'rejected' and rules['待审核规则'].reviewed_by == admin.id
+        assert rules['已批准规则'].status == 'approved'
+        assert rules['其他房间规则'].status == 'pending'
+        db.session.add(ReservationRule(user_id=admin.id, device_id=3, rrule='FREQ=WEEKLY', dtstart=future,
+                                       duration_minutes=60, ends_at=future + timedelta(days=30),
+                                       purpose='维修中设备的规则', status='pending'))
+        db.session.commit()
+
+    # 维修或退役设备上的周期预约规则不能再被批准
+    response = client.put('/api/reservations/recurring/4/status', json={'status': 'approved'}, headers=admin_headers)
+    assert response.status_code == 400
+    assert client.put('/api/reservations/recurring/3/status', json={'status': 'approved'},
+                      headers=admin_headers).status_code == 200
+
+    # 列表与总数缓存反映批量写入
+    data = client.get('/api/devices/', query_string={'status': 'maintenance'}, headers=admin_headers).get_json()
+    assert data['pagination']['total'] == 3
+
+    # 按ID更新非状态字段，不影响预约
+    body = bulk({'ids': [1, 4, 99], 'patch': {'is_shared': False, 'max_reservation_hours': 8}}).get_json()
+    assert body['affected'] == 2 and body['rejected_reservations'] == 0
+    with app.app_context():
+        assert db.session.get(Device, 4).max_reservation_hours == 8 and db.session.get(Device, 4).is_shared is False
+        assert Reservation.query.filter_by(purpose='其他房间').one().status == 'pending'
+
+    # 校验：状态规则与 update_status 一致，唯一列和未知条件被拒绝
+    assert bulk({'ids': [1], 'patch': {'status': 'broken'}}).status_code == 400
+    assert bulk({'ids': [1], 'patch': {'device_id': 'X'}}).status_code == 400
+    assert bulk({'ids': [1], 'patch': {'max_reservation_hours': '8'}}).status_code == 400
+    assert bulk({'filter': {'room': 'A101'}, 'patch': {'status': 'available'}}).status_code == 400
+    assert bulk({'filter': {'lab_room': ''}, 'patch': {'status': 'available'}}).status_code == 400
+    assert bulk({'patch': {'status': 'available'}}).status_code == 400
+    assert bulk({'ids': [1], 'patch': {'next_maintenance': '2030-13-01'}}).status_code == 400
+
+    # 批量更新与导入使用同一日期解析：兼容末尾的Z，空值清空
+    assert bulk({'ids': [4], 'patch': {'next_maintenance': '2030-03-01T00:00:00Z'}}).status_code == 200
+    with app.app_context():
+        assert db.session.get(Device, 4).next_maintenance == datetime(2030, 3, 1)
+    assert bulk({'ids': [4], 'patch': {'next_maintenance': ''}}).status_code == 200
+    with app.app_context():
+        assert db.session.get(Device, 4).next_maintenance is None
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 设备批量更新测试通过')
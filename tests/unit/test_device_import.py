@@ -0,0 +1,120 @@
+"""设备批量导入单元测试"""
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Device
+
+
+@pytest.fixture
+def config_overrides():
+    return {'DEVICE_IMPORT_CHUNK_SIZE': 2}
+
+
+def test_device_import_csv_and_jsonl(app, client, admin_headers, create_user, auth_headers):
+    student_headers = auth_headers(create_user('import_student'))
+    with app.app_context():
+        db.session.add(Device(device_id='IMP-OLD', name='已有设备', device_type='光学仪器', serial_number='SN-OLD'))
+        db.session.commit()
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+    csv_body = (
+        'device_id,name,device_type,serial_number,purchase_date,is_shared,max_reservation_hours,technical_parameters\n'
+        'IMP-1,显微镜,光学仪器,SN-1,2024-03-01T00:00:00Z,否,8,"{""倍率"": 100}"\n'
+        'IMP-2,离心机,分离设备,,,,,\n'
+        'IMP-3,缺少类型,,,,,,\n'
+        'IMP-4,日期错误,光学仪器,,2024/03/01,,,\n'
+        'IMP-5,重复序列号,光学仪器,SN-OLD,,,,\n'
+        'IMP-1,文件内重复,光学仪器,,,,,\n'
+        'IMP-6,示波器,电子仪器,SN-6,,,2,\n'
+    )
+    response = client.post('/api/devices/import', headers=admin_headers, content_type='multipart/form-data',
+                           data={'file': (io.BytesIO(('﻿' + csv_body).encode('utf-8')), 'devices.csv')})
+    assert response.status_code == 207
+    body = response.get_json()
+    assert body['total'] == 7 and body['created'] == 3
+    errors = {error['row']: error for error in body['errors']}
+    assert errors[4]['error'] == '缺少必要字段: device_type'
+    assert errors[5]['error'] == 'purchase_date日期格式错误，应为ISO格式'
+    assert errors[6]['error'] == '序列号已存在'
+    assert errors[7]['error'] == '设备编号与第2行重复'
+
+    # 每块一次唯一性查询、一条批量INSERT
+    inserts = [s for s in statements if s.startswith('INSERT INTO devices')]
+    assert len(inserts) == 2  # 第1块写入2行，第2、3块没有可写入的行，第4块写入1行
+    assert len([s for s in statements if s.startswith('SELECT devices.device_id, devices.serial_number')]) == 3
+
+    with app.app_context():
+        device = Device.query.filter_by(device_id='IMP-1').one()
+        assert device.is_shared is False and device.max_reservation_hours == 8
+        assert device.technical_parameters == {'倍率': 100}
+        assert device.purchase_date.year == 2024 and device.category == 'general'
+        assert Device.query.filter_by(device_id='IMP-2').one().max_reservation_hours == 4
+
+    # JSON Lines 请求体；atomic=true 时任一行失败则全部不写入
+    lines = [json.dumps({'device_id': 'JL-1', 'name': '光谱仪', 'device_type': '光学仪器', 'qr_code': 'QR-1'}),
+             '',
+             json.dumps({'device_id': 'JL-2', 'name': '光谱仪2', 'device_type': '光学仪器', 'status': 'broken'}),
+             '{oops']
+    response = client.post('/api/devices/import?atomic=true', headers=admin_headers,
+                           data='\n'.join(lines), content_type='application/x-ndjson')
+    assert response.status_code == 409
+    assert [(e['row'], e['error']) for e in response.get_json()['errors']] == [
+        (3, '状态无效，必须是: available, reserved, in_use, maintenance, retired'), (4, 'JSON格式错误')]
+    with app.app_context():
+        assert Device.query.filter_by(device_id='JL-1').first() is None
+
+    response = client.post('/api/devices/import?format=jsonl', headers=admin_headers, data=lines[0])
+    assert response.status_code == 201 and response.get_json()['created'] == 1
+    response = client.post('/api/devices/import?format=jsonl', headers=admin_headers, data=lines[0])
+    assert response.status_code == 400
+    assert response.get_json()['errors'][0]['error'] == '设备编号已存在'
+
+    # 新导入的设备进入全文索引，列表总数缓存失效
+    data = client.get('/api/devices/', query_string={'search': '示波器'}, headers=admin_headers).get_json()
+    assert [item['device_id'] for item in data['data']] == ['IMP-6']
+    assert client.get('/api/devices/', headers=admin_headers).get_json()['pagination']['total'] == 5
+
+    assert client.post('/api/devices/import', headers=admin_headers, data='x').status_code == 400
+    assert client.post('/api/devices/import?format=csv', headers=admin_headers, data='').status_code == 400
+    assert client.post('/api/devices/import?format=csv', headers=student_headers,
+                       data=csv_body).status_code == 403
+
+
+def test_update_device_shares_date_parsing(app, client, admin_headers):
+    with app.app_context():
+        db.session.add(Device(device_id='UPD-1', name='更新设备', device_type='光学仪器',
+                              next_maintenance=datetime(2030, 1, 1)))
+        db.session.commit()
+
+    def update(data):
+        return client.put('/api/devices/1', json=data, headers=admin_headers)
+
+    # 与导入相同的日期解析：兼容末尾的Z，格式错误返回400
+    assert update({'last_maintenance': '2030-02-01T08:00:00Z'}).status_code == 200
+    response = update({'last_maintenance': 'bad'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'last_maintenance日期格式错误，应为ISO格式'
+
+    # null 不修改，空字符串清空
+    assert update({'next_maintenance': None}).status_code == 200
+    with app.app_context():
+        assert db.session.get(Device, 1).next_maintenance == datetime(2030, 1, 1)
+    assert update({'next_maintenance': ''}).status_code == 200
+    with app.app_context():
+        device = db.session.get(Device, 1)
+        assert device.last_maintenance == datetime(2030, 2, 1, 8)
+        assert device.next_maintenance is None
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 设备批量导入测试通过')
@@ -0,0 +1,138 @@
+"""状态事件流（SSE）单元测试"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.auth import generate_token
+from app.models import Device, Reservation
+
+
+@pytest.fixture
+def config_overrides():
+    return {'EVENT_QUEUE_SIZE': 3, 'EVENT_HEARTBEAT_SECONDS': 0.01, 'EVENT_MAX_SUBSCRIBERS': 3}
+
+
+def parse_message(chunk):
+    """解析一条SSE消息，注释行返回None"""
+    fields = dict(line.split(': ', 1) for line in chunk.decode('utf-8').strip().split('\n')
+                  if not line.startswith(':'))
+    if 'data' not in fields:
+        return None
+    return fields['event'], json.loads(fields['data'])
+
+
+def next_event(stream):
+    """跳过心跳，返回下一个事件"""
+    for chunk in stream:
+        message = parse_message(chunk)
+        if message is not None:
+            return message
+
+
+def test_event_stream_pushes_filtered_transitions(app, client, admin, admin_headers, create_user):
+    student = create_user('evt_student')
+    with app.app_context():
+        db.session.add_all([Device(device_id='EVT-1', name='事件设备1', device_type='光学仪器', lab_room='A101'),
+                            Device(device_id='EVT-2', name='事件设备2', device_type='光学仪器', lab_room='B202')])
+        db.session.flush()
+        start = datetime.utcnow() + timedelta(days=1)
+        db.session.add_all([
+            Reservation(user_id=student.id, device_id=1, start_time=start, end_time=start + timedelta(hours=1),
+                        purpose='学生预约'),
+            Reservation(user_id=admin.id, device_id=1, start_time=start + timedelta(hours=2),
+                        end_time=start + timedelta(hours=3), purpose='管理员预约'),
+        ])
+        db.session.commit()
+    # EventSource 不能设置请求头，通过查询参数传递令牌
+    admin_token = generate_token(admin.id, admin.username, admin.role)
+    student_token = generate_token(student.id, student.username, student.role)
+    broker = app.extensions['event_broker']
+
+    assert client.get('/api/events').status_code == 401
+    assert client.get('/api/events', query_string={'access_token': 'bad'}).status_code == 401
+    assert client.get('/api/events', headers=admin_headers,
+                      query_string={'device_id': 'x'}).status_code == 400
+
+    # 按实验室过滤；EventSource 通过查询参数传递令牌
+    room = client.get('/api/events', query_string={'access_token': admin_token, 'lab_room': 'A101'},
+                      buffered=False)
+    assert room.status_code == 200 and room.mimetype == 'text/event-stream'
+    assert room.headers['Cache-Control'] == 'no-cache'
+    room_stream = iter(room.response)
+    assert next(room_stream).startswith(b'retry: ')
+    assert next(room_stream) == b': heartbeat\n\n'
+
+    mine = client.get('/api/events', query_string={'access_token': student_token}, buffered=False)
+    mine_stream = iter(mine.response)
+    assert len(broker) == 2
+
+    # 审批预约：预约事件之后是设备事件
+    response = client.put('/api/reservations/1/status', headers=admin_headers, json={'status': 'approved'})
+    assert response.status_code == 200
+    kind, event = next_event(room_stream)
+    assert kind == 'reservation'
+    assert (event['reservation_id'], event['device_id'], event['transition']) == (1, 1, 'pending->approved')
+    assert event['lab_room'] == 'A101' and event['status'] == 'approved'
+    kind, event = next_event(room_stream)
+    assert kind == 'device' and event['transition'] == 'available->reserved'
+    assert [next_event(mine_stream)[0] for _ in range(2)] == ['reservation', 'device']
+
+    # 其他实验室的设备不推送；普通用户看不到他人的预约
+    assert client.put('/api/devices/2/status', headers=admin_headers, json={'status': 'maintenance'}).status_code == 200
+    assert client.delete('/api/reservations/2', headers=admin_headers, json={}).status_code == 200
+    assert client.delete('/api/reservations/1', headers=admin_headers, json={}).status_code == 200
+    events = [next_event(room_stream) for _ in range(3)]
+    assert [(kind, e['device_id'], e['reservation_id'], e['transition']) for kind, e in events] == [
+        ('reservation', 1, 2, 'pending->cancelled'),
+        ('reservation', 1, 1, 'approved->cancelled'),
+        ('device', 1, None, 'reserved->available'),
+    ]
+    events = [next_event(mine_stream) for _ in range(3)]
+    assert [(kind, e['device_id'], e['reservation_id'], e['transition']) for kind, e in events] == [
+        ('device', 2, None, 'available->maintenance'),
+        ('reservation', 1, 1, 'approved->cancelled'),
+        ('device', 1, None, 'reserved->available'),
+    ]
+    mine.close()
+    assert len(broker) == 1
+
+    # 回滚的变更不发布
+    published = broker.published
+    with app.app_context():
+        db.session.get(Device, 1).update_status('retired')
+        db.session.flush()
+        db.session.rollback()
+    assert broker.published == published
+
+    # 按设备过滤；批量更新也推送
+    device = client.get('/api/events', headers=admin_headers, query_string={'device_id': '2'}, buffered=False)
+    device_stream = iter(device.response)
+    next(device_stream)
+    response = client.put('/api/devices/bulk', headers=admin_headers,
+                          json={'ids': [1, 2], 'patch': {'status': 'available'}})
+    assert response.status_code == 200
+    kind, event = next_event(device_stream)
+    assert (kind, event['device_id'], event['transition']) == ('device', 2, 'maintenance->available')
+    assert broker.published == published + 1  # 设备1状态未变化
+
+    # 连接数上限
+    extra = client.get('/api/events', headers=admin_headers, buffered=False)
+    assert client.get('/api/events', headers=admin_headers).status_code == 503
+    extra.close()
+
+    # 背压：消费过慢的连接队列写满后被断开，直接收到 overflow 后结束（积压的事件由增量同步补齐）
+    for status in ('maintenance', 'available', 'maintenance', 'available'):
+        client.put('/api/devices/2/status', headers=admin_headers, json={'status': status})
+    assert len(broker) == 1 and broker.dropped == 1
+    remaining = [parse_message(chunk) for chunk in device_stream]
+    assert [m[0] for m in remaining if m] == ['overflow']
+    device.close()
+    room.close()
+    assert len(broker) == 0
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 状态事件流测试通过')
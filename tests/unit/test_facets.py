@@ -0,0 +1,53 @@
+"""设备分面统计单元测试"""
+import pytest
+
+from app import db
+from app.models import Device
+
+
+def test_device_facets_follow_filters_and_writes(app, client, create_user, auth_headers):
+    headers = auth_headers(create_user('facet_user'))
+    with app.app_context():
+        specs = [
+            ('FAC-1', '荧光显微镜', '光学仪器', 'imaging', 'A101', 'available'),
+            ('FAC-2', '激光共聚焦显微镜', '光学仪器', 'imaging', 'A101', 'maintenance'),
+            ('FAC-3', '高速离心机', '分离设备', None, 'B202', 'available'),
+            ('FAC-4', '数字示波器', '电子仪器', 'electronics', None, 'available'),
+        ]
+        for device_id, name, device_type, category, lab_room, status in specs:
+            db.session.add(Device(device_id=device_id, name=name, device_type=device_type,
+                                  category=category, lab_room=lab_room, status=status))
+        db.session.commit()
+
+    cache = app.extensions['count_cache']
+
+    def facets(**params):
+        response = client.get('/api/devices/facets', query_string=params, headers=headers)
+        assert response.status_code == 200
+        return response.get_json()['data']
+
+    data = facets()
+    assert data['status'] == [{'value': 'available', 'count': 3}, {'value': 'maintenance', 'count': 1}]
+    assert data['type'][0] == {'value': '光学仪器', 'count': 2}
+    assert {'value': 'general', 'count': 1} in data['category']
+    assert {'value': None, 'count': 1} in data['lab_room']
+
+    # 与设备列表相同的筛选条件（含全文检索）
+    data = facets(search='显微镜')
+    assert data['lab_room'] == [{'value': 'A101', 'count': 2}]
+    assert facets(status='available', type='光学仪器')['category'] == [{'value': 'imaging', 'count': 1}]
+
+    hits = cache.hits
+    facets(search='显微镜')
+    assert cache.hits == hits + 1
+
+    # 设备写入后缓存失效
+    with app.app_context():
+        Device.query.filter_by(device_id='FAC-2').one().status = 'available'
+        db.session.commit()
+    assert facets(search='显微镜')['status'] == [{'value': 'available', 'count': 2}]
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 设备分面统计测试通过')
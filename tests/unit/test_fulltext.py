@@ -0,0 +1,116 @@
+"""全文检索单元测试"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.fulltext import build_match_query
+from app.migrations import upgrade_database
+from app.models import Device, Reservation
+
+
+def test_build_match_query_escapes_quotes():
+    assert build_match_query(' 显微镜 ') == '"显微镜"'
+    assert build_match_query('a"b OR c') == '"a""b OR c"'
+
+
+def test_device_search_uses_fulltext_index(app, client, create_user, auth_headers):
+    headers = auth_headers(create_user('fts_user'))
+    with app.app_context():
+        db.session.add_all([
+            Device(device_id='MIC-001', name='高精度电子显微镜', device_type='光学仪器', description='用于细胞观察'),
+            Device(device_id='CEN-001', name='高速离心机', device_type='分离设备', description='配合显微镜样品制备使用'),
+            Device(device_id='OSC-001', name='数字示波器', device_type='电子仪器', description='Oscilloscope 200MHz'),
+        ])
+        db.session.commit()
+
+    def search(term):
+        response = client.get('/api/devices/', query_string={'search': term}, headers=headers)
+        assert response.status_code == 200
+        return [d['device_id'] for d in response.get_json()['data']]
+
+    # 名称命中的设备排在仅描述命中的设备之前
+    assert search('显微镜') == ['MIC-001', 'CEN-001']
+    assert search('oscillo') == ['OSC-001']  # 不区分大小写
+    assert search('mic-0') == ['MIC-001']
+    assert search('示波') == ['OSC-001']  # 少于3个字符时回退到模糊搜索
+    assert search('不存在的设备') == []
+
+    with app.app_context():
+        assert 'devices_fts' in app.extensions['fulltext_indexes']
+
+        # 更新和删除由触发器同步到索引
+        device = Device.query.filter_by(device_id='OSC-001').one()
+        device.name = '混合信号示波器'
+        db.session.delete(Device.query.filter_by(device_id='CEN-001').one())
+        db.session.commit()
+
+    assert search('混合信号') == ['OSC-001']
+    assert search('显微镜') == ['MIC-001']
+
+
+def test_reservation_search_combines_with_filters(app, client, admin, admin_headers, create_user, auth_headers):
+    student = create_user('fts_student')
+    student_headers = auth_headers(student)
+    with app.app_context():
+        first = Device(device_id='FTS-DEV-1', name='荧光显微镜', device_type='光学仪器')
+        second = Device(device_id='FTS-DEV-2', name='液相色谱仪', device_type='分析仪器')
+        db.session.add_all([first, second])
+        db.session.commit()
+
+        base = datetime(2025, 3, 3, 8, 0)
+        rows = [
+            (student, first, '观察细胞荧光标记', '细胞凋亡实验', '细胞生物学', None, 'approved'),
+            (student, second, '分离蛋白样品', '蛋白纯化', '生物化学', '细胞生物学实验课', 'pending'),
+            (admin, first, '设备校准', None, None, None, 'approved'),
+            (student, first, '细胞培养后拍照', None, None, None, 'cancelled'),
+        ]
+        for i, (user, device, purpose, experiment, field, course, status) in enumerate(rows):
+            db.session.add(Reservation(user_id=user.id, device_id=device.id, purpose=purpose,
+                                       experiment_name=experiment, research_field=field, course_name=course,
+                                       start_time=base + timedelta(hours=i), end_time=base + timedelta(hours=i, minutes=30),
+                                       status=status))
+        db.session.commit()
+
+    def search(headers, **params):
+        response = client.get('/api/reservations/', query_string=params, headers=headers)
+        assert response.status_code == 200
+        return [r['purpose'] for r in response.get_json()['data']]
+
+    # 四个字段均可命中，按相关度排序
+    assert search(student_headers, search='细胞生物学') == ['观察细胞荧光标记', '分离蛋白样品']
+    assert search(student_headers, search='细胞凋亡') == ['观察细胞荧光标记']
+    assert search(student_headers, search='细胞生物学', status='pending') == ['分离蛋白样品']
+    assert search(student_headers, search='细胞生物学', device_id=2) == ['分离蛋白样品']
+    assert search(student_headers, search='细胞生物学', sort_by='start_time', sort_order='desc') == \
+        ['分离蛋白样品', '观察细胞荧光标记']
+    assert search(student_headers, search='设备校准') == []  # 普通用户只能搜索自己的预约
+    assert search(admin_headers, search='设备校准') == ['设备校准']
+    assert search(admin_headers, search='细胞', status='cancelled') == ['细胞培养后拍照']  # 短词回退
+
+    with app.app_context():
+        reservation = Reservation.query.filter_by(purpose='设备校准').one()
+        reservation.experiment_name = '光路校准实验'
+        db.session.commit()
+    assert search(admin_headers, search='光路校准') == ['设备校准']
+
+
+def test_upgrade_creates_missing_fulltext_index(app):
+    with app.app_context():
+        db.session.add(Device(device_id='OLD-001', name='旧数据库中的光谱仪', device_type='光学仪器'))
+        db.session.commit()
+        with db.engine.begin() as connection:
+            connection.execute(text('DROP TABLE devices_fts'))
+            for suffix in ('ai', 'ad', 'au'):
+                connection.execute(text(f'DROP TRIGGER IF EXISTS devices_fts_{suffix}'))
+
+        changes = upgrade_database(log=lambda message: None)
+        assert any('devices_fts' in c for c in changes)
+        rows = db.session.execute(text("SELECT rowid FROM devices_fts WHERE devices_fts MATCH '\"光谱仪\"'")).all()
+        assert len(rows) == 1
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 全文检索测试通过')
@@ -0,0 +1,88 @@
+"""登录限流单元测试"""
+import os
+import tempfile
+
+import pytest
+
+from app.models import User
+from app.rate_limit import LoginLimiter, MemoryBucketStore, SQLiteBucketStore
+
+
+@pytest.fixture
+def config_overrides():
+    return {'LOGIN_USERNAME_BURST': 3, 'LOGIN_IP_BURST': 5}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refill():
+    clock = FakeClock()
+    limiter = LoginLimiter(MemoryBucketStore(), username_burst=2, username_per_minute=6,
+                           ip_burst=100, ip_per_minute=100, clock=clock)
+
+    assert limiter.check('alice', '1.1.1.1') is None
+    assert limiter.check('ALICE ', '1.1.1.1') is None  # 用户名不区分大小写
+    assert limiter.check('alice', '1.1.1.1') == 10.0  # 每10秒恢复一次
+    assert limiter.check('bob', '1.1.1.1') is None
+
+    clock.now += 10
+    assert limiter.check('alice', '1.1.1.1') is None
+    assert limiter.check('alice', '1.1.1.1') is not None
+    assert limiter.stats()['rejected_username'] == 2
+
+
+def test_sqlite_store_shared_between_limiters():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        clock = FakeClock()
+        first = LoginLimiter(SQLiteBucketStore(path), ip_burst=2, ip_per_minute=1, clock=clock)
+        second = LoginLimiter(SQLiteBucketStore(path), ip_burst=2, ip_per_minute=1, clock=clock)
+
+        assert first.check('a', '2.2.2.2') is None
+        assert second.check('b', '2.2.2.2') is None
+        assert first.check('c', '2.2.2.2') is not None
+        assert first.stats()['rejected_ip'] == 1
+        assert second.stats()['buckets'] == 3
+    finally:
+        os.remove(path)
+
+
+def test_login_rejected_before_password_check(app, client, create_user):
+    create_user('limit_user', role='admin', password='test123')
+
+    checks = []
+    original = User.check_password
+
+    def counting_check(self, password):
+        checks.append(password)
+        return original(self, password)
+
+    User.check_password = counting_check
+    try:
+        for _ in range(3):
+            assert client.post('/api/auth/login', json={'username': 'limit_user', 'password': 'x'}).status_code == 401
+        response = client.post('/api/auth/login', json={'username': 'limit_user', 'password': 'test123'})
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+        assert len(checks) == 3
+
+        # 其他用户名仍可尝试，直到该IP的桶耗尽（被拒绝的尝试同样计入IP桶）
+        assert client.post('/api/auth/login', json={'username': 'other', 'password': 'x'}).status_code == 401
+        assert client.post('/api/auth/login', json={'username': 'other', 'password': 'x'}).status_code == 429
+    finally:
+        User.check_password = original
+
+    stats = app.extensions['login_limiter'].stats()
+    assert stats == {'allowed': 4, 'rejected': 2, 'rejected_ip': 1, 'rejected_username': 1, 'buckets': 3}
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 登录限流测试通过')
@@ -0,0 +1,61 @@
+"""数据库结构升级单元测试"""
+import pytest
+from sqlalchemy import inspect, text
+
+from app import db
+from app.models import Device
+from app.migrations import upgrade_database
+
+
+def test_upgrade_legacy_database(app):
+    with app.app_context():
+        # 模拟旧版本数据库：缺少复合索引，保留 device_id 单列索引
+        with db.engine.begin() as connection:
+            connection.execute(text('DROP INDEX ix_reservations_device_status_time'))
+            connection.execute(text('CREATE INDEX ix_reservations_device_id ON reservations (device_id)'))
+
+        changes = upgrade_database(log=lambda message: None)
+        assert len(changes) == 2
+
+        index_names = {i['name'] for i in inspect(db.engine).get_indexes('reservations')}
+        assert 'ix_reservations_device_status_time' in index_names
+        assert 'ix_reservations_device_id' not in index_names
+
+        # 重复执行不产生变更
+        assert upgrade_database(log=lambda message: None) == []
+
+
+def test_upgrade_backfills_null_created_at(app, client, admin_headers):
+    with app.app_context():
+        # 模拟旧版本数据库：devices.created_at 可为空
+        with db.engine.begin() as connection:
+            ddl = connection.scalar(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'devices'"))
+            connection.execute(text('DROP TABLE devices'))
+            connection.execute(text(ddl.replace('created_at DATETIME NOT NULL', 'created_at DATETIME')))
+        db.session.add_all([Device(device_id=f'OLD-{i}', name=f'旧设备{i}', device_type='光学仪器') for i in range(3)])
+        db.session.commit()
+        with db.engine.begin() as connection:
+            connection.execute(text("UPDATE devices SET created_at = NULL, updated_at = NULL "
+                                    "WHERE device_id = 'OLD-1'"))
+
+        changes = upgrade_database(log=lambda message: None)
+        assert '   ✅ 回填创建时间: devices (1行)' in changes
+        assert Device.query.filter_by(device_id='OLD-1').one().created_at is not None
+
+    # 回填的记录按最早创建排在最后一页，游标分页不会跳过
+    seen, cursor = [], ''
+    while cursor is not None:
+        body = client.get('/api/devices/', query_string={'per_page': 1, 'cursor': cursor},
+                          headers=admin_headers).get_json()
+        seen += [item['device_id'] for item in body['data']]
+        cursor = body['pagination']['next_cursor']
+    assert seen == ['OLD-2', 'OLD-0', 'OLD-1']
+
+    # 重复执行不产生变更
+    with app.app_context():
+        assert upgrade_database(log=lambda message: None) == []
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 数据库结构升级测试通过')
@@ -0,0 +1,33 @@
+"""设备占用网格单元测试"""
+import base64
+from datetime import datetime, timedelta
+
+from app.occupancy import bucket_runs, bucket_count, runs_to_bitmap
+
+DAY = datetime(2025, 3, 4)
+HOUR = timedelta(hours=1)
+
+
+def test_bucket_runs_merge_and_clip():
+    intervals = [
+        (DAY - HOUR, DAY + HOUR),  # 窗口之前开始，被裁剪
+        (DAY + timedelta(hours=10, minutes=30), DAY + timedelta(hours=12)),
+        (DAY + timedelta(hours=12), DAY + timedelta(hours=13)),  # 与上一段相接，合并为一个游程
+        (DAY + timedelta(hours=23), DAY + timedelta(hours=26)),
+    ]
+    runs = bucket_runs(intervals, DAY, DAY + timedelta(days=1), HOUR)
+    assert runs == [[0, 1], [10, 3], [23, 1]]
+
+
+def test_bitmap_encoding():
+    total = bucket_count(DAY, DAY + timedelta(days=1), HOUR)
+    assert total == 24
+
+    bits = base64.b64decode(runs_to_bitmap([[0, 1], [10, 3]], total))
+    assert bits == bytes([0b00000001, 0b00011100, 0])
+
+
+if __name__ == '__main__':
+    test_bucket_runs_merge_and_clip()
+    test_bitmap_encoding()
+    print('✅ 设备占用网格测试通过')
@@ -0,0 +1,66 @@
+"""游标分页单元测试"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Device
+from app.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 3, 8, 0, 0, 123456)
+    cursor = encode_cursor(created_at, 42, 'next')
+    assert decode_cursor(cursor) == (created_at, 42, 'next')
+
+    for bad in ['', 'abc', encode_cursor(created_at, 42, 'sideways')]:
+        try:
+            decode_cursor(bad)
+            assert False, '应拒绝无效游标'
+        except ValueError:
+            pass
+
+
+def test_device_cursor_pagination(app, client, create_user, auth_headers):
+    headers = auth_headers(create_user('page_user'))
+    with app.app_context():
+        # 7台设备，其中两台创建时间相同，由id区分先后
+        base = datetime(2025, 1, 1)
+        for i in range(7):
+            db.session.add(Device(device_id=f'DEV_PAGE_{i}', name=f'分页设备{i}', device_type='测试仪器',
+                                  created_at=base + timedelta(minutes=min(i, 5))))
+        db.session.commit()
+
+    def get(query):
+        response = client.get(f'/api/devices/?{query}', headers=headers)
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        return [d['device_id'] for d in body['data']], body['pagination']
+
+    ids, pagination = get('paginate=cursor&limit=3')
+    assert ids == ['DEV_PAGE_6', 'DEV_PAGE_5', 'DEV_PAGE_4']
+    assert pagination['prev_cursor'] is None and 'total' not in pagination
+
+    ids, pagination = get(f'cursor={pagination["next_cursor"]}&limit=3')
+    assert ids == ['DEV_PAGE_3', 'DEV_PAGE_2', 'DEV_PAGE_1']
+    second_prev = pagination['prev_cursor']
+
+    ids, pagination = get(f'cursor={pagination["next_cursor"]}&limit=3&include_total=true')
+    assert ids == ['DEV_PAGE_0']
+    assert pagination['next_cursor'] is None and pagination['total'] == 7
+
+    ids, pagination = get(f'cursor={second_prev}&limit=3')
+    assert ids == ['DEV_PAGE_6', 'DEV_PAGE_5', 'DEV_PAGE_4']
+    assert pagination['prev_cursor'] is None
+
+    # 旧的 page/per_page 分页保持不变
+    ids, pagination = get('page=2&per_page=3')
+    assert ids == ['DEV_PAGE_3', 'DEV_PAGE_2', 'DEV_PAGE_1']
+    assert pagination == {'page': 2, 'per_page': 3, 'total': 7, 'pages': 3, 'total_is_estimate': False}
+
+    assert client.get('/api/devices/?cursor=bogus', headers=headers).status_code == 400
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 游标分页测试通过')
@@ -0,0 +1,69 @@
+"""密码哈希单元测试"""
+import pytest
+
+from app import db
+from app.models import User
+from app.passwords import PasswordHasher, PasswordHasherBusy, normalize_method
+
+
+@pytest.fixture
+def config_overrides():
+    return {'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000', 'PASSWORD_HASH_WORKERS': 1}
+
+
+def test_normalize_method_and_needs_rehash():
+    assert normalize_method('scrypt') == 'scrypt:32768:8:1'
+    assert normalize_method('scrypt:16384') == 'scrypt:16384:8:1'
+    assert normalize_method('pbkdf2:sha256:1000') == 'pbkdf2:sha256:1000'
+
+    hasher = PasswordHasher('pbkdf2:sha256:1000')
+    pwhash = hasher.hash('secret')
+    assert hasher.verify(pwhash, 'secret')
+    assert not hasher.verify(pwhash, 'wrong')
+    assert not hasher.needs_rehash(pwhash)
+    assert PasswordHasher('pbkdf2:sha256:2000').needs_rehash(pwhash)
+
+
+def test_process_pool_is_bounded():
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1, max_pending=1, queue_timeout=0.01)
+    try:
+        pwhash = hasher.hash('secret')
+        assert hasher.verify(pwhash, 'secret')
+
+        # 占满排队名额后，新的校验请求立即被拒绝
+        hasher._slots.acquire()
+        try:
+            hasher.verify(pwhash, 'secret')
+            assert False, '排队已满时应拒绝'
+        except PasswordHasherBusy:
+            pass
+        finally:
+            hasher._slots.release()
+        assert hasher.rejected == 1
+    finally:
+        hasher.shutdown()
+
+
+def test_login_rehashes_with_new_parameters(app, client):
+    with app.app_context():
+        user = User(username='hash_user', email='hash@test.com', role='student')
+        user.password_hash = PasswordHasher('pbkdf2:sha256:500').hash('test123')
+        db.session.add(user)
+        db.session.commit()
+        assert user.password_needs_rehash()
+
+    assert client.post('/api/auth/login', json={'username': 'hash_user', 'password': 'wrong'}).status_code == 401
+    assert client.post('/api/auth/login', json={'username': 'hash_user', 'password': 'test123'}).status_code == 200
+
+    with app.app_context():
+        user = User.query.filter_by(username='hash_user').one()
+        assert user.password_hash.startswith('pbkdf2:sha256:1000$')
+        assert not user.password_needs_rehash()
+    assert client.post('/api/auth/login', json={'username': 'hash_user', 'password': 'test123'}).status_code == 200
+
+    app.extensions['password_hasher'].shutdown()
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 密码哈希测试通过')
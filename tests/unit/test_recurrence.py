@@ -0,0 +1,46 @@
+"""周期预约规则单元测试"""
+from datetime import datetime, timedelta
+
+from app.recurrence import RecurrenceRule
+
+DTSTART = datetime(2025, 3, 4, 9, 0)  # 星期二
+DURATION = timedelta(hours=2)
+
+
+def test_weekly_rule_expands_only_inside_window():
+    rule = RecurrenceRule.parse('FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20250630')
+
+    window = list(rule.between(DTSTART, DURATION, datetime(2025, 4, 1), datetime(2025, 4, 8)))
+    assert window == [
+        (datetime(2025, 4, 1, 9, 0), datetime(2025, 4, 1, 11, 0)),
+        (datetime(2025, 4, 3, 9, 0), datetime(2025, 4, 3, 11, 0)),
+    ]
+
+    # 窗口从某次占用中间开始时，该次占用仍然计入
+    partial = list(rule.between(DTSTART, DURATION, datetime(2025, 4, 1, 10, 0), datetime(2025, 4, 2)))
+    assert partial == [(datetime(2025, 4, 1, 9, 0), datetime(2025, 4, 1, 11, 0))]
+
+    assert rule.last_end(DTSTART, DURATION) == datetime(2025, 6, 26, 11, 0)
+
+
+def test_count_and_exdates():
+    rule = RecurrenceRule.parse('RRULE:FREQ=WEEKLY;INTERVAL=2;COUNT=3')
+    starts = [start for start, _ in rule.between(DTSTART, DURATION, DTSTART, datetime(2026, 1, 1),
+                                                 exdates={datetime(2025, 3, 18).date()})]
+    assert starts == [datetime(2025, 3, 4, 9, 0), datetime(2025, 4, 1, 9, 0)]
+
+
+def test_invalid_rules():
+    for text in ['FREQ=MONTHLY;COUNT=2', 'FREQ=WEEKLY', 'FREQ=WEEKLY;BYDAY=XX;COUNT=2', 'FREQ=DAILY;COUNT=1000']:
+        try:
+            RecurrenceRule.parse(text)
+        except ValueError:
+            continue
+        raise AssertionError(f'应拒绝规则: {text}')
+
+
+if __name__ == '__main__':
+    test_weekly_rule_expands_only_inside_window()
+    test_count_and_exdates()
+    test_invalid_rules()
+    print('✅ 周期预约规则测试通过')
@@ -0,0 +1,81 @@
+"""刷新令牌单元测试"""
+import pytest
+
+from app import db, refresh_tokens
+from app.models import User, RefreshToken
+from app.refresh_tokens import RefreshTokenError, hash_refresh_token, issue_token_pair, rotate_refresh_token
+
+
+@pytest.fixture(autouse=True)
+def refresh_user(create_user):
+    return create_user('refresh_user', role='teacher', password='test123')
+
+
+def test_login_refresh_rotation_and_reuse_detection(app, client):
+
+    response = client.post('/api/auth/login', json={'username': 'refresh_user', 'password': 'test123'})
+    assert response.status_code == 200
+    first = response.get_json()
+    assert first['expires_in'] == app.config['ACCESS_TOKEN_EXPIRES']
+    assert client.get('/api/devices/', headers={'Authorization': f'Bearer {first["token"]}'}).status_code == 200
+
+    # 只保存摘要
+    with app.app_context():
+        record = RefreshToken.query.one()
+        assert record.token_hash == hash_refresh_token(first['refresh_token'])
+        assert first['refresh_token'] not in record.token_hash
+
+    response = client.post('/api/auth/refresh', json={'refresh_token': first['refresh_token']})
+    assert response.status_code == 200
+    second = response.get_json()
+    assert second['refresh_token'] != first['refresh_token']
+    assert client.get('/api/devices/', headers={'Authorization': f'Bearer {second["token"]}'}).status_code == 200
+
+    # 重复使用已轮换的令牌：拒绝并吊销整条令牌链
+    assert client.post('/api/auth/refresh', json={'refresh_token': first['refresh_token']}).status_code == 401
+    assert client.post('/api/auth/refresh', json={'refresh_token': second['refresh_token']}).status_code == 401
+
+
+def test_concurrent_rotation_of_same_token(app, refresh_user, monkeypatch):
+    with app.app_context():
+        tokens, record = issue_token_pair(refresh_user)
+        db.session.commit()
+        # 并发请求在第一次轮换前读到的记录：尚未吊销
+        stale = RefreshToken(id=record.id, user_id=record.user_id, token_hash=record.token_hash,
+                             expires_at=record.expires_at)
+
+        # 同一事务中两次轮换：第二次的检查通过，但条件 UPDATE 占用失败
+        _, rotated = rotate_refresh_token(tokens['refresh_token'])
+        monkeypatch.setattr(refresh_tokens, 'find_refresh_token', lambda raw_token: stale)
+        with pytest.raises(RefreshTokenError):
+            rotate_refresh_token(tokens['refresh_token'])
+        monkeypatch.undo()
+
+        # 按重复使用处理：吊销整条令牌链，包括第一次轮换签发的令牌
+        assert RefreshToken.query.filter(RefreshToken.revoked_at.is_(None)).count() == 0
+        with pytest.raises(RefreshTokenError):
+            rotate_refresh_token(rotated['refresh_token'])
+
+
+def test_refresh_picks_up_role_change_and_logout(app, client):
+    tokens = client.post('/api/auth/login', json={'username': 'refresh_user', 'password': 'test123'}).get_json()
+
+    # 角色变更会吊销该用户的全部令牌，需要重新登录
+    with app.app_context():
+        User.query.filter_by(username='refresh_user').one().role = 'admin'
+        db.session.commit()
+    assert client.post('/api/auth/refresh', json={'refresh_token': tokens['refresh_token']}).status_code == 401
+
+    tokens = client.post('/api/auth/login', json={'username': 'refresh_user', 'password': 'test123'}).get_json()
+    refreshed = client.post('/api/auth/refresh', json={'refresh_token': tokens['refresh_token']}).get_json()
+    assert refreshed['user']['role'] == 'admin'
+
+    headers = {'Authorization': f'Bearer {refreshed["token"]}'}
+    response = client.post('/api/auth/logout', json={'refresh_token': refreshed['refresh_token']}, headers=headers)
+    assert response.status_code == 200
+    assert client.post('/api/auth/refresh', json={'refresh_token': refreshed['refresh_token']}).status_code == 401
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 刷新令牌测试通过')
@@ -0,0 +1,34 @@
+"""批量预约单元测试"""
+import pytest
+
+from app import db
+from app.models import Device
+
+
+def test_batch_validates_device_id_separately(app, client, admin_headers):
+    with app.app_context():
+        db.session.add(Device(device_id='BAT-1', name='批量预约设备', device_type='光学仪器'))
+        db.session.commit()
+
+    def item(device_id, start='2030-01-01T09:00:00', end='2030-01-01T10:00:00'):
+        return {'device_id': device_id, 'start_time': start, 'end_time': end, 'purpose': '批量预约'}
+
+    response = client.post('/api/reservations/batch', headers=admin_headers, json={'reservations': [
+        item('abc'), item(1.5), item(True), item(1, start='bad'), item('1'), item(99)
+    ]})
+    assert response.status_code == 207
+    results = response.get_json()['results']
+    assert [r['error'] for r in results[:3]] == ['设备ID无效'] * 3
+    assert results[3]['error'].startswith('时间格式错误')
+    assert results[4]['success']
+    assert results[5]['error'] == '设备不存在'
+
+    # 单条创建返回相同的错误
+    response = client.post('/api/reservations/', headers=admin_headers, json=item('abc'))
+    assert response.status_code == 400
+    assert response.get_json()['error'] == '设备ID无效'
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 批量预约测试通过')
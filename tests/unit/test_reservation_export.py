@@ -0,0 +1,70 @@
+"""预约流式导出单元测试"""
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Device, Reservation
+
+
+@pytest.fixture
+def config_overrides():
+    return {'EXPORT_BATCH_SIZE': 3}
+
+
+def test_export_streams_with_listing_filters_and_scope(app, client, admin, admin_headers, create_user,
+                                                       auth_headers):
+    student = create_user('export_student')
+    student_headers = auth_headers(student)
+    with app.app_context():
+        db.session.add(Device(device_id='EXP-1', name='导出设备', device_type='光学仪器'))
+        db.session.flush()
+        start = datetime(2030, 3, 1, 9)
+        for i in range(10):
+            owner = student if i % 2 else admin
+            db.session.add(Reservation(user_id=owner.id, device_id=1, start_time=start + timedelta(days=i),
+                                       end_time=start + timedelta(days=i, hours=1), purpose=f'导出,测试"{i}"',
+                                       status='approved' if i < 6 else 'pending'))
+        db.session.commit()
+        expected = {r.id: r.to_dict(detail=True) for r in Reservation.query.all()}
+
+    def export(headers, **params):
+        return client.get('/api/reservations/export', query_string=params, headers=headers)
+
+    # NDJSON：每行一条与列表接口相同的记录，按ID顺序分批写出
+    response = export(admin_headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'attachment' in response.headers['Content-Disposition']
+    lines = response.get_data(as_text=True).splitlines()
+    items = [json.loads(line) for line in lines]
+    assert [item['id'] for item in items] == sorted(expected)
+    assert all(item == expected[item['id']] for item in items)
+
+    # 与列表相同的筛选条件和权限范围
+    items = [json.loads(line) for line in export(student_headers).get_data(as_text=True).splitlines()]
+    assert len(items) == 5 and {item['user_id'] for item in items} == {student.id}
+    items = [json.loads(line) for line in export(admin_headers, status='pending').get_data(as_text=True).splitlines()]
+    assert len(items) == 4
+    items = [json.loads(line) for line in export(student_headers, user_id=1).get_data(as_text=True).splitlines()]
+    assert {item['user_id'] for item in items} == {student.id}
+
+    # CSV：表头为导出字段，逗号与引号正确转义，空值为空串
+    response = export(admin_headers, format='csv', fields='id,purpose,status,reviewed_at')
+    assert response.mimetype == 'text/csv'
+    reader = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert reader[0] == ['id', 'purpose', 'status', 'reviewed_at']
+    assert len(reader) == 11
+    assert reader[1] == ['1', '导出,测试"0"', 'approved', '']
+
+    assert export(admin_headers, format='xml').status_code == 400
+    assert export(admin_headers, fields='password').status_code == 400
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 预约导出测试通过')
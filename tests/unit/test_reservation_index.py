@@ -0,0 +1,161 @@
+"""预约冲突索引单元测试"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import User, Device, Reservation
+from app.reservation_index import (
+    DeviceIntervals, IndexedReservation, find_conflicting_reservations, sweep_conflicts, free_slots
+)
+
+
+@pytest.fixture
+def config_overrides():
+    return {'RESERVATION_INDEX_ENABLED': True}
+
+
+BASE = datetime(2025, 3, 3, 8, 0)
+
+
+def _entry(res_id, start_hour, end_hour):
+    return IndexedReservation(res_id, 1, BASE + timedelta(hours=start_hour),
+                              BASE + timedelta(hours=end_hour), 'approved')
+
+
+def test_device_intervals_overlap():
+    intervals = DeviceIntervals([_entry(1, 0, 2), _entry(2, 3, 4), _entry(3, 6, 9)])
+
+    def ids(start_hour, end_hour):
+        start = BASE + timedelta(hours=start_hour)
+        end = BASE + timedelta(hours=end_hour)
+        return [e.id for e in intervals.overlapping(start, end)]
+
+    assert ids(1, 3) == [1]
+    assert ids(2, 3) == []  # 首尾相接不算冲突
+    assert ids(8, 10) == [3]  # 长区间从较早的开始时间覆盖到查询区间
+    assert ids(-1, 10) == [1, 2, 3]
+
+    assert intervals.remove(2, BASE + timedelta(hours=3))
+    assert ids(3, 4) == []
+    intervals.add(_entry(4, 3, 5))
+    assert ids(4, 5) == [4]
+
+
+def test_device_intervals_bound_with_long_interval():
+    # 一个很长的预约不应让其他查询退化为线性扫描
+    entries = [_entry(i, i, i + 1) for i in range(0, 20000, 2)]
+    entries.append(_entry(-1, 0, 24 * 1000))
+    intervals = DeviceIntervals(entries)
+
+    start, end = BASE + timedelta(hours=19000), BASE + timedelta(hours=19001)
+    assert [e.id for e in intervals.overlapping(start, end)] == [-1, 19000]
+    assert sum(len(group) for group in intervals.candidates(start, end)) <= 3
+
+    # 删除长预约后其所在分组随之消失
+    assert intervals.remove(-1, BASE)
+    assert [e.id for e in intervals.overlapping(start, end)] == [19000]
+    assert sum(len(group) for group in intervals.candidates(start, end)) == 1
+    assert len(intervals) == 10000
+
+
+def test_sweep_conflicts_within_batch():
+    existing = [_entry(1, 0, 2), _entry(2, 5, 6)]
+    candidates = [_entry(10, 1, 3), _entry(11, 2, 4), _entry(12, 3, 5), _entry(13, 4, 7)]
+
+    results = {c.id: [e.id for e in conflicts] for c, conflicts in sweep_conflicts(existing, candidates)}
+
+    assert results[10] == [1]
+    assert results[11] == []  # 10 与已有预约冲突被拒绝，不阻塞 11
+    assert results[12] == [11]  # 与批内已接受的 11 冲突
+    assert results[13] == [2]
+
+
+def test_sweep_conflicts_mixed_durations():
+    # 较长的候选区间先扫描到后面的已有预约，较短的候选区间不应被它拒绝
+    existing = [_entry(1, 4, 5)]
+    candidates = [_entry(10, 1, 9), _entry(11, 2, 3), _entry(12, 4, 6)]
+
+    results = {c.id: [e.id for e in conflicts] for c, conflicts in sweep_conflicts(existing, candidates)}
+
+    assert results[10] == [1]
+    assert results[11] == []
+    assert results[12] == [1]
+
+
+def test_free_slots_merge_sweep():
+    busy = [_entry(1, 1, 3), _entry(2, 2, 4), _entry(3, 6, 7)]
+    window_end = BASE + timedelta(hours=10)
+
+    slots = free_slots(busy, BASE, window_end)
+    assert slots == [
+        (BASE, BASE + timedelta(hours=1)),
+        (BASE + timedelta(hours=4), BASE + timedelta(hours=6)),
+        (BASE + timedelta(hours=7), window_end),
+    ]
+
+    assert free_slots(busy, BASE, window_end, timedelta(hours=2.5)) == [(BASE + timedelta(hours=7), window_end)]
+
+    # 按单次最大时长切分，切分后的时段再按最短时长过滤
+    assert free_slots(busy, BASE, window_end, timedelta(hours=1.5), timedelta(hours=2)) == [
+        (BASE + timedelta(hours=4), BASE + timedelta(hours=6)),
+        (BASE + timedelta(hours=7), BASE + timedelta(hours=9)),
+    ]
+
+
+def test_index_tracks_committed_transitions(app, create_user):
+    user = create_user('index_user')
+
+    with app.app_context():
+        device = Device(device_id='DEV_INDEX', name='索引测试设备', device_type='测试仪器')
+        db.session.add(device)
+        db.session.commit()
+
+        start, end = BASE, BASE + timedelta(hours=2)
+        assert find_conflicting_reservations(device.id, start, end) == []
+
+        reservation = Reservation(user_id=user.id, device_id=device.id, start_time=start,
+                                  end_time=end, purpose='测试预约索引', status='pending')
+        db.session.add(reservation)
+        db.session.commit()
+
+        conflicts = find_conflicting_reservations(device.id, start + timedelta(hours=1), end)
+        assert [c.id for c in conflicts] == [reservation.id]
+
+        # 回滚的状态变更不应影响索引
+        reservation.status = 'cancelled'
+        db.session.flush()
+        db.session.rollback()
+        assert len(find_conflicting_reservations(device.id, start, end)) == 1
+
+        reservation.status = 'cancelled'
+        db.session.commit()
+        assert find_conflicting_reservations(device.id, start, end) == []
+
+        stats = app.extensions['reservation_index'].stats()
+        assert stats == {'devices': 1, 'reservations': 0}
+
+
+def test_default_checks_conflicts_in_sql(make_app):
+    # 默认关闭索引：其他进程写入的预约（不经过本进程的会话事件）也能检测到
+    app = make_app()
+    with app.app_context():
+        db.session.add_all([User(username='sql_user', email='sql_user@test.com', role='student', password_hash='x'),
+                            Device(device_id='DEV_SQL', name='SQL检测设备', device_type='测试仪器')])
+        db.session.commit()
+        window = (BASE + timedelta(hours=1), BASE + timedelta(hours=3))
+        assert find_conflicting_reservations(1, *window) == []
+
+        with db.engine.begin() as connection:
+            connection.execute(Reservation.__table__.insert().values(
+                user_id=1, device_id=1, start_time=BASE, end_time=BASE + timedelta(hours=2),
+                purpose='其他进程写入', status='approved', created_at=BASE
+            ))
+
+        assert len(find_conflicting_reservations(1, *window)) == 1
+        assert app.extensions['reservation_index'].stats() == {'devices': 0, 'reservations': 0}
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 预约冲突索引测试通过')
@@ -0,0 +1,90 @@
+"""令牌吊销单元测试"""
+import time
+
+import pytest
+
+from app import db
+from app.auth import generate_token, verify_token
+from app.models import User
+from app.revocation import RevocationList, revoke_token
+
+
+def test_revocation_list_matching():
+    revocations = RevocationList()
+    now = time.time()
+    revocations.add_jti('abc', now + 60)
+    revocations.add_cutoff(7, now, now + 60)
+
+    assert revocations.is_revoked({'jti': 'abc', 'user_id': 1, 'iat': now})
+    assert revocations.is_revoked({'jti': 'x', 'user_id': 7, 'iat': now - 1})
+    assert not revocations.is_revoked({'jti': 'x', 'user_id': 7, 'iat': now + 1})
+    assert not revocations.is_revoked({'jti': 'x', 'user_id': 1, 'iat': now})
+
+
+def test_logout_revokes_only_current_token(client, create_user):
+    user = create_user('logout_user')
+    first = generate_token(user.id, user.username, user.role)
+    second = generate_token(user.id, user.username, user.role)
+
+    first_headers = {'Authorization': f'Bearer {first}'}
+    assert client.get('/api/devices/', headers=first_headers).status_code == 200
+    assert client.post('/api/auth/logout', headers=first_headers).status_code == 200
+    assert client.get('/api/devices/', headers=first_headers).status_code == 401
+    assert client.get('/api/devices/', headers={'Authorization': f'Bearer {second}'}).status_code == 200
+
+
+def test_revocation_applies_only_after_commit(app, client, create_user):
+    user = create_user('rollback_user')
+    token = generate_token(user.id, user.username, user.role)
+    headers = {'Authorization': f'Bearer {token}'}
+    revocations = app.extensions['revocation_list']
+
+    # 回滚的登出与角色变更不影响本进程的吊销列表
+    with app.app_context():
+        revoke_token(verify_token(token), reason='回滚')
+        db.session.get(User, user.id).role = 'teacher'
+        db.session.flush()
+        db.session.rollback()
+    assert len(revocations) == 0
+    assert client.get('/api/devices/', headers=headers).status_code == 200
+
+    # 提交后立即生效
+    with app.app_context():
+        db.session.get(User, user.id).role = 'teacher'
+        db.session.commit()
+    assert len(revocations) == 1
+    assert client.get('/api/devices/', headers=headers).status_code == 401
+
+
+def test_revocation_propagates_between_processes(make_app, tmp_path):
+    # 两个应用共享同一个数据库文件，模拟多进程部署
+    shared = {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'shared.db'}", 'AUTH_REVOCATION_SYNC_INTERVAL': 0}
+    admin_app = make_app(**shared)
+    other_app = make_app(**shared)
+
+    with admin_app.app_context():
+        admin = User(username='revoke_admin', email='revoke_admin@test.com', role='admin')
+        admin.set_password('test123')
+        user = User(username='revoke_user', email='revoke_user@test.com', role='teacher')
+        user.set_password('test123')
+        db.session.add_all([admin, user])
+        db.session.commit()
+        user_id = user.id
+        admin_token = generate_token(admin.id, admin.username, admin.role)
+        user_token = generate_token(user.id, user.username, user.role)
+
+    headers = {'Authorization': f'Bearer {user_token}'}
+    other_client = other_app.test_client()
+    assert other_client.get('/api/devices/', headers=headers).status_code == 200
+
+    response = admin_app.test_client().post('/api/auth/revoke', json={'user_id': user_id},
+                                            headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+
+    # 另一个进程在下次同步后拒绝该用户的旧令牌
+    assert other_client.get('/api/devices/', headers=headers).status_code == 401
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 令牌吊销测试通过')
@@ -0,0 +1,54 @@
+"""按列查询的快速序列化单元测试"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Device, Reservation
+
+
+def test_row_serializer_matches_to_dict_bytes(app, create_user):
+    user = create_user('row_user')
+
+    with app.app_context():
+        db.session.add_all([
+            Device(device_id='ROW-1', name='默认值设备', device_type='光学仪器'),
+            # 空值、空分类、JSON列与日期列
+            Device(device_id='ROW-2', name='完整设备', device_type='分离设备', category='', brand='品牌',
+                   total_usage_hours=None, usage_count=None, is_shared=False, maintenance_interval=None,
+                   max_reservation_hours=None, technical_parameters={'转速': [1, 2.5], 'ok': True},
+                   purchase_date=datetime(2020, 5, 1), last_used_at=datetime(2024, 1, 2, 3, 4, 5, 678)),
+        ])
+        db.session.flush()
+        start = datetime(2030, 1, 1, 9)
+        db.session.add_all([
+            Reservation(user_id=user.id, device_id=1, start_time=start, end_time=start + timedelta(minutes=100),
+                        purpose='测试"引号"', actual_usage_hours=None, reviewed_at=datetime(2030, 1, 2)),
+            Reservation(user_id=user.id, device_id=2, start_time=start, end_time=start + timedelta(hours=3),
+                        purpose='第二条', rating=5, actual_usage_hours=1.5),
+        ])
+        db.session.commit()
+
+        cases = [
+            (Device, Device.default_fields()),
+            (Device, Device.default_fields(detail=True)),
+            (Device, ('category', 'technical_parameters', 'name')),
+            (Reservation, Reservation.default_fields(detail=True)),
+            (Reservation, ('duration_hours',)),
+        ]
+        for model, fields in cases:
+            columns, serialize = model.row_serializer(fields)
+            assert model.row_serializer(list(fields))[1] is serialize  # 按字段集缓存
+
+            objects = model.query.order_by(model.id).all()
+            rows = db.session.query(*columns).order_by(model.id).all()
+            expected = [obj.to_dict(fields=fields) for obj in objects]
+            actual = [serialize(row) for row in rows]
+            assert actual == expected
+            assert [list(item) for item in actual] == [list(item) for item in expected]  # 字段顺序一致
+            assert app.json.dumps(actual) == app.json.dumps(expected)  # 编码后的字节一致
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 快速序列化测试通过')
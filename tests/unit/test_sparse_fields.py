@@ -0,0 +1,62 @@
+"""列表稀疏字段集（fields=）单元测试"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Device, Reservation
+
+
+def test_fields_trim_payload_and_selected_columns(app, client, admin, admin_headers):
+    with app.app_context():
+        for i in range(3):
+            db.session.add(Device(device_id=f'SPF-{i}', name=f'设备{i}', device_type='光学仪器',
+                                  description='很长的描述' * 100, specifications=f'{{"k": {i}}}'))
+        db.session.flush()
+        start = datetime(2030, 1, 1, 9)
+        db.session.add(Reservation(user_id=admin.id, device_id=1, start_time=start,
+                                   end_time=start + timedelta(hours=2), purpose='测试'))
+        db.session.commit()
+        full = Device.query.order_by(Device.id.desc()).first().to_dict()
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+    # 未指定 fields 时输出不变
+    data = client.get('/api/devices/', headers=admin_headers).get_json()['data']
+    assert data[0] == full
+
+    statements.clear()
+    response = client.get('/api/devices/', query_string={'fields': 'id,name,status'}, headers=admin_headers)
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert len(data) == 3
+    assert all(list(item) == ['id', 'name', 'status'] for item in data)
+    listing = [s for s in statements if 'FROM devices' in s and 'LIMIT' in s]
+    assert listing and all('description' not in s and 'specifications' not in s for s in listing)
+
+    # 游标分页同样只查询所需列
+    response = client.get('/api/devices/', query_string={'fields': 'name', 'cursor': '', 'limit': 2},
+                          headers=admin_headers)
+    body = response.get_json()
+    assert [list(item) for item in body['data']] == [['name'], ['name']]
+    next_page = client.get('/api/devices/', headers=admin_headers,
+                           query_string={'fields': 'name', 'cursor': body['pagination']['next_cursor']}).get_json()
+    assert len(next_page['data']) == 1
+
+    # 派生字段自动加载其依赖的列
+    data = client.get('/api/reservations/', query_string={'fields': 'id,duration_hours'},
+                      headers=admin_headers).get_json()['data']
+    assert data == [{'id': 1, 'duration_hours': 2.0}]
+
+    response = client.get('/api/devices/', query_string={'fields': 'name,password'}, headers=admin_headers)
+    assert response.status_code == 400
+    assert 'password' in response.get_json()['error']
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 稀疏字段集测试通过')
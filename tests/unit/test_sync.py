@@ -0,0 +1,81 @@
+"""增量同步单元测试"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Device, Reservation
+
+
+@pytest.fixture
+def config_overrides():
+    return {'SYNC_BATCH_SIZE': 2, 'SYNC_SETTLE_SECONDS': 0}
+
+
+def test_sync_returns_changes_since_watermark(app, client, admin, admin_headers, create_user, auth_headers):
+    student = create_user('sync_student')
+    student_headers = auth_headers(student)
+    with app.app_context():
+        for i in range(3):
+            db.session.add(Device(device_id=f'SYN-{i}', name=f'同步设备{i}', device_type='光学仪器'))
+        db.session.flush()
+        start = datetime(2030, 1, 1, 9)
+        db.session.add_all([
+            Reservation(user_id=student.id, device_id=1, start_time=start, end_time=start + timedelta(hours=1),
+                        purpose='学生预约'),
+            Reservation(user_id=admin.id, device_id=2, start_time=start, end_time=start + timedelta(hours=1),
+                        purpose='管理员预约'),
+        ])
+        db.session.commit()
+
+    def sync(headers, since=None):
+        response = client.get('/api/sync', headers=headers, query_string={'since': since} if since else {})
+        assert response.status_code == 200
+        return response.get_json()
+
+    # 首次同步：按批返回全部记录，has_more 时继续拉取
+    first = sync(admin_headers)
+    assert len(first['devices']) == 2 and len(first['reservations']) == 2 and first['has_more']
+    second = sync(admin_headers, first['watermark'])
+    assert [d['device_id'] for d in second['devices']] == ['SYN-2'] and second['reservations'] == []
+    assert not second['has_more']
+    watermark = second['watermark']
+
+    # 没有变化时返回空增量
+    empty = sync(admin_headers, watermark)
+    assert empty['devices'] == [] and empty['reservations'] == [] and empty['deleted'] == {}
+
+    # 修改、取消、删除
+    with app.app_context():
+        db.session.get(Device, 1).update_status('maintenance')
+        db.session.get(Reservation, 1).status = 'cancelled'
+        db.session.commit()
+    response = client.delete('/api/devices/3', headers=admin_headers)
+    assert response.status_code == 200
+
+    delta = sync(admin_headers, watermark)
+    assert [(d['id'], d['status']) for d in delta['devices']] == [(1, 'maintenance')]
+    assert [(r['id'], r['status']) for r in delta['reservations']] == [(1, 'cancelled')]
+    assert delta['deleted'] == {'devices': [3]}
+    assert sync(admin_headers, delta['watermark'])['deleted'] == {}
+
+    # 普通用户只同步自己的预约
+    data = sync(student_headers)
+    assert [r['purpose'] for r in data['reservations']] == ['学生预约']
+
+    # 未稳定的最近变更：水位停在稳定时间点，下次重复返回
+    app.config['SYNC_SETTLE_SECONDS'] = 60
+    with app.app_context():
+        db.session.get(Device, 2).name = '最近修改'
+        db.session.commit()
+    watermark = delta['watermark']
+    recent = sync(admin_headers, watermark)
+    assert [d['name'] for d in recent['devices']] == ['最近修改']
+    assert [d['name'] for d in sync(admin_headers, recent['watermark'])['devices']] == ['最近修改']
+
+    assert client.get('/api/sync', headers=admin_headers, query_string={'since': 'bad'}).status_code == 400
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 增量同步测试通过')
@@ -0,0 +1,50 @@
+"""令牌缓存单元测试"""
+import pytest
+
+from app import db
+from app.auth import generate_token, TokenCache, AuthenticatedUser
+from app.models import User
+
+
+def test_lru_eviction():
+    cache = TokenCache(maxsize=2, ttl=60)
+    payload = {'user_id': 1}
+    for token in ['a', 'b', 'c']:
+        cache.set(token, payload, AuthenticatedUser(1, 'u', 'student'))
+    assert len(cache) == 2
+    assert cache.get('a') is None
+    assert cache.get('c') is not None
+
+
+def test_cached_token_revoked_on_role_change_and_delete(app, client, create_user, auth_headers):
+    user = create_user('cache_user', role='admin')
+    user_id = user.id
+    headers = auth_headers(user)
+    cache = app.extensions['token_cache']
+
+    assert client.get('/api/devices/', headers=headers).status_code == 200
+    assert client.get('/api/devices/', headers=headers).status_code == 200
+    assert cache.hits == 1 and cache.misses == 1
+
+    # 降级后旧令牌中的角色声明已过时，令牌立即失效
+    with app.app_context():
+        db.session.get(User, user_id).role = 'student'
+        db.session.commit()
+        new_token = generate_token(user_id, 'cache_user', 'student')
+    assert len(cache) == 0
+    assert client.get('/api/devices/', headers=headers).status_code == 401
+
+    # 重新签发的令牌携带新角色
+    new_headers = {'Authorization': f'Bearer {new_token}'}
+    assert client.get('/api/devices/', headers=new_headers).status_code == 200
+    assert client.post('/api/devices/', json={}, headers=new_headers).status_code == 403
+
+    with app.app_context():
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+    assert client.get('/api/devices/', headers=new_headers).status_code == 401
+
+
+if __name__ == '__main__':
+    if pytest.main([__file__, '-q']) == 0:
+        print('✅ 令牌缓存测试通过')